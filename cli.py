@@ -0,0 +1,270 @@
+"""基金单提取命令行入口
+
+不依赖界面和 tkinter，供服务器上的定时任务调用。运行日志输出到 stderr，
+结束时在 stdout 输出一行 JSON 汇总，退出码见 EXIT_*。
+
+用法:
+    python cli.py --root D:/估值材料（备查） --date 20251218 --types dividend,purchase --jobs 4
+    python cli.py --root D:/估值材料（备查） --watch --at 09:30,14:00
+
+监控模式（--watch）下持续运行，每次提取后输出一行 JSON 汇总，按 Ctrl+C 结束。
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# PyMuPDF 的提示（如 fitz 弃用提示）默认打印到 stdout，导入前转到 stderr，stdout 只保留 JSON 汇总
+os.environ.setdefault('PYMUPDF_MESSAGE', 'fd:2')
+
+from extractors.tasks import TASK_TYPES, TASK_NAMES, OCR_TASK_TYPES, load_extract_func, mapping_path_for
+from utils.common import log
+from utils.document_scan import HEAD_PAGES, scan_documents
+from utils.pdf_backends import BACKENDS, DEFAULT_BACKEND
+from utils.pipeline import ExtractionFailed, collect_outcome
+from utils import archive, history, manifest, ocr_engine, ocr_templates, output, run_report, watch
+
+DEFAULT_JSON_FILENAME = "product_codes.json"
+DEFAULT_CONVERSION_JSON_FILENAME = "product_codes_conversion.json"
+
+# 退出码
+EXIT_OK = 0              # 全部类型执行完毕（没有单据的类型不算失败）
+EXIT_TASK_FAILED = 1     # 至少一个类型执行时抛出异常，或本次运行中途失败（汇总中有 error）
+EXIT_USAGE = 2           # 参数错误或映射文件不存在
+EXIT_NO_TARGET = 3       # 当天的目标目录不存在
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="基金单提取（命令行版）")
+    parser.add_argument('--root', required=True, help="主目录，即界面中的“选择文件夹”")
+    parser.add_argument('--date', help="业务日期 YYYYMMDD，默认当天")
+    parser.add_argument('--types', default='all',
+                        help="要提取的单据类型，逗号分隔，默认 all。可选: " + ', '.join(TASK_TYPES))
+    parser.add_argument('--jobs', type=int, default=None, help="并行提取PDF文本的进程数，默认CPU核数-1")
+    parser.add_argument('--pdf-backend', choices=list(BACKENDS), default=None,
+                        help=f"PDF文本提取方式，默认 {DEFAULT_BACKEND}；平台注册时指定的方式优先")
+    parser.add_argument('--profile', action='store_true',
+                        help="深度分析：用 cProfile 记录调用耗时，结果与运行报告一起保存")
+    parser.add_argument('--report-top', type=int, default=run_report.DEFAULT_TOP_N,
+                        help=f"运行报告中列出最慢的文件和页面数，默认 {run_report.DEFAULT_TOP_N}")
+    parser.add_argument('--also', default='',
+                        help="除 xlsx 外另写同名的 csv / parquet 文件，逗号分隔，如 csv,parquet（parquet 需要 pyarrow）")
+    parser.add_argument('--single-workbook', action='store_true',
+                        help=f"各类单据写入同一个工作簿 {output.COMBINED_BASENAME}.xlsx，每类一个工作表")
+    parser.add_argument('--xlsx-names', action='store_true',
+                        help="输出文件改用与内容一致的 .xlsx 扩展名（默认沿用原来的 .xls 文件名）")
+    parser.add_argument('--archive', help="归档目录：各类单据的结果同时按 类型/年/月 写入 Parquet（需要 pyarrow）")
+    parser.add_argument('--history', help="历史库路径（SQLite）：各类单据的结果同时写入，供按账套、基金代码、日期查询")
+    parser.add_argument('--full', action='store_true',
+                        help="忽略当天的处理清单，全部文件重新提取（默认只处理新增或修改的文件）")
+    parser.add_argument('--watch', action='store_true',
+                        help="监控模式：持续监控当天目录，新单据写完后自动提取（不能与 --date 同时使用）")
+    parser.add_argument('--interval', type=float, default=watch.DEFAULT_INTERVAL,
+                        help=f"监控模式的轮询间隔（秒），默认 {watch.DEFAULT_INTERVAL}")
+    parser.add_argument('--settle', type=float, default=watch.DEFAULT_SETTLE,
+                        help=f"文件多久不变化视为写完（秒），默认 {watch.DEFAULT_SETTLE}")
+    parser.add_argument('--at', dest='times', default='',
+                        help="监控模式下每天定时提取的时刻，逗号分隔，如 09:30,14:00")
+    parser.add_argument('--json', dest='json_path', help="产品代码映射文件，默认 <root>/" + DEFAULT_JSON_FILENAME)
+    parser.add_argument('--conversion-json', dest='conversion_json_path',
+                        help="转换单产品代码映射文件，默认 <root>/" + DEFAULT_CONVERSION_JSON_FILENAME)
+    return parser.parse_args(argv)
+
+
+def _parse_types(value):
+    if value.strip().lower() == 'all':
+        return list(TASK_TYPES)
+    types = [t.strip() for t in value.split(',') if t.strip()]
+    unknown = [t for t in types if t not in TASK_TYPES]
+    if unknown:
+        raise ValueError(f"未知的单据类型: {', '.join(unknown)}")
+    # 按标准顺序去重
+    return [t for t in TASK_TYPES if t in types]
+
+
+def _run_task(task_type, folder_path, json_path, conversion_json_path, documents, run_date):
+    """执行单个类型的提取，返回汇总记录"""
+    start = time.perf_counter()
+    result = {'type': task_type, 'name': TASK_NAMES[task_type]}
+    try:
+        extract_func = load_extract_func(task_type)
+        with run_report.task(task_type), collect_outcome() as outcome:
+            output = run_report.profiled(extract_func, folder_path,
+                                         mapping_path_for(task_type, json_path, conversion_json_path),
+                                         None, documents, run_date)
+        result['failed_files'] = outcome.failed_files
+        if isinstance(output, ExtractionFailed):
+            # 映射文件加载失败或结果写出失败：提取器已记录日志并返回假值
+            result['status'] = 'error'
+            result['output'] = None
+            result['error'] = output.reason
+        else:
+            result['status'] = 'ok' if output else 'empty'
+            result['output'] = output or None
+    except Exception as e:
+        log(f"{TASK_NAMES[task_type]}提取失败: {e}", None)
+        result['status'] = 'error'
+        result['output'] = None
+        result['error'] = str(e)
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def _run_lane(task_types, *args):
+    """依次执行一组类型"""
+    return [_run_task(task_type, *args) for task_type in task_types]
+
+
+def run_tasks(folder_path, run_date, task_types, json_path, conversion_json_path, jobs=None, pdf_backend=None,
+              documents=None, keep_ocr=False):
+    """并行执行多个类型的提取
+
+    PDF文本先用进程池统一提取一次，各类型再在线程中并行解析。
+    万事如意单据共用一个OCR模型，在同一线程中依次执行。
+
+    Args:
+        pdf_backend: PDF文本提取方式，None 为默认方式
+        documents: 已有的目录扫描结果（监控模式下各轮共用），为空时重新扫描
+        keep_ocr: 结束后是否保留OCR模型（监控模式下保留，下一轮不用重新加载）
+
+    Returns:
+        各类型的汇总记录列表，顺序与 task_types 一致
+    """
+    target_path = watch.target_path_for(folder_path, run_date)
+    text_types = [t for t in task_types if t not in OCR_TASK_TYPES]
+    ocr_types = [t for t in task_types if t in OCR_TASK_TYPES]
+    # 处理清单中未变化的文件由提取器直接沿用记录，不预取文本
+    unchanged = manifest.current_files(os.path.dirname(target_path), text_types) if text_types else set()
+    own_documents = documents is None
+    if own_documents:
+        documents = run_report.profiled(scan_documents, target_path, None, prefetch=bool(text_types), workers=jobs,
+                                        backend=pdf_backend, skip=unchanged)
+    elif text_types:
+        run_report.profiled(documents.prefetch, [p for p in documents.pdf_paths() if p not in unchanged], HEAD_PAGES)
+
+    lanes = [[t] for t in text_types]
+    if ocr_types:
+        lanes.append(ocr_types)
+    args = (folder_path, json_path, conversion_json_path, documents, run_date)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, len(lanes))) as executor:
+            futures = [executor.submit(_run_lane, lane, *args) for lane in lanes]
+            results = {r['type']: r for future in futures for r in future.result()}
+    finally:
+        if own_documents and documents is not None:
+            documents.close()
+        if not keep_ocr:
+            ocr_engine.shutdown()
+    return [results[t] for t in task_types]
+
+
+def _run_once(args, run_date, task_types, json_path, conversion_json_path, documents=None):
+    """执行一次提取并在输出目录写运行报告，返回汇总中与本次运行有关的字段
+
+    运行中途出错（如扫描目录失败、汇总工作簿写入失败）时记入 summary['error']，不向外抛出，
+    监控模式下继续等待下一次提取。
+    """
+    target_path = watch.target_path_for(args.root, run_date)
+    summary = {}
+    results = []
+    start = time.perf_counter()
+    report = run_report.start(args.profile)
+    ocr_templates.reset_learn_failures()
+    try:
+        results = run_tasks(args.root, run_date, task_types, json_path, conversion_json_path, args.jobs,
+                            args.pdf_backend, documents, keep_ocr=args.watch)
+        if args.single_workbook:
+            try:
+                with run_report.stage('write'):
+                    summary['workbooks'] = output.write_combined()
+            except Exception as e:
+                log(f"写入汇总工作簿失败: {e}", None)
+                summary['error'] = f"写入汇总工作簿失败: {e}"
+    except Exception as e:
+        log(f"提取失败: {e}", None)
+        summary['error'] = f"提取失败: {e}"
+    finally:
+        run_report.finish()
+    try:
+        summary['report'] = report.write(os.path.dirname(target_path), args.report_top)
+    except Exception as e:
+        log(f"写入运行报告失败: {e}", None)
+    summary['tasks'] = results
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    summary['counts'] = {status: sum(1 for r in results if r['status'] == status)
+                         for status in ('ok', 'empty', 'error')}
+    return summary
+
+
+def _watch(args, task_types, json_path, conversion_json_path, summary):
+    """监控模式：每次提取后向 stdout 输出一行 JSON 汇总，Ctrl+C 结束"""
+    out = sys.stdout
+
+    def run(run_date, documents):
+        result = _run_once(args, run_date, task_types, json_path, conversion_json_path, documents)
+        line = {**summary, 'date': run_date.strftime('%Y%m%d'),
+                'target_path': watch.target_path_for(args.root, run_date), **result}
+        print(json.dumps(line, ensure_ascii=False), file=out, flush=True)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            watch.watch(args.root, run, args.interval, args.settle, watch.parse_times(args.times),
+                        workers=args.jobs, backend=args.pdf_backend)
+        except KeyboardInterrupt:
+            log("已停止监控", None)
+        finally:
+            ocr_engine.shutdown()
+    return EXIT_OK
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary = {'root': args.root}
+    try:
+        if args.watch and args.date:
+            raise ValueError("监控模式总是监控当天目录，不能指定 --date")
+        run_date = datetime.strptime(args.date, '%Y%m%d') if args.date else datetime.now()
+        task_types = _parse_types(args.types)
+        watch.parse_times(args.times)
+        output.configure(output.parse_formats(args.also), args.single_workbook, not args.xlsx_names)
+        archive.configure(args.archive)
+        history.configure(args.history)
+    except ValueError as e:
+        print(json.dumps({**summary, 'error': str(e)}, ensure_ascii=False))
+        return EXIT_USAGE
+
+    json_path = args.json_path or os.path.join(args.root, DEFAULT_JSON_FILENAME)
+    conversion_json_path = args.conversion_json_path or os.path.join(args.root, DEFAULT_CONVERSION_JSON_FILENAME)
+    target_path = watch.target_path_for(args.root, run_date)
+    summary.update({'date': run_date.strftime('%Y%m%d'), 'target_path': target_path, 'types': task_types,
+                    'pdf_backend': args.pdf_backend or DEFAULT_BACKEND})
+
+    required = {mapping_path_for(t, json_path, conversion_json_path) for t in task_types}
+    missing = sorted(p for p in required if not os.path.exists(p))
+    if missing:
+        print(json.dumps({**summary, 'error': f"映射文件不存在: {', '.join(missing)}"}, ensure_ascii=False))
+        return EXIT_USAGE
+    if args.watch:
+        del summary['date'], summary['target_path']
+        return _watch(args, task_types, json_path, conversion_json_path, summary)
+    if not os.path.isdir(target_path):
+        print(json.dumps({**summary, 'error': f"目标路径不存在: {target_path}"}, ensure_ascii=False))
+        return EXIT_NO_TARGET
+
+    if args.full:
+        manifest.reset(os.path.dirname(target_path))
+    # 运行日志转到 stderr，stdout 只保留最后的 JSON 汇总
+    with contextlib.redirect_stdout(sys.stderr):
+        summary.update(_run_once(args, run_date, task_types, json_path, conversion_json_path))
+    print(json.dumps(summary, ensure_ascii=False))
+    return EXIT_TASK_FAILED if summary['counts']['error'] or summary.get('error') else EXIT_OK
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包成exe后子进程需要
+    sys.exit(main())
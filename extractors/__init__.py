@@ -1,5 +1,16 @@
-from .dividend_extractor import run_dividend_extract
-from .purchase_extractor import run_purchase_extract
-from .redemption_extractor import run_redemption_extract
+import importlib
 
-__all__ = ['run_dividend_extract', 'run_purchase_extract', 'run_redemption_extract'] 
\ No newline at end of file
+# 提取器模块依赖 pandas、pdfplumber 等重型库，按需导入，避免拖慢界面启动
+_LAZY_EXPORTS = {
+    'run_dividend_extract': 'extractors.dividend_extractor',
+    'run_purchase_extract': 'extractors.purchase_extractor',
+    'run_redemption_extract': 'extractors.redemption_extractor',
+}
+
+__all__ = ['run_dividend_extract', 'run_purchase_extract', 'run_redemption_extract']
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
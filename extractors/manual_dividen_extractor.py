@@ -1,11 +1,8 @@
 import os
-import json
 import fitz  # PyMuPDF
 import re
-import pandas as pd
+import time
 import shutil
-import tkinter as tk
-from tkinter import filedialog, messagebox, scrolledtext, simpledialog, ttk, Canvas
 import threading
 import subprocess
 from datetime import datetime, timedelta
@@ -13,30 +10,17 @@ import math
 import numpy as np
 from PIL import Image
 # import easyocr  # 移除这里的导入
-from utils.common import log
-import tempfile  # 添加临时文件模块
+from utils.common import log, LOG_DETAIL
+from utils.document_scan import scan_if_needed
+from utils.pipeline import ExtractionFailed, ExtractionStats, RecordSink, iter_documents
+from utils.manifest import FileManifest
+from utils.output import after_write, write_table
+from utils import archive, history, ocr_engine, ocr_templates, product_index, run_log, run_report
 
 
-# ========== 日志写入函数 ==========
-# 添加一个全局变量来跟踪是否是首次调用
-_log_initialized = False
-
-def write_log(message):
-    """写入日志到文件"""
-    global _log_initialized
-    try:
-        log_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_debug.log")
-        
-        # 如果是首次调用，清空日志文件
-        mode = "w" if not _log_initialized else "a"
-        if not _log_initialized:
-            _log_initialized = True
-        
-        with open(log_file, mode, encoding="utf-8") as f:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"[{timestamp}] {message}\n")
-    except Exception as e:
-        print(f"写入日志失败: {e}")
+# ========== 日志 ==========
+# OCR过程日志写入本次运行的日志文件（见 utils.run_log）
+_ocr_log = run_log.get_logger('manual_dividend')
 
 
 # ========== 基金代码修正函数 ==========
@@ -57,127 +41,101 @@ def correct_fund_code(raw_code):
     # 1. 修正首字母：如果第一个字符是8，改为B
     if corrected_code[0] == '8':
         corrected_code = 'B' + corrected_code[1:]
-        print(f"基金代码首字母修正: 8 -> B")
+        _ocr_log.debug(f"基金代码首字母修正: 8 -> B")
     
     # 2. 修正数字1被识别为小写l的情况
     # 检查从第二个字符开始的所有字符
     for i in range(1, len(corrected_code)):
         if corrected_code[i] == 'l':
             corrected_code = corrected_code[:i] + '1' + corrected_code[i+1:]
-            print(f"基金代码数字修正: 位置{i}的l -> 1")
+            _ocr_log.debug(f"基金代码数字修正: 位置{i}的l -> 1")
     
     if corrected_code != raw_code:
-        print(f"基金代码修正: {raw_code} -> {corrected_code}")
+        _ocr_log.debug(f"基金代码修正: {raw_code} -> {corrected_code}")
     
     return corrected_code
 
 # ========== PDF转图像并OCR识别 ==========
 def extract_text_with_easyocr(pdf_path):
-    """使用 EasyOCR 提取PDF文本"""
+    """提取PDF文本：优先读取文本层，扫描页再使用 EasyOCR 识别"""
+    file_log = _ocr_log.bind(file=pdf_path)
+    start = time.perf_counter()
     try:
-        # 在函数内部导入easyocr，避免打包时的导入错误
-        write_log(f"开始处理PDF: {pdf_path}")
+        file_log.info("开始处理PDF")
         
         # 检查文件是否存在
         if not os.path.exists(pdf_path):
-            write_log(f"错误：PDF文件不存在: {pdf_path}")
-            return "", []
-        
-        write_log("正在导入easyocr...")
-        import easyocr
-        write_log("easyocr导入成功")
-        
-        # 初始化 EasyOCR（首次运行会下载模型）
-        write_log("初始化 EasyOCR...")
-        write_log("首次运行会下载模型文件，请稍等...")
-        
-        try:
-            reader = easyocr.Reader(['ch_sim', 'en'], gpu=False)  # 中文简体和英文，不使用GPU
-            write_log("EasyOCR 初始化成功")
-        except Exception as e:
-            write_log(f"EasyOCR初始化失败: {e}")
-            import traceback
-            traceback_info = traceback.format_exc()
-            write_log(f"详细错误信息: {traceback_info}")
+            file_log.error(f"PDF文件不存在: {pdf_path}")
             return "", []
         
-        write_log("正在打开PDF文件...")
         doc = fitz.open(pdf_path)
-        write_log(f"PDF打开成功，共{len(doc)}页")
+        file_log.debug(f"PDF打开成功，共{len(doc)}页", pages=len(doc))
         
         all_text = []
+        page_sources = []  # 每页的提取方式：文本层 / OCR
         
         for page_num in range(len(doc)):
-            write_log(f"正在处理页面 {page_num + 1}/{len(doc)}...")
+            page_log = file_log.bind(page=page_num + 1)
+            page_start = time.perf_counter()
             
             try:
                 # 获取页面
                 page = doc.load_page(page_num)
-                write_log(f"页面{page_num + 1}加载成功")
+                
+                # 优先使用PDF自带的文本层，没有文本或文本过少的页面才做OCR
+                layer_lines = ocr_engine.text_layer_lines(page)
+                if layer_lines is not None:
+                    page_sources.append('文本层')
+                    all_text.extend(layer_lines)
+                    page_log.debug(f"使用文本层，读取到 {len(layer_lines)} 行文本",
+                                   method='文本层', lines=len(layer_lines), elapsed_ms=run_log.elapsed_ms(page_start))
+                    continue
+                page_sources.append('OCR')
+                
+                # 共享的 EasyOCR Reader 在第一页需要OCR时才加载（首次运行会下载模型）
+                if not ocr_engine.is_loaded():
+                    page_log.info("初始化 EasyOCR，首次运行会下载模型文件，请稍等...")
+                    init_start = time.perf_counter()
+                    try:
+                        ocr_engine.get_reader()
+                        page_log.info("EasyOCR 初始化成功", elapsed_ms=run_log.elapsed_ms(init_start))
+                    except Exception as e:
+                        page_log.exception(f"EasyOCR初始化失败: {e}")
+                        doc.close()
+                        return "", []
                 
                 # 将页面转换为图像
                 mat = fitz.Matrix(2.5, 2.5)  # 2.5倍缩放
                 pix = page.get_pixmap(matrix=mat)
-                write_log(f"页面{page_num + 1}转换为图像成功")
-                
-                # 使用系统临时目录保存临时文件
-                with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-                    temp_img_path = tmp.name
-                
-                write_log(f"临时文件路径: {temp_img_path}")
-                
-                # 保存图像到临时文件
-                pix.save(temp_img_path)
-                write_log(f"临时图像保存成功: {temp_img_path}")
-                
-                # 检查临时文件是否存在
-                if not os.path.exists(temp_img_path):
-                    write_log(f"错误：临时图像文件未生成: {temp_img_path}")
-                    continue
-                
-                # 检查文件大小
-                file_size = os.path.getsize(temp_img_path)
-                write_log(f"临时文件大小: {file_size} 字节")
                 
-                # 使用 EasyOCR 识别
-                write_log(f"开始OCR识别页面{page_num + 1}...")
-                results = reader.readtext(temp_img_path)
-                write_log(f"OCR识别完成，获得{len(results)}个结果")
+                # 像素数据直接以 NumPy 数组交给 EasyOCR，不写临时PNG文件
+                results = ocr_engine.readtext_pixmap(pix)
                 
-                # 提取文本
+                # 提取文本，识别结果整页记一条日志
                 page_text = []
+                tokens = []
                 for (bbox, text, prob) in results:
                     if prob > 0.3:  # 置信度阈值
-                        write_log(f"识别文本: {text} (置信度: {prob:.2f})")
                         page_text.append(text)
+                        tokens.append([text, round(float(prob), 2)])
                 
                 all_text.extend(page_text)
-                write_log(f"页面 {page_num + 1} 完成，识别到 {len(page_text)} 行文本")
-                
-                # 删除临时文件
-                try:
-                    if os.path.exists(temp_img_path):
-                        os.remove(temp_img_path)
-                        write_log(f"临时文件已删除: {temp_img_path}")
-                except Exception as e:
-                    write_log(f"删除临时文件失败: {e}")
+                page_log.debug(f"OCR识别完成，获得{len(results)}个结果，保留 {len(page_text)} 行文本",
+                               method='OCR', results=len(results), lines=len(page_text), tokens=tokens,
+                               elapsed_ms=run_log.elapsed_ms(page_start))
+                run_report.add_page(pdf_path, page_num + 1, 'OCR', time.perf_counter() - page_start)
                     
             except Exception as e:
-                write_log(f"处理页面{page_num + 1}时出错: {e}")
-                import traceback
-                traceback_info = traceback.format_exc()
-                write_log(f"详细错误信息: {traceback_info}")
+                page_log.exception(f"处理页面{page_num + 1}时出错: {e}")
                 continue
         
         doc.close()
-        write_log(f"PDF处理完成，总共提取到{len(all_text)}行文本")
+        file_log.info(f"PDF处理完成，总共提取到{len(all_text)}行文本",
+                      page_sources=page_sources, lines=len(all_text), elapsed_ms=run_log.elapsed_ms(start))
         return '\n'.join(all_text), all_text
         
     except Exception as e:
-        write_log(f"EasyOCR识别失败: {str(e)}")
-        import traceback
-        traceback_info = traceback.format_exc()
-        write_log(f"详细错误信息: {traceback_info}")
+        file_log.exception(f"EasyOCR识别失败: {str(e)}", elapsed_ms=run_log.elapsed_ms(start))
         return "", []
 
 # ========== 提取函数 ==========
@@ -190,7 +148,7 @@ def extract_manual_fields_ocr(text, lines):
     # 将文本转换为单行，便于正则匹配
     full_text = ' '.join(lines).replace('\n', ' ')
     full_text_clean = full_text.replace(',', '').replace(' ', '')
-    print(f"\n完整文本: {full_text[:500]}...")  # 打印前500个字符用于调试
+    _ocr_log.debug("完整文本", text=full_text[:500])
     
     try:
         # 1. 提取产品名称（自动填充）
@@ -205,11 +163,11 @@ def extract_manual_fields_ocr(text, lines):
             match = re.search(pattern, full_text)
             if match:
                 raw_fund_code = match.group(1).strip()
-                print(f"原始证券代码匹配成功 (模式{i+1}): {raw_fund_code}")
+                _ocr_log.debug(f"原始证券代码匹配成功 (模式{i+1}): {raw_fund_code}")
                 
                 # 应用修正函数
                 fund_market_code = correct_fund_code(raw_fund_code)
-                print(f"修正后证券代码: {fund_market_code}")
+                _ocr_log.debug(f"修正后证券代码: {fund_market_code}")
                 break
         
         # 3. 提取确认金额
@@ -225,152 +183,166 @@ def extract_manual_fields_ocr(text, lines):
                 amounts = [float(a) for a in amounts if re.match(r'^\d+(\.\d+)?$', a)]
                 if amounts:
                     amount = f"{max(amounts):.2f}"
-                    print(f"确认金额匹配成功 (模式{i+1}): {amount}")
+                    _ocr_log.debug(f"确认金额匹配成功 (模式{i+1}): {amount}")
                     break
         
-        print(f"\n最终提取结果:")
-        print(f"证券代码: {fund_market_code}")
-        print(f"确认金额: {amount}")
+        _ocr_log.debug("最终提取结果", fields={'证券代码': fund_market_code, '确认金额': amount})
     
     except Exception as e:
-        print(f"字段提取过程中出错: {str(e)}")
+        _ocr_log.exception(f"字段提取过程中出错: {str(e)}")
     
     return fund_market_code, amount
 
+def _template_fields_complete(text, lines):
+    """字段区域识别结果是否包含全部必要字段"""
+    fund_market_code, amount = extract_manual_fields_ocr(text, lines)
+    return bool(fund_market_code and amount)
+
+
+def _ocr_text(file_path, json_path):
+    """优先按字段模板只识别必要区域，识别不全时再整页提取"""
+    text, lines = ocr_templates.extract_template_text(
+        file_path, 'manual_dividend', ocr_templates.template_path_for(json_path),
+        _template_fields_complete, _ocr_log.bind(file=file_path)
+    )
+    if not text:
+        text, lines = extract_text_with_easyocr(file_path)
+    return text, lines
+
+
+def _is_dividend_dir(root):
+    # 仅处理路径名中包含“分红”的文件夹
+    return "分红" in root
+
+
+def _is_manual_dividend_file(f):
+    # 筛选出包含"万事如意"的PDF文件
+    return f.lower().endswith('.pdf') and "万事如意" in f
+
+
 # ========== 红利除权提取主逻辑 ==========
-def run_manual_dividend_extract(folder_path, json_path, log_text):
+def iter_manual_dividend_records(documents, json_path, log_text=None, stats=None, run_date=None):
+    """逐份识别万事如意分红确认单并产出记录
+
+    Args:
+        documents: 目录扫描结果（DocumentScan）
+        json_path: 产品代码映射JSON文件路径，OCR字段模板与其放在同一目录
+        log_text: 日志文本框对象
+        stats: ExtractionStats 对象，用于统计文件数和失败文件
+        run_date: 业务日期（datetime），为空时取当天
+
+    Yields:
+        记录字典 {列名: 值}
+    """
+    if stats is None:
+        stats = ExtractionStats()
+
     # 1. 日期
-    current_year = datetime.now().year
-    today = datetime.now()
-    today_str = today.strftime('%Y%m%d')
+    today = run_date or datetime.now()
     yesterday_str = (today - timedelta(days=1)).strftime('%Y%m%d')
+
+    # 4. 遍历红利除权文件夹
+    for file, file_path, _, _ in iter_documents(documents, _is_dividend_dir, _is_manual_dividend_file, stats, log_text, read_text=False):
+        log(f"正在处理文件: {file}", log_text, LOG_DETAIL)
+
+        try:
+            with run_report.stage('ocr', file_path):
+                text, lines = documents.ocr_text(file_path, 'manual_dividend', lambda path: _ocr_text(path, json_path))
+
+            if not text:
+                log(f"文件 {file} 未能提取到任何文本", log_text)
+                stats.failed_files.append(file_path)
+                continue
+
+            # 判断是否为手工申购单据
+            is_manual = ('万事如意分红' in file) or ('万事如意' in file)
+
+            if is_manual:
+                with run_report.stage('parse', file_path, '万事如意'):
+                    fund_market_code, amount = extract_manual_fields_ocr(text, lines)
+                records = [(fund_market_code, amount)]
+            else:
+                continue
+        except Exception as e:
+            # 记录处理失败的文件
+            stats.fail(file_path, e, log_text)
+            continue
+
+        for fund_market_code, amount in records:
+            # 验证必要字段
+            if not fund_market_code or not amount:
+                log(f"文件 {file} 缺少必要字段，跳过", log_text)
+                continue
+
+            yield {
+                '市场代码': fund_market_code,
+                '派送金额': amount,
+                '产品名称': '万联资管万事如意FOF1号单一资产管理计划',
+                '凭证日期': yesterday_str,
+                '登记日期': yesterday_str,
+            }
+
+        # 成功处理后增加计数
+        stats.processed_files += 1
+        log(f"文件 {file} 处理完成", log_text, LOG_DETAIL)
+
+
+def run_manual_dividend_extract(folder_path, json_path, log_text, documents=None, run_date=None):
+    # 1. 日期
+    today = run_date or datetime.now()
+    current_year = today.year
+    today_str = today.strftime('%Y%m%d')
     target_cols = ['账套编号', '产品代码','市场代码', '凭证日期', '登记日期','派送金额','产品名称']
 
     # 3. 读取产品代码
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            product_code_dict = json.load(f)
+        product_codes = product_index.load(json_path)
     except Exception as e:
         log(f"产品代码加载失败: {e}", log_text)
-        return False
+        return ExtractionFailed(f"产品代码加载失败: {e}")
 
     # 4. 遍历红利除权文件夹
-    target_df = pd.DataFrame(columns=target_cols)
     target_path = os.path.join(folder_path, str(current_year), today_str, "1场外开基")
     log(f"正在查找分红单子目录: {target_path}", log_text)
     if not os.path.isdir(target_path):
         log(f"目标路径不存在！", log_text)
         return False
+    output_folder = os.path.join(folder_path, str(current_year), today_str)
 
-    # 添加文件计数变量
-    total_files = 0
-    processed_files = 0
-    failed_files = []
-
-    # 使用 os.walk 递归遍历 target_path 及其子文件夹
-    has_target_folder = False
-    for root, dirs, files in os.walk(target_path):
-        # 仅处理路径名中包含“分红”的文件夹
-        if not ("分红" in root):
-            continue
-            
-        has_target_folder = True
-        log(f"扫描目录: {root}", log_text)
-
-        # 筛选出包含"万事如意"的PDF文件
-        pdf_files = [f for f in files if f.lower().endswith('.pdf') and "万事如意" in f]
-        total_files += len(pdf_files)
-        
-        for file in pdf_files:
-            # 文件的完整路径现在使用 root
-            file_path = os.path.join(root, file)
-            log(f"正在处理文件: {file}", log_text)
-            
-            try:
-                # 使用OCR提取文本
-                text, lines = extract_text_with_easyocr(file_path)
-                
-                if not text:
-                    log(f"文件 {file} 未能提取到任何文本", log_text)
-                    failed_files.append(file_path)
-                    continue
-
-                # 判断是否为手工申购单据
-                is_manual = ('万事如意分红' in file) or ('万事如意' in file)
-
-                if is_manual:
-                    fund_market_code, amount = extract_manual_fields_ocr(text, lines)
-                    records = [(fund_market_code, amount)]
-                else:
-                    continue
-
-                for fund_market_code, amount in records:
-                    # 验证必要字段
-                    if not fund_market_code or not amount:
-                        log(f"文件 {file} 缺少必要字段，跳过", log_text)
-                        continue
-                    
-                    temp_df = pd.DataFrame([{
-                        '市场代码': fund_market_code,
-                        '派送金额': amount
-                    }])
-
-                    # 强制转换为数值型
-                    try:
-                        temp_df['派送金额'] = pd.to_numeric(temp_df['派送金额'], errors='coerce').round(2)
-                    except:
-                        log(f"文件 {file} 金额格式转换失败", log_text)
-                        continue
-                    
-                    # 映射账套编号
-                    temp_df['产品名称'] = '万联资管万事如意FOF1号单一资产管理计划'
-                    temp_df['账套编号'] = temp_df['产品名称'].map(product_code_dict)
-                    # 填充其它字段
-                    temp_df['凭证日期'] = yesterday_str
-                    temp_df['登记日期'] = yesterday_str
-                    temp_df['产品代码'] =''
-                    # 调整列顺序，合并进总表
-                    temp_df = temp_df[target_cols]
-                    target_df = pd.concat([target_df, temp_df], ignore_index=True)
-
-                # 成功处理后增加计数
-                processed_files += 1
-                log(f"文件 {file} 处理完成", log_text)
-
-            except Exception as e:
-                # 记录处理失败的文件
-                failed_files.append(file_path)
-                log(f"处理PDF失败: {file_path}", log_text)
-                log(f"错误信息: {e}", log_text)
-                continue
+    # 记录边识别边写出：每满一批做数值转换和账套编号映射
+    stats = ExtractionStats(FileManifest(output_folder, 'manual_dividend'))
+    sink = RecordSink(target_cols, numeric_cols=['派送金额'], code_map=product_codes,
+                      manifest=stats.manifest)
+    # 未传入共享扫描结果时，自行遍历一次 target_path 及其子文件夹
+    with scan_if_needed(documents, target_path) as documents:
+        sink.consume(iter_manual_dividend_records(documents, json_path, log_text, stats, today))
 
-    if not has_target_folder and total_files == 0:
+    if not stats.scanned_dirs and stats.total_files == 0:
         log("没有找到包含'分红'的子文件夹。", log_text)
         return False
 
     # 显示最终处理结果
-    if failed_files:
-        log(f"有 {len(failed_files)} 个文件处理失败:", log_text)
-        for failed_file in failed_files:
-            log(f"- {failed_file}", log_text)
-    else:
-        log(f"所有 {total_files} 个文件都已成功处理", log_text)
+    stats.report(log_text)
 
+    target_df = sink.close()
+    sink.report_mapping(log_text)
     if target_df.empty:
         log("没有提取到任何有效数据。", log_text)
         return False
 
     # 保存输出
-    output_folder = os.path.join(folder_path, str(current_year), today_str)
     if not os.path.isdir(output_folder):
         os.makedirs(output_folder, exist_ok=True)
     output_file = os.path.join(output_folder, "【境内理财产品】红利除权.xlsx")
     try:
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            target_df.to_excel(writer, sheet_name='Sheet1', index=False)
+        with run_report.stage('write'):
+            output_file = write_table(target_df, output_file)
         log(f"已汇总输出到: {output_file}", log_text)
+        after_write(output_file, archive.append, 'manual_dividend', today, target_df, sink.sources, log_text,
+                    platform='万事如意')
+        after_write(output_file, history.append, 'manual_dividend', today, target_df, sink.sources, log_text)
         return output_folder
     except Exception as e:
         log(f"写入Excel失败: {e}", log_text)
-        return False
+        return ExtractionFailed(f"写入Excel失败: {e}")
 
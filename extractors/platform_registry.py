@@ -0,0 +1,169 @@
+import inspect
+from utils import run_report
+from utils.pdf_backends import check_backend
+from extractors.platform_signatures import PlatformClassifier
+
+# ========== 平台提取器注册表 ===============
+# 每个平台的提取函数定义在模块顶层，用 register 声明：识别条件、需要的输入、输出字段。
+# 识别优先级即注册顺序；新增平台只需在对应单据模块中注册一个函数。
+# 识别平台先读首页，提取时按平台声明的页数（pages）读取，多页汇总单的后续页不用时不解析。
+# 首页识别出平台后，若它或优先级更高的平台的识别条件会看首页之后的文本
+# （如 ~InLines('转换') 这类不限行数的排除条件、InLines('天天基金', 3) 这类不限行数的识别条件），
+# 再读全文重新识别：高优先级平台可能在后续页才满足条件，结果与按全文识别一致。
+# 平台可以用 backend 指定文本提取方式（如 'pymupdf'），未指定时使用本次运行的默认方式。
+
+# 提取函数可以声明的参数，调用时从当前单据取值
+CONTEXT_FIELDS = ('file', 'text', 'lines', 'platform_key', 'today', 'today_str')
+
+
+class PlatformParser:
+    """单个平台的字段提取器"""
+
+    def __init__(self, key, signature, func, fields, schema, multi=False, required=(), pages=1, backend=None):
+        self.key = key
+        self.signature = signature
+        self.func = func
+        self.fields = tuple(fields)
+        self.multi = multi
+        self.required = tuple(required)
+        self.pages = pages
+        self.backend = check_backend(backend)
+
+        # 输入：提取函数的参数名
+        self.inputs = tuple(inspect.signature(func).parameters)
+        unknown = [name for name in self.inputs if name not in CONTEXT_FIELDS]
+        if unknown:
+            raise ValueError(f"{func.__name__} 声明了未知的输入: {', '.join(unknown)}")
+
+        # 输出：按单据的字段顺序重排，提取函数未声明的字段补 None
+        unknown = [name for name in self.fields if name not in schema]
+        if unknown:
+            raise ValueError(f"{func.__name__} 声明了未知的输出字段: {', '.join(unknown)}")
+        if self.fields == tuple(schema):
+            self._positions = None
+        else:
+            self._positions = [self.fields.index(name) if name in self.fields else None for name in schema]
+        self._required_positions = [tuple(schema).index(name) for name in self.required]
+
+    def parse(self, context):
+        """提取一份单据
+
+        Args:
+            context: {输入名: 值}
+
+        Returns:
+            记录列表，每条记录为按单据字段顺序排列的元组
+        """
+        result = self.func(**{name: context[name] for name in self.inputs})
+        rows = result if self.multi else [result]
+        for row in rows:
+            if len(row) != len(self.fields):
+                raise ValueError(f"{self.func.__name__} 返回 {len(row)} 个字段，应为 {len(self.fields)} 个")
+        if self._positions is not None:
+            rows = [tuple(row[i] if i is not None else None for i in self._positions) for row in rows]
+        if self._required_positions:
+            rows = [row for row in rows if all(row[i] for i in self._required_positions)]
+        return list(rows)
+
+
+class ParserRegistry:
+    """一类单据的平台提取器
+
+    Args:
+        fields: 记录的字段名，即各提取函数返回元组的顺序
+        optional: 提取函数默认不返回的字段，记录中为 None
+    """
+
+    def __init__(self, fields, optional=()):
+        self.fields = tuple(fields)
+        self.default_fields = tuple(name for name in self.fields if name not in optional)
+        self.parsers = {}
+        self._classifier = None
+        self._reach = None
+
+    def register(self, key, signature, fields=None, multi=False, required=(), pages=1, backend=None):
+        """注册平台提取函数（装饰器）
+
+        Args:
+            key: 平台标识
+            signature: 识别条件（InFile / InLines 组合）
+            fields: 提取函数返回的字段，默认为 default_fields
+            multi: 是否返回多条记录（元组列表）
+            required: 这些字段为空的记录直接丢弃
+            pages: 提取函数需要的页数，None 为全部页（多页汇总单）
+            backend: 文本提取方式，见 pdf_backends.BACKENDS；None 使用本次运行的默认方式
+        """
+        def decorator(func):
+            if key in self.parsers:
+                raise ValueError(f"平台 {key} 重复注册")
+            self.parsers[key] = PlatformParser(
+                key, signature, func, fields or self.default_fields, self.fields, multi, required, pages, backend
+            )
+            self._classifier = None
+            self._reach = None
+            return func
+        return decorator
+
+    @property
+    def classifier(self):
+        if self._classifier is None:
+            self._classifier = PlatformClassifier([(key, p.signature) for key, p in self.parsers.items()])
+        return self._classifier
+
+    def reach(self, platform_key):
+        """识别为 platform_key 所需看的行数：它及优先级更高的各平台识别条件所需行数的最大值"""
+        if self._reach is None:
+            reach, self._reach = 0, {}
+            for key, parser in self.parsers.items():
+                reach = max(reach, parser.signature.line_reach())
+                self._reach[key] = reach
+        return self._reach[platform_key]
+
+    def classify(self, file, lines):
+        """识别平台，无法识别时返回 None"""
+        return self.classifier.classify(file, lines)
+
+    def parse(self, platform_key, **context):
+        """调用平台对应的提取函数
+
+        Returns:
+            记录列表；platform_key 没有注册时返回 None
+        """
+        parser = self.parsers.get(platform_key)
+        if parser is None:
+            return None
+        context['platform_key'] = platform_key
+        return parser.parse(context)
+
+    def extract(self, documents, file, file_path, lines, backend=None, **context):
+        """识别平台并提取一份单据
+
+        先用首页（lines）识别平台；首页识别不出、或识别出的平台及优先级更高的平台中
+        有识别条件要看首页之后的文本，且还有后续页时，再读全文识别。
+        识别出平台后按其声明的页数和提取方式读取文本，调用提取函数。
+
+        Args:
+            documents: DocumentScan 对象
+            file: 文件名
+            file_path: 文件路径
+            lines: 前 HEAD_PAGES 页的文本行，见 iter_documents(pages=HEAD_PAGES)
+            backend: 指定文本提取方式，优先于平台声明的方式（对比不同提取方式时使用）
+            context: 其它输入，如 today、today_str
+
+        Returns:
+            (platform_key, records)；无法识别时 records 为 None
+        """
+        with run_report.stage('classify', file_path):
+            platform_key = self.classify(file, lines)
+        conclusive = platform_key is not None and self.reach(platform_key) <= len(lines)
+        if not conclusive and not documents.is_complete(file_path, backend):
+            all_lines = documents.read_text(file_path, None, backend)[1]
+            with run_report.stage('classify', file_path):
+                platform_key = self.classify(file, all_lines)
+        parser = self.parsers.get(platform_key)
+        if parser is None:
+            return platform_key, None
+        text, lines = documents.read_text(file_path, parser.pages, backend or parser.backend)
+        with run_report.stage('parse', file_path, platform_key):
+            records = self.parse(platform_key, file=file, text=text, lines=lines, **context)
+        return platform_key, records
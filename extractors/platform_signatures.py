@@ -0,0 +1,179 @@
+import re
+import math
+from bisect import bisect_left
+
+# ========== 平台识别规则 ===============
+# 识别条件由 InFile / InLines 组合而成，支持 | & ~ 运算，与原先逐个 any(...) 判断的语义一致。
+# 各类单据的平台按优先级注册在对应提取模块中（见 platform_registry），第一个满足条件的平台即为识别结果。
+# 多类单据共用的识别条件放在本模块。
+
+
+class Condition:
+    def __or__(self, other):
+        return AnyOf(self, other)
+
+    def __and__(self, other):
+        return AllOf(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def keywords(self):
+        raise NotImplementedError
+
+    def evaluate(self, hits):
+        raise NotImplementedError
+
+    def line_reach(self):
+        """判断条件需要看的行数：只看文件名时为 0，不限行数时为 math.inf；
+        只有前 line_reach() 行时，结论才与按全文判断一致"""
+        raise NotImplementedError
+
+
+class InFile(Condition):
+    """文件名包含关键字"""
+
+    def __init__(self, keyword):
+        self.keyword = keyword
+
+    def keywords(self):
+        return {self.keyword}
+
+    def evaluate(self, hits):
+        return self.keyword in hits.file_keywords
+
+    def line_reach(self):
+        return 0
+
+
+class InLines(Condition):
+    """lines[start:stop] 中任意一行包含关键字"""
+
+    def __init__(self, keyword, start=None, stop=None):
+        self.keyword = keyword
+        self.start = start
+        self.stop = stop
+
+    def keywords(self):
+        return {self.keyword}
+
+    def evaluate(self, hits):
+        indexes = hits.line_indexes.get(self.keyword)
+        if not indexes:
+            return False
+        start, stop, _ = slice(self.start, self.stop).indices(hits.line_count)
+        pos = bisect_left(indexes, start)
+        return pos < len(indexes) and indexes[pos] < stop
+
+    def line_reach(self):
+        return math.inf if self.stop is None or self.stop < 0 else self.stop
+
+
+class AnyOf(Condition):
+    def __init__(self, *conditions):
+        self.conditions = conditions
+
+    def keywords(self):
+        return set().union(*(c.keywords() for c in self.conditions))
+
+    def evaluate(self, hits):
+        return any(c.evaluate(hits) for c in self.conditions)
+
+    def line_reach(self):
+        return max(c.line_reach() for c in self.conditions)
+
+
+class AllOf(Condition):
+    def __init__(self, *conditions):
+        self.conditions = conditions
+
+    def keywords(self):
+        return set().union(*(c.keywords() for c in self.conditions))
+
+    def evaluate(self, hits):
+        return all(c.evaluate(hits) for c in self.conditions)
+
+    def line_reach(self):
+        return max(c.line_reach() for c in self.conditions)
+
+
+class Not(Condition):
+    def __init__(self, condition):
+        self.condition = condition
+
+    def keywords(self):
+        return self.condition.keywords()
+
+    def evaluate(self, hits):
+        return not self.condition.evaluate(hits)
+
+    def line_reach(self):
+        return self.condition.line_reach()
+
+
+class KeywordHits:
+    """一份单据中各关键字的命中位置"""
+
+    def __init__(self, file_keywords, line_indexes, line_count):
+        self.file_keywords = file_keywords  # 文件名中出现的关键字
+        self.line_indexes = line_indexes    # 关键字 -> 出现的行号（升序）
+        self.line_count = line_count
+
+
+class KeywordMatcher:
+    """把所有关键字编译成一个正则，每行只扫描一次
+
+    使用零宽前瞻在每个位置匹配最长的关键字，再补上它包含的较短关键字，
+    因此关键字之间互相包含（如“肯特瑞”与“肯特瑞基金”）时也不会漏判。
+    """
+
+    def __init__(self, keywords):
+        keywords = sorted(set(keywords), key=len, reverse=True)
+        self._pattern = re.compile('(?=(' + '|'.join(re.escape(k) for k in keywords) + '))')
+        self._contained = {k: [k2 for k2 in keywords if k2 in k] for k in keywords}
+
+    def find(self, text):
+        found = set()
+        for m in self._pattern.finditer(text):
+            found.update(self._contained[m.group(1)])
+        return found
+
+    def scan(self, file, lines):
+        line_indexes = {}
+        for i, line in enumerate(lines):
+            for keyword in self.find(line):
+                line_indexes.setdefault(keyword, []).append(i)
+        return KeywordHits(self.find(file), line_indexes, len(lines))
+
+
+class PlatformClassifier:
+    """按优先级识别单据所属平台"""
+
+    def __init__(self, signatures):
+        self.signatures = signatures
+        keywords = set()
+        for _, condition in signatures:
+            keywords |= condition.keywords()
+        self.matcher = KeywordMatcher(keywords)
+
+    def classify(self, file, lines):
+        """
+        Args:
+            file: 文件名
+            lines: PDF文本按行切分的列表
+
+        Returns:
+            平台标识；无法识别时返回 None
+        """
+        hits = self.matcher.scan(file, lines)
+        for platform_key, condition in self.signatures:
+            if condition.evaluate(hits):
+                return platform_key
+        return None
+
+
+# 宁波银行：文件名含“宁波”（排除联泰北极星），或后文出现“宁波银行”且前五行不是联泰
+NINGBO_BANK = (
+    (InFile('宁波') & ~InFile('北极星'))
+    | (InLines('宁波银行', 15) & ~InLines('联泰', 0, 5))
+)
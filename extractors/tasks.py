@@ -0,0 +1,58 @@
+import importlib
+
+# ========== 提取任务清单 ===============
+# (类型, 中文名, 模块, 入口函数, 使用的映射文件)
+# 映射文件：'product' 为 product_codes.json，'conversion' 为 product_codes_conversion.json
+EXTRACT_TASKS = [
+    ('dividend', '分红单', 'extractors.dividend_extractor', 'run_dividend_extract', 'product'),
+    ('purchase', '申购申请单', 'extractors.purchase_extractor', 'run_purchase_extract', 'product'),
+    ('purchase_confirm', '申购确认单', 'extractors.purchase_confirm_extractor', 'run_purchase_confirm_extract', 'product'),
+    ('redemption', '赎回确认单', 'extractors.redemption_extractor', 'run_redemption_extract', 'product'),
+    ('conversion', '超级转换确认单', 'extractors.conversion_extractor', 'run_conversion_extract', 'conversion'),
+    ('manual_purchase_apply', '万事如意申购申请单', 'extractors.manual_purchase_apply_extractor', 'run_manual_purchase_apply_extract', 'product'),
+    ('manual_purchase_confirm', '万事如意申购确认单', 'extractors.manual_purchase_confirm_extractor', 'run_manual_purchase_confirm_extract', 'product'),
+    ('manual_redemption', '万事如意赎回确认单', 'extractors.manual_redemption_extractor', 'run_manual_redemption_extract', 'product'),
+    ('manual_dividend', '万事如意红利除权单', 'extractors.manual_dividen_extractor', 'run_manual_dividend_extract', 'product'),
+]
+
+TASK_TYPES = [task[0] for task in EXTRACT_TASKS]
+TASK_NAMES = {task[0]: task[1] for task in EXTRACT_TASKS}
+
+# 万事如意单据走OCR，共用同一个 EasyOCR 模型
+OCR_TASK_TYPES = {'manual_purchase_apply', 'manual_purchase_confirm', 'manual_redemption', 'manual_dividend'}
+
+# 各类型的输出文件名（不含扩展名），也是 single_workbook 模式下的工作表名
+OUTPUT_BASENAMES = {
+    'dividend': '【境内基金业务】红利再投',
+    'purchase': '【境内基金业务】申购申请',
+    'purchase_confirm': '【境内基金业务】申购确认',
+    'redemption': '【境内基金业务】赎回确认',
+    'conversion': '【境内基金业务】超级转换确认',
+    'manual_purchase_apply': '【境内理财产品】申购申请',
+    'manual_purchase_confirm': '【境内理财产品】申购确认',
+    'manual_redemption': '【境内理财产品】赎回确认',
+    'manual_dividend': '【境内理财产品】红利除权',
+}
+
+_TASKS_BY_TYPE = {task[0]: task for task in EXTRACT_TASKS}
+
+
+def load_extract_func(task_type):
+    """按类型导入提取器模块并返回入口函数
+
+    Args:
+        task_type: EXTRACT_TASKS 中的类型，如 'dividend'
+
+    Returns:
+        run_*_extract 函数
+    """
+    _, _, module_name, func_name, _ = _TASKS_BY_TYPE[task_type]
+    module = importlib.import_module(module_name)
+    return getattr(module, func_name)
+
+
+def mapping_path_for(task_type, json_path, conversion_json_path):
+    """返回该类型使用的产品代码映射文件路径"""
+    if _TASKS_BY_TYPE[task_type][4] == 'conversion':
+        return conversion_json_path
+    return json_path
@@ -1,20 +1,17 @@
 import os
+import multiprocessing
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 import threading
 import subprocess
 import time
+from datetime import datetime
 from ui.modern_widgets import ModernButton, ModernEntry
 from ui.product_code_manager import ProductCodeManager
-from extractors.dividend_extractor import run_dividend_extract
-from extractors.purchase_extractor import run_purchase_extract
-from extractors.purchase_confirm_extractor import run_purchase_confirm_extract
-from extractors.redemption_extractor import run_redemption_extract
-from extractors.conversion_extractor import run_conversion_extract
-from extractors.manual_purchase_apply_extractor import run_manual_purchase_apply_extract
-from extractors.manual_redemption_extractor import run_manual_redemption_extract
-from extractors.manual_purchase_confirm_extractor import run_manual_purchase_confirm_extract
-from extractors.manual_dividen_extractor import run_manual_dividend_extract
+from ui.log_sink import QueueLogSink
+# 提取器模块及 pandas、pdfplumber 等依赖在首次使用时才导入，窗口可以立即显示
+from extractors.tasks import EXTRACT_TASKS, load_extract_func, mapping_path_for
+from utils import manifest, ocr_engine, ocr_templates, output, run_log, run_report, warmup, watch
 
 DEFAULT_JSON_FILENAME = "product_codes.json"
 DEFAULT_CONVERSION_JSON_FILENAME = "product_codes_conversion.json"  # 新增
@@ -39,8 +36,11 @@ class MainApp(tk.Tk):
         self.conversion_json_path = os.path.join(self.folder_path, DEFAULT_CONVERSION_JSON_FILENAME)  # 新增
         self.status = None  # 用于记录最近一次输出目录
         self.is_extracting = False  # 添加标志位防止重复执行
+        self.watch_stop = None  # 监控模式运行时为 threading.Event，置位后停止监控
         self.create_widgets()
         self.center_window()
+        # 操作员选择文件夹期间，在后台预先导入重型依赖
+        warmup.start_warmup()
 
     def center_window(self):
         screen_width = self.winfo_screenwidth()
@@ -333,6 +333,17 @@ class MainApp(tk.Tk):
             text="打开输出文件夹",
             command=self.open_output_folder
         ).pack(side=tk.LEFT, padx=5)  # 放在一键提取按钮旁边
+
+        # 监控模式：新单据写完后自动提取；可填每天定时提取的时刻，如 09:30,14:00
+        self.watch_btn = ModernButton(
+            one_click_frame,
+            text="监控当天目录",
+            command=self.toggle_watch
+        )
+        self.watch_btn.pack(side=tk.LEFT, padx=5)
+        tk.Label(one_click_frame, text="定时:", font=('微软雅黑', 9), bg='#ffffff').pack(side=tk.LEFT)
+        self.watch_times_entry = ModernEntry(one_click_frame, width=12)
+        self.watch_times_entry.pack(side=tk.LEFT, padx=(2, 5))
         
         # 添加显示/隐藏复选框
         self.show_advanced = tk.BooleanVar(value=False)
@@ -346,6 +357,64 @@ class MainApp(tk.Tk):
             activebackground='#ffffff'
         ).pack(side=tk.RIGHT, padx=10)
 
+        # 显示逐目录、逐文件的过程日志，文件较多时可取消勾选
+        self.verbose_log = tk.BooleanVar(value=True)
+        tk.Checkbutton(
+            one_click_frame,
+            text="显示详细日志",
+            variable=self.verbose_log,
+            command=lambda: self.log_sink.set_verbose(self.verbose_log.get()),
+            bg='#ffffff',
+            font=('微软雅黑', 9),
+            activebackground='#ffffff'
+        ).pack(side=tk.RIGHT, padx=10)
+
+        # 预加载OCR模型：处理万事如意单据前勾选，可省去首次识别时的模型加载时间
+        self.preload_ocr = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            one_click_frame,
+            text="预加载OCR模型",
+            variable=self.preload_ocr,
+            command=self.toggle_preload_ocr,
+            bg='#ffffff',
+            font=('微软雅黑', 9),
+            activebackground='#ffffff'
+        ).pack(side=tk.RIGHT, padx=10)
+
+        # 输出文件默认沿用原来的 .xls 文件名，勾选后改用与内容一致的 .xlsx
+        self.xlsx_names = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            one_click_frame,
+            text="使用.xlsx扩展名",
+            variable=self.xlsx_names,
+            command=lambda: output.configure(legacy_names=not self.xlsx_names.get()),
+            bg='#ffffff',
+            font=('微软雅黑', 9),
+            activebackground='#ffffff'
+        ).pack(side=tk.RIGHT, padx=10)
+
+        # 全部重新提取：删除当天的处理清单，不沿用上次运行的记录（提取逻辑或单据有问题需要重跑时勾选）
+        self.full_extract = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            one_click_frame,
+            text="全部重新提取",
+            variable=self.full_extract,
+            bg='#ffffff',
+            font=('微软雅黑', 9),
+            activebackground='#ffffff'
+        ).pack(side=tk.RIGHT, padx=10)
+
+        # 深度分析：运行报告之外再用 cProfile 记录调用耗时，会使提取变慢
+        self.deep_profile = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            one_click_frame,
+            text="深度分析",
+            variable=self.deep_profile,
+            bg='#ffffff',
+            font=('微软雅黑', 9),
+            activebackground='#ffffff'
+        ).pack(side=tk.RIGHT, padx=10)
+
         # 创建一个专门的容器来放置advanced_frame（新增这部分）
         self.advanced_container = tk.Frame(main_container, bg='#ffffff')
         self.advanced_container.pack(fill=tk.X, pady=0)
@@ -424,6 +493,10 @@ class MainApp(tk.Tk):
         )
         self.log_text.pack(fill=tk.BOTH, expand=True)
         self.log_text.config(state=tk.DISABLED)
+        # 提取线程只向日志队列写入，由主线程定时批量刷新到文本框
+        self.log_sink = QueueLogSink(self.log_text)
+        self.log_sink.set_verbose(self.verbose_log.get())
+        self.log_sink.start()
 
     def select_folder(self):
         folder_path = filedialog.askdirectory()
@@ -468,6 +541,11 @@ class MainApp(tk.Tk):
             self.advanced_container.pack_forget()
             self.geometry("900x750")
 
+    def toggle_preload_ocr(self):
+        """勾选后在后台加载OCR模型"""
+        if self.preload_ocr.get() and not ocr_engine.is_loaded():
+            warmup.start_warmup(preload_ocr=True)
+
     def extract_all(self):
         """一键提取所有单据"""
         if self.is_extracting:
@@ -488,38 +566,43 @@ class MainApp(tk.Tk):
             return
         
         # 清空日志
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.insert(tk.END, "========== 开始一键提取所有单据 ==========\n\n")
-        self.log_text.config(state=tk.DISABLED)
+        self.log_sink.clear()
+        self.log_sink.write("========== 开始一键提取所有单据 ==========\n")
         
         def task():
             self.is_extracting = True
+            run_log.new_run()
+            run_report.start(self.deep_profile.get())
+            ocr_templates.reset_learn_failures()
+            self.reset_manifest_if_full()
             self.one_click_btn.config(state=tk.DISABLED, text="正在提取中...")
             
-            # 定义提取顺序和对应的任务
+            # 提取顺序和对应的任务见 extractors.tasks.EXTRACT_TASKS
             extract_tasks = [
-                ('dividend', '分红单', run_dividend_extract, self.json_path),
-                ('purchase', '申购申请单', run_purchase_extract, self.json_path),
-                ('purchase_confirm', '申购确认单', run_purchase_confirm_extract, self.json_path),
-                ('redemption', '赎回确认单', run_redemption_extract, self.json_path),
-                ('conversion', '超级转换确认单', run_conversion_extract, self.conversion_json_path),
-                ('manual_purchase_apply', '万事如意申购申请单', run_manual_purchase_apply_extract, self.json_path),
-                ('manual_purchase_confirm', '万事如意申购确认单', run_manual_purchase_confirm_extract, self.json_path),
-                ('manual_redemption', '万事如意赎回确认单', run_manual_redemption_extract, self.json_path),
-                ('manual_dividend', '万事如意红利除权单', run_manual_dividend_extract, self.json_path)
+                (task_type, task_name, mapping_path_for(task_type, self.json_path, self.conversion_json_path))
+                for task_type, task_name, _, _, _ in EXTRACT_TASKS
             ]
             
+            documents = None
             try:
-                for task_type, task_name, extract_func, json_path in extract_tasks:
+                from utils.document_scan import scan_documents
+
+                # 只遍历一次目标目录并提取一次PDF文本，供所有提取器共享
+                today = datetime.now()
+                target_path = os.path.join(self.folder_path, str(today.year), today.strftime('%Y%m%d'), "1场外开基")
+                # 处理清单中未变化的文件由提取器直接沿用记录，不预取文本
+                unchanged = manifest.current_files(os.path.dirname(target_path), [t for t, _, _ in extract_tasks])
+                documents = run_report.profiled(scan_documents, target_path, self.log_sink, prefetch=True,
+                                                skip=unchanged)
+
+                for task_type, task_name, json_path in extract_tasks:
                     # 在日志中添加分隔线
-                    self.log_text.config(state=tk.NORMAL)
-                    self.log_text.insert(tk.END, f"\n---------- 正在提取{task_name} ----------\n")
-                    self.log_text.see(tk.END)
-                    self.log_text.config(state=tk.DISABLED)
+                    self.log_sink.write(f"\n---------- 正在提取{task_name} ----------")
                     
                     # 执行提取任务
-                    result = extract_func(self.folder_path, json_path, self.log_text)
+                    extract_func = load_extract_func(task_type)
+                    with run_report.task(task_type):
+                        result = run_report.profiled(extract_func, self.folder_path, json_path, self.log_sink, documents)
                     if result:
                         self.status = result
                     
@@ -527,27 +610,90 @@ class MainApp(tk.Tk):
                     time.sleep(0.5)
                 
                 # 完成所有任务
-                self.log_text.config(state=tk.NORMAL)
-                self.log_text.insert(tk.END, "\n========== 所有单据提取完成！ ==========\n")
-                self.log_text.see(tk.END)
-                self.log_text.config(state=tk.DISABLED)
+                self.log_sink.write("\n========== 所有单据提取完成！ ==========")
                 
                 messagebox.showinfo("完成", "所有单据提取完成！")
                 
             except Exception as e:
-                self.log_text.config(state=tk.NORMAL)
-                self.log_text.insert(tk.END, f"\n错误：{str(e)}\n")
-                self.log_text.see(tk.END)
-                self.log_text.config(state=tk.DISABLED)
+                self.log_sink.write(f"\n错误：{str(e)}")
                 messagebox.showerror("错误", f"提取过程中出现错误：{str(e)}")
             finally:
+                # 任务结束后关闭文本提取进程池，释放OCR模型占用的内存
+                if documents is not None:
+                    documents.close()
+                ocr_engine.shutdown()
+                self.write_run_report()
                 self.is_extracting = False
                 self.one_click_btn.config(state=tk.NORMAL, text="一键提取所有单据")
         
         # 在新线程中执行任务
         threading.Thread(target=task, daemon=True).start()
 
+    def toggle_watch(self):
+        """开始或停止监控当天目录"""
+        if self.watch_stop is not None:
+            self.watch_stop.set()
+            self.watch_stop = None
+            self.watch_btn.config(text="监控当天目录")
+            return
+
+        if not self.folder_path:
+            messagebox.showwarning("警告", "请先选择文件夹！")
+            return
+        if not os.path.exists(self.json_path) or not os.path.exists(self.conversion_json_path):
+            messagebox.showwarning("警告", "映射文件不存在！")
+            return
+        try:
+            times = watch.parse_times(self.watch_times_entry.get())
+        except ValueError:
+            messagebox.showwarning("警告", "定时格式应为 HH:MM，多个时刻用逗号分隔，如 09:30,14:00")
+            return
+
+        self.watch_stop = threading.Event()
+        self.watch_btn.config(text="停止监控")
+        threading.Thread(target=self.watch_loop, args=(self.watch_stop, times), daemon=True).start()
+
+    def watch_loop(self, stop_event, times):
+        """监控线程：有新单据或到达定时时刻时依次执行所有类型的提取"""
+        def run(run_date, documents):
+            # 一键提取正在执行时等它结束
+            while self.is_extracting and not stop_event.is_set():
+                time.sleep(1)
+            if stop_event.is_set():
+                return
+            self.is_extracting = True
+            run_log.new_run()
+            run_report.start(self.deep_profile.get())
+            ocr_templates.reset_learn_failures()
+            try:
+                for task_type, task_name, _, _, _ in EXTRACT_TASKS:
+                    self.log_sink.write(f"\n---------- 正在提取{task_name} ----------")
+                    json_path = mapping_path_for(task_type, self.json_path, self.conversion_json_path)
+                    extract_func = load_extract_func(task_type)
+                    with run_report.task(task_type):
+                        result = run_report.profiled(extract_func, self.folder_path, json_path, self.log_sink,
+                                                     documents, run_date)
+                    if result:
+                        self.status = result
+                self.log_sink.write(f"\n========== {datetime.now().strftime('%H:%M:%S')} 提取完成，继续监控 ==========")
+            finally:
+                self.write_run_report()
+                self.is_extracting = False
+
+        try:
+            watch.watch(self.folder_path, run, times=times, stop_event=stop_event, log_text=self.log_sink)
+        except Exception as e:
+            self.log_sink.write(f"\n监控出错：{str(e)}")
+        finally:
+            # 监控期间保留OCR模型，停止后再释放
+            ocr_engine.shutdown()
+
     def start_extract(self, extract_type):
+        # 与一键提取、监控共用 is_extracting：同一时间只有一次运行，运行报告不会互相覆盖
+        if self.is_extracting:
+            messagebox.showinfo("提示", "正在执行提取任务，请稍候...")
+            return
+
         if not self.folder_path:
             messagebox.showwarning("警告", "请先选择文件夹！")
             return
@@ -562,39 +708,56 @@ class MainApp(tk.Tk):
                 messagebox.showwarning("警告", "映射文件不存在！")
                 return
 
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.config(state=tk.DISABLED)
+        self.log_sink.clear()
+        # 在启动线程前置位，监控线程在此之后不会再开始新的一次提取
+        self.is_extracting = True
 
         def task():
+            run_log.new_run()
+            run_report.start(self.deep_profile.get())
+            ocr_templates.reset_learn_failures()
+            self.reset_manifest_if_full()
             try:
-                result = None
-                if extract_type == 'dividend':
-                    result = run_dividend_extract(self.folder_path, self.json_path, self.log_text)
-                elif extract_type == 'purchase':
-                    result = run_purchase_extract(self.folder_path, self.json_path, self.log_text)
-                elif extract_type == 'purchase_confirm':
-                    result = run_purchase_confirm_extract(self.folder_path, self.json_path, self.log_text)
-                elif extract_type == 'redemption':
-                    result = run_redemption_extract(self.folder_path, self.json_path, self.log_text)
-                elif extract_type == 'conversion':
-                    # 传递转换单专用的映射文件路径
-                    result = run_conversion_extract(self.folder_path, self.conversion_json_path, self.log_text)
-                elif extract_type == 'manual_purchase_apply':
-                    result = run_manual_purchase_apply_extract(self.folder_path, self.json_path, self.log_text)
-                elif extract_type == 'manual_purchase_confirm':
-                    result = run_manual_purchase_confirm_extract(self.folder_path, self.json_path, self.log_text)
-                elif extract_type == 'manual_redemption':
-                    result = run_manual_redemption_extract(self.folder_path, self.json_path, self.log_text)
-                elif extract_type == 'manual_dividend':
-                    result = run_manual_dividend_extract(self.folder_path, self.json_path, self.log_text)
+                # 首次提取某类单据时才导入对应的提取器模块
+                extract_func = load_extract_func(extract_type)
+                # 超级转换确认单使用转换单专用的映射文件
+                json_path = mapping_path_for(extract_type, self.json_path, self.conversion_json_path)
+                with run_report.task(extract_type):
+                    result = run_report.profiled(extract_func, self.folder_path, json_path, self.log_sink)
                 if result:
                     self.status = result
             except Exception as e:
                 messagebox.showerror("错误", str(e))
+            finally:
+                ocr_engine.shutdown()
+                self.write_run_report()
+                self.is_extracting = False
 
         threading.Thread(target=task, daemon=True).start()
 
+    def reset_manifest_if_full(self):
+        """勾选了全部重新提取时删除当天的处理清单，与命令行的 --full 相同"""
+        if not self.full_extract.get():
+            return
+        today = datetime.now()
+        manifest.reset(os.path.join(self.folder_path, str(today.year), today.strftime('%Y%m%d')))
+        self.log_sink.write("已删除当天的处理清单，全部单据重新提取")
+
+    def write_run_report(self):
+        """结束本次运行的耗时记录，写到当天的输出目录"""
+        report = run_report.finish()
+        today = datetime.now()
+        output_folder = os.path.join(self.folder_path, str(today.year), today.strftime('%Y%m%d'))
+        if report is None or not os.path.isdir(output_folder):
+            return
+        try:
+            paths = report.write(output_folder)
+            self.log_sink.write(f"运行报告已保存到: {paths['html']}")
+            if paths['profile']:
+                self.log_sink.write(f"cProfile 结果已保存到: {paths['profile']}")
+        except Exception as e:
+            self.log_sink.write(f"写入运行报告失败: {e}")
+
     def open_output_folder(self):
         if self.status and os.path.isdir(self.status):
             try:
@@ -608,5 +771,7 @@ class MainApp(tk.Tk):
             messagebox.showwarning("警告", "没有可用的输出文件夹！")
 
 if __name__ == "__main__":
+    # 打包为exe后，进程池的子进程需要此调用才能正常启动
+    multiprocessing.freeze_support()
     app = MainApp()
     app.mainloop()
@@ -0,0 +1,37 @@
+from utils import document_scan
+from utils.document_scan import DocumentScan
+
+
+class FakeExecutor:
+    def __init__(self):
+        self.closed = False
+
+    def shutdown(self):
+        self.closed = True
+
+
+def test_prefetches_share_one_executor_until_close(monkeypatch):
+    created = []
+    used = []
+
+    def new_executor(workers):
+        created.append(FakeExecutor())
+        return created[-1]
+
+    def extract_pdf_texts(file_paths, workers, pages, starts, backend, executor):
+        used.append(executor)
+        return [((['text\n'], 1), None, {}) for _ in file_paths]
+
+    monkeypatch.setattr(document_scan, '_new_executor', new_executor)
+    monkeypatch.setattr(document_scan, 'extract_pdf_texts', extract_pdf_texts)
+
+    # 与 iter_documents 一样逐个子文件夹预取
+    with DocumentScan('root', [], workers=2) as documents:
+        documents.prefetch(['a/1.pdf', 'a/2.pdf'])
+        documents.prefetch(['b/1.pdf', 'b/2.pdf'])
+        # 只有一个文件时在当前进程提取，不用进程池
+        documents.prefetch(['c/1.pdf'])
+    assert len(created) == 1
+    assert used == [created[0], created[0], None]
+    assert created[0].closed
+    assert documents._executor is None
@@ -0,0 +1,26 @@
+import os
+import sys
+import subprocess
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUI_MAIN = os.path.join(ROOT, "main - 基金单提取程序.py")
+
+# 界面启动时不应导入的重型依赖，由 utils.warmup 在窗口出现后于后台导入
+HEAVY_MODULES = ('fitz', 'pymupdf', 'pandas', 'numpy', 'pdfplumber', 'openpyxl')
+
+CHECK = f"""
+import sys, importlib.util
+sys.path.insert(0, {ROOT!r})
+spec = importlib.util.spec_from_file_location('gui_main', {GUI_MAIN!r})
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))
+"""
+
+
+def test_gui_module_imports_without_heavy_dependencies():
+    pytest.importorskip('tkinter')
+    # 在新进程中导入，不受本进程中已导入模块的影响
+    result = subprocess.run([sys.executable, '-c', CHECK], capture_output=True, text=True, encoding='utf-8')
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ''
@@ -0,0 +1,30 @@
+import os
+from utils.manifest import FileManifest, current_files
+
+
+def _process(output_folder, task, file_path, failed=False):
+    entries = FileManifest(output_folder, task)
+    entries.begin(file_path)
+    entries.commit(file_path, failed=failed)
+
+
+def test_current_files_lists_only_unchanged_successful_files(tmp_path):
+    output_folder = str(tmp_path)
+    paths = {}
+    for name in ('same', 'changed', 'failed', 'other_task'):
+        paths[name] = str(tmp_path / f'{name}.pdf')
+        with open(paths[name], 'wb') as f:
+            f.write(b'%PDF-1.4')
+    _process(output_folder, 'dividend', paths['same'])
+    _process(output_folder, 'dividend', paths['changed'])
+    _process(output_folder, 'dividend', paths['failed'], failed=True)
+    _process(output_folder, 'purchase', paths['other_task'])
+
+    with open(paths['changed'], 'ab') as f:
+        f.write(b'\n%%EOF')
+    assert current_files(output_folder, ['dividend']) == {paths['same']}
+    assert current_files(output_folder, ['dividend', 'purchase']) == {paths['same'], paths['other_task']}
+
+    os.remove(paths['same'])
+    assert current_files(output_folder, ['dividend']) == set()
+    assert current_files(str(tmp_path / 'missing'), ['dividend']) == set()
@@ -0,0 +1,61 @@
+from datetime import datetime
+from extractors.dividend_extractor import DIVIDEND_PARSERS
+from extractors.purchase_confirm_extractor import PURCHASE_CONFIRM_PARSERS
+from extractors.redemption_extractor import REDEMPTION_PARSERS
+
+
+class TwoPageDocuments:
+    """只有两页文本的 DocumentScan 替身，记录读取了多少页"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def read_text(self, file_path, pages=None, backend=None):
+        self.requested.append(pages)
+        text = '\n'.join(self.pages if pages is None else self.pages[:pages])
+        return text, text.split('\n')
+
+    def is_complete(self, file_path, backend=None):
+        return False
+
+
+# 好买基金的超级转换确认单：首页与赎回/申购确认单相同，"转换" 只出现在第二页
+CONVERSION_PAGES = [
+    '好买基金\n交易确认单\n账户名称 某某集合资产管理计划\n确认金额 1,000.00',
+    '业务类型 基金超级转换\n转换确认份额 1,000.00',
+]
+
+
+def _extract(registry, pages):
+    documents = TwoPageDocuments(pages)
+    head_lines = documents.read_text('x.pdf', 1)[1]
+    today = datetime(2025, 12, 18)
+    platform_key, _ = registry.extract(documents, 'x.pdf', 'x.pdf', head_lines,
+                                       today=today, today_str=today.strftime('%Y%m%d'))
+    return platform_key, documents
+
+
+def test_conversion_with_keyword_on_second_page_is_not_redemption():
+    platform_key, documents = _extract(REDEMPTION_PARSERS, CONVERSION_PAGES)
+    assert platform_key != 'haomai'
+    assert None in documents.requested  # 排除条件看全文
+
+
+def test_conversion_with_keyword_on_second_page_is_not_purchase_confirm():
+    platform_key, _ = _extract(PURCHASE_CONFIRM_PARSERS, CONVERSION_PAGES)
+    assert platform_key != 'haomai'
+
+
+def test_haomai_statement_without_conversion_still_matches():
+    pages = [CONVERSION_PAGES[0], '第2页 备注']
+    platform_key, _ = _extract(REDEMPTION_PARSERS, pages)
+    assert platform_key == 'haomai'
+
+
+def test_higher_priority_platform_on_second_page_wins():
+    # 首页命中兴证全球，但优先级更高的天天基金（不限行数）出现在第二页，按全文应识别为天天基金
+    pages = ['兴证全球基金\n分红确认单\n账户名称 某某集合资产管理计划', '天天基金\n第2页']
+    platform_key, documents = _extract(DIVIDEND_PARSERS, pages)
+    assert platform_key == 'tiantian'
+    assert None in documents.requested
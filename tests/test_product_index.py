@@ -0,0 +1,69 @@
+import pytest
+from utils import product_index
+from utils.product_index import (ProductIndex, canonical_name, MATCH_EXACT, MATCH_CANONICAL,
+                                 MATCH_PREFIX, MATCH_FUZZY, FUZZY_THRESHOLD)
+
+CODES = {
+    '华泰证券资管恒益18号集合资产管理计划': 'HT18',
+    '华泰证券资管恒益28号集合资产管理计划': 'HT28',
+    '中信证券稳健增利债券型证券投资基金A': 'ZXA',
+    '国泰君安君得利安心收益集合资产管理计划': 'GTSY',
+    '国泰君安君得利安心成长集合资产管理计划': 'GTCZ',
+    '招商资管智远成长灵活配置一号集合资产管理计划': 'ZSZY',
+}
+
+
+@pytest.fixture
+def index():
+    return ProductIndex(CODES)
+
+
+def _score(index, name):
+    return index._rank(canonical_name(name))[0][0]
+
+
+def test_exact_and_canonical_names(index):
+    assert index.resolve('华泰证券资管恒益18号集合资产管理计划') == ('HT18', MATCH_EXACT, '华泰证券资管恒益18号集合资产管理计划', 1.0)
+    # 全角数字、空格和换行规范化后相同
+    code, how, name, score = index.resolve('华泰证券资管恒益１８号 集合资产\n管理计划')
+    assert (code, how, name, score) == ('HT18', MATCH_CANONICAL, '华泰证券资管恒益18号集合资产管理计划', 1.0)
+
+
+def test_truncated_name_matching_one_product(index):
+    code, how, name, _ = index.resolve('招商资管智远成长灵活配置一号集合资产管理')
+    assert (code, how, name) == ('ZSZY', MATCH_PREFIX, '招商资管智远成长灵活配置一号集合资产管理计划')
+
+
+def test_truncated_name_matching_several_products_is_rejected(index):
+    # "收益" 和 "成长" 两个产品都以此开头
+    assert index.resolve('国泰君安君得利安心') is None
+    # 在数字中间截断的名称不按前缀匹配（"恒益1" 可能是 18号，也可能是 1号）
+    assert index.resolve('华泰证券资管恒益1') is None
+
+
+def test_fuzzy_threshold_boundary(index, monkeypatch):
+    name = '华泰证券资管恒益18号集合资产管理计画'
+    score = _score(index, name)
+    assert score >= FUZZY_THRESHOLD
+    assert index.resolve(name)[:2] == ('HT18', MATCH_FUZZY)
+
+    monkeypatch.setattr(product_index, 'FUZZY_THRESHOLD', score)
+    assert ProductIndex(CODES).resolve(name)[:2] == ('HT18', MATCH_FUZZY)
+    monkeypatch.setattr(product_index, 'FUZZY_THRESHOLD', score + 1e-9)
+    assert ProductIndex(CODES).resolve(name) is None
+
+
+def test_names_differing_in_digits_are_not_matched():
+    codes = {'华泰证券资管恒益18号集合资产管理计划（第一期）': 'HT18'}
+    index = ProductIndex(codes)
+    name = '华泰证券资管恒益19号集合资产管理计划（第一期）'
+    assert _score(index, name) >= FUZZY_THRESHOLD
+    assert index.resolve(name) is None
+
+
+def test_names_differing_in_share_class_are_not_matched(index):
+    name = '中信证券稳健增利债券型证券投资基金C'
+    assert _score(index, name) >= FUZZY_THRESHOLD
+    assert index.resolve(name) is None
+    # 同一份额类别的不同写法仍能匹配
+    assert index.resolve('中信证券稳健增利债券型证券投资基金 A类')[:2] == ('ZXA', MATCH_FUZZY)
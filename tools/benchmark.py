@@ -0,0 +1,236 @@
+"""各类单据提取的吞吐量测试
+
+用 tools/synthetic_corpus.py 生成指定数量的合成单据，逐个类型、逐个规模测量：
+扫描目录、提取PDF文本、解析并写出三个阶段的耗时，每秒处理的文件数，以及峰值内存。
+每个测试在单独的子进程中运行，峰值内存互不影响；语料生成的时间不计入结果。
+万事如意单据在安装了 EasyOCR 时生成为扫描件（测的是OCR），否则写入文字（测的是文本层读取）。
+
+用法:
+    python tools/benchmark.py
+    python tools/benchmark.py --sizes 10,100 --types dividend,redemption --pdf-backend pymupdf --json bench.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import subprocess
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors.tasks import TASK_TYPES, OCR_TASK_TYPES, load_extract_func, mapping_path_for
+from utils import manifest
+from utils.document_scan import HEAD_PAGES, scan_documents
+from utils.pdf_backends import BACKENDS, DEFAULT_BACKEND
+from tools.synthetic_corpus import generate_corpus
+
+DEFAULT_SIZES = (10, 100, 1000)
+BENCH_DATE = '20251218'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="各类单据提取的吞吐量测试")
+    parser.add_argument('--sizes', default=','.join(str(n) for n in DEFAULT_SIZES),
+                        help="每类单据的文件数，逗号分隔，默认 10,100,1000")
+    parser.add_argument('--types', default='all', help="单据类型，逗号分隔，默认 all。可选: " + ', '.join(TASK_TYPES))
+    parser.add_argument('--pdf-backend', choices=list(BACKENDS), help=f"PDF文本提取方式，默认 {DEFAULT_BACKEND}")
+    parser.add_argument('--jobs', type=int, help="并行提取PDF文本的进程数，默认CPU核数-1")
+    parser.add_argument('--cache', action='store_true', help="使用PDF文本缓存（默认关闭，测量的是首次提取）")
+    parser.add_argument('--seed', type=int, default=0, help="语料的随机种子，默认 0")
+    parser.add_argument('--workdir', help="语料目录，默认使用临时目录并在结束后删除")
+    parser.add_argument('--json', dest='json_path', help="同时把完整结果写入该 JSON 文件")
+    # 内部使用：在子进程中运行单个测试
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def ocr_available():
+    """是否安装了 EasyOCR"""
+    try:
+        import easyocr  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def peak_rss_mb():
+    """本进程及已结束的子进程（文本提取进程池）的峰值内存，单位 MB
+
+    Unix 使用 resource，Windows 上有 psutil 时使用 psutil；都不可用时为 None。
+
+    Returns:
+        (本进程, 子进程)
+    """
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        # ru_maxrss 在 Linux 上为 KB，在 macOS 上为字节
+        unit = 1024 * 1024 if sys.platform == 'darwin' else 1024
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit
+        children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit
+        return round(own, 1), round(children, 1)
+    try:
+        import psutil
+    except ImportError:
+        return None, None
+    info = psutil.Process().memory_info()
+    return round(getattr(info, 'peak_wset', info.rss) / 1024 / 1024, 1), None
+
+
+def run_case(task_type, root, backend=None, jobs=None, cache=False):
+    """在当前进程中测量一个类型的提取
+
+    Args:
+        task_type: 单据类型
+        root: 语料主目录（含 product_codes.json）
+        backend: PDF文本提取方式
+        jobs: 文本提取进程数
+        cache: 是否使用PDF文本缓存
+
+    Returns:
+        结果字典：各阶段耗时、是否成功、峰值内存
+    """
+    run_date = datetime.strptime(BENCH_DATE, '%Y%m%d')
+    target_path = os.path.join(root, str(run_date.year), BENCH_DATE, "1场外开基")
+    json_path = mapping_path_for(task_type, os.path.join(root, 'product_codes.json'),
+                                 os.path.join(root, 'product_codes_conversion.json'))
+    extract_func = load_extract_func(task_type)
+    # 与 cli --full 一致：删除处理清单，每次都完整提取，不沿用上一次测试的记录
+    manifest.reset(os.path.dirname(target_path))
+
+    # 提取器逐条打印日志，测试时不输出
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        documents = scan_documents(target_path, None, workers=jobs, cache=None if cache else False, backend=backend)
+        scan_seconds = time.perf_counter() - start
+
+        # 与 cli 一致：文字版单据先统一提取首页文本，万事如意单据在提取器中逐份识别
+        start = time.perf_counter()
+        if task_type not in OCR_TASK_TYPES:
+            documents.prefetch(documents.pdf_paths(), HEAD_PAGES)
+        text_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        output = extract_func(root, json_path, None, documents=documents, run_date=run_date)
+        parse_seconds = time.perf_counter() - start
+        if documents is not None:
+            documents.close()
+
+    own_rss, worker_rss = peak_rss_mb()
+    return {
+        'scan_seconds': round(scan_seconds, 3),
+        'text_seconds': round(text_seconds, 3),
+        'parse_seconds': round(parse_seconds, 3),
+        'ok': bool(output),
+        'peak_rss_mb': own_rss,
+        'worker_peak_rss_mb': worker_rss,
+    }
+
+
+def _run_case_subprocess(task_type, root, args):
+    """在子进程中运行单个测试，返回结果字典"""
+    fd, out_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    cmd = [sys.executable, os.path.abspath(__file__), '--case', task_type, '--workdir', root, '--out', out_path]
+    if args.pdf_backend:
+        cmd += ['--pdf-backend', args.pdf_backend]
+    if args.jobs:
+        cmd += ['--jobs', str(args.jobs)]
+    if args.cache:
+        cmd.append('--cache')
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+        with open(out_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.remove(out_path)
+
+
+def run_benchmark(task_types, sizes, workdir, args):
+    """生成语料并逐个运行测试
+
+    Returns:
+        结果列表，每项为 {'type', 'files', 'scanned', 各阶段耗时, 'files_per_second', 峰值内存}
+    """
+    scan = ocr_available()
+    run_date = datetime.strptime(BENCH_DATE, '%Y%m%d')
+    report = []
+    for task_type in task_types:
+        for size in sizes:
+            root = os.path.join(workdir, f"{task_type}_{size}")
+            if not os.path.isdir(root):
+                generate_corpus(root, run_date, size, [task_type], args.seed, scan=scan)
+            result = {'type': task_type, 'files': size, 'scanned': scan and task_type in OCR_TASK_TYPES}
+            result.update(_run_case_subprocess(task_type, root, args))
+            if 'error' not in result:
+                total = result['scan_seconds'] + result['text_seconds'] + result['parse_seconds']
+                result['total_seconds'] = round(total, 3)
+                result['files_per_second'] = round(size / total, 1) if total else None
+            report.append(result)
+            print(format_row(result), flush=True)
+    return report
+
+
+HEADER = ['类型', '文件', '扫描(s)', '文本(s)', '解析写出(s)', '合计(s)', '文件/秒', '峰值内存(MB)', '子进程峰值(MB)']
+
+
+def format_row(result):
+    if 'error' in result:
+        return '\t'.join([result['type'], str(result['files']), f"出错: {result['error']}"])
+    name = result['type'] + ('(扫描件)' if result['scanned'] else '')
+    if not result['ok']:
+        name += '(无输出)'
+    cells = [name, result['files'], result['scan_seconds'], result['text_seconds'], result['parse_seconds'],
+             result['total_seconds'], result['files_per_second'], result['peak_rss_mb'], result['worker_peak_rss_mb']]
+    return '\t'.join('-' if cell is None else str(cell) for cell in cells)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.case:
+        result = run_case(args.case, args.workdir, args.pdf_backend, args.jobs, args.cache)
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return 0
+
+    if args.types.strip().lower() == 'all':
+        task_types = list(TASK_TYPES)
+    else:
+        task_types = [t.strip() for t in args.types.split(',') if t.strip()]
+        unknown = [t for t in task_types if t not in TASK_TYPES]
+        if unknown:
+            print(f"未知的单据类型: {', '.join(unknown)}")
+            return 2
+    try:
+        sizes = [int(n) for n in args.sizes.split(',') if n.strip()]
+    except ValueError:
+        print(f"文件数应为逗号分隔的整数: {args.sizes}")
+        return 2
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='fund_etl_bench_')
+    print(f"PDF文本提取方式: {args.pdf_backend or DEFAULT_BACKEND}，语料目录: {workdir}")
+    print('\t'.join(HEADER))
+    try:
+        report = run_benchmark(task_types, sizes, workdir, args)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'pdf_backend': args.pdf_backend or DEFAULT_BACKEND, 'cache': args.cache, 'results': report},
+                      f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""对比两种PDF文本提取方式的提取结果和速度
+
+用两种方式分别读取同一批单据，按 (单据类型, 平台) 汇总：识别出的平台是否一致、
+记录条数是否一致、各字段不一致的次数（附少量样例），以及两种方式读取文本的耗时和加速比。
+某个平台的结果全部一致后，可在其 register(...) 中加上 backend='pymupdf' 单独切换。
+
+用法:
+    python tools/compare_pdf_backends.py D:/估值材料（备查）/2025/20251218/1场外开基
+    python tools/compare_pdf_backends.py <目录> --types dividend,purchase --json report.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.document_scan import HEAD_PAGES, scan_documents
+from utils.pdf_backends import BACKENDS
+
+# 使用 pdfplumber 文本的单据类型：(模块, 平台注册表, 目录过滤, 文件过滤)
+PDF_TASKS = {
+    'dividend': ('extractors.dividend_extractor', 'DIVIDEND_PARSERS', '_is_dividend_dir', '_is_dividend_file'),
+    'purchase': ('extractors.purchase_extractor', 'PURCHASE_PARSERS', '_is_purchase_dir', '_is_purchase_file'),
+    'purchase_confirm': ('extractors.purchase_confirm_extractor', 'PURCHASE_CONFIRM_PARSERS',
+                         '_is_confirm_dir', '_is_purchase_confirm_file'),
+    'redemption': ('extractors.redemption_extractor', 'REDEMPTION_PARSERS', '_is_confirm_dir', '_is_redemption_file'),
+    'conversion': ('extractors.conversion_extractor', 'CONVERSION_PARSERS', '_is_confirm_dir', '_is_conversion_file'),
+}
+
+MAX_EXAMPLES = 3  # 每个字段最多保留几个不一致的样例
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="对比两种PDF文本提取方式")
+    parser.add_argument('target_path', help="单据目录，通常为 <主目录>/<年>/<日期>/1场外开基")
+    parser.add_argument('--types', default='all', help="单据类型，逗号分隔，默认 all。可选: " + ', '.join(PDF_TASKS))
+    parser.add_argument('--baseline', default='pdfplumber', choices=list(BACKENDS), help="基准提取方式")
+    parser.add_argument('--candidate', default='pymupdf', choices=list(BACKENDS), help="待验证的提取方式")
+    parser.add_argument('--date', help="业务日期 YYYYMMDD，赎回单用于判断日期，默认当天")
+    parser.add_argument('--json', dest='json_path', help="同时把完整结果写入该 JSON 文件")
+    return parser.parse_args(argv)
+
+
+def _extract_file(registry, documents, file, file_path, backend, context):
+    """用指定方式读取并提取一份单据
+
+    Returns:
+        (platform_key, records, error, seconds)；seconds 为读取文本的耗时
+    """
+    start = time.perf_counter()
+    try:
+        _, lines = documents.read_text(file_path, HEAD_PAGES, backend)
+        seconds = time.perf_counter() - start
+        # 提取时可能继续读取后续页，计入读取耗时（提取函数本身的耗时两种方式相同）
+        start = time.perf_counter()
+        platform_key, records = registry.extract(documents, file, file_path, lines, backend=backend, **context)
+        seconds += time.perf_counter() - start
+        return platform_key, records, None, seconds
+    except Exception as e:
+        return None, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+
+def _new_group(task_type, platform_key, backends):
+    return {
+        'type': task_type,
+        'platform': platform_key,
+        'files': 0,
+        'identical': 0,
+        'platform_mismatch': 0,
+        'record_count_mismatch': 0,
+        'errors': 0,
+        'field_diffs': {},
+        'seconds': {backend: 0.0 for backend in backends},
+    }
+
+
+def _compare_records(group, fields, file, baseline_records, candidate_records):
+    """逐条逐字段比较，返回是否完全一致"""
+    baseline_records = baseline_records or []
+    candidate_records = candidate_records or []
+    same = len(baseline_records) == len(candidate_records)
+    if not same:
+        group['record_count_mismatch'] += 1
+    for baseline_row, candidate_row in zip(baseline_records, candidate_records):
+        for name, expected, actual in zip(fields, baseline_row, candidate_row):
+            if expected == actual:
+                continue
+            same = False
+            diff = group['field_diffs'].setdefault(name, {'count': 0, 'examples': []})
+            diff['count'] += 1
+            if len(diff['examples']) < MAX_EXAMPLES:
+                diff['examples'].append({'file': file, 'baseline': expected, 'candidate': actual})
+    return same
+
+
+def compare_backends(target_path, task_types, baseline, candidate, run_date=None):
+    """用两种方式提取同一批单据并比较
+
+    Args:
+        target_path: 单据目录
+        task_types: PDF_TASKS 中的类型列表
+        baseline: 基准提取方式
+        candidate: 待验证的提取方式
+        run_date: 业务日期（datetime），为空时取当天
+
+    Returns:
+        按 (类型, 平台) 汇总的结果列表，平台以基准方式的识别结果为准
+    """
+    backends = (baseline, candidate)
+    # 不使用缓存、不开进程池：两种方式的耗时都是单进程直接读取PDF的时间
+    documents = scan_documents(target_path, None, cache=False, workers=1, retain_text=False)
+    if documents is None:
+        raise FileNotFoundError(f"目标路径不存在: {target_path}")
+    today = run_date or datetime.now()
+    context = {'today': today, 'today_str': today.strftime('%Y%m%d')}
+
+    groups = {}
+    for task_type in task_types:
+        module_name, registry_name, dir_filter, file_filter = PDF_TASKS[task_type]
+        module = importlib.import_module(module_name)
+        registry = getattr(module, registry_name)
+        dir_filter = getattr(module, dir_filter)
+        file_filter = getattr(module, file_filter)
+        task_context = context if task_type == 'redemption' else {}
+
+        for root, dirs, files in documents.walk():
+            if not dir_filter(root):
+                continue
+            for file in files:
+                if not file_filter(file):
+                    continue
+                file_path = os.path.join(root, file)
+                results = {
+                    backend: _extract_file(registry, documents, file, file_path, backend, task_context)
+                    for backend in backends
+                }
+                documents.release(file_path)
+
+                platform_key = results[baseline][0] or results[candidate][0]
+                group = groups.get((task_type, platform_key))
+                if group is None:
+                    group = groups[(task_type, platform_key)] = _new_group(task_type, platform_key, backends)
+                group['files'] += 1
+                for backend in backends:
+                    group['seconds'][backend] += results[backend][3]
+
+                baseline_key, baseline_records, baseline_error, _ = results[baseline]
+                candidate_key, candidate_records, candidate_error, _ = results[candidate]
+                if baseline_error or candidate_error:
+                    group['errors'] += 1
+                    continue
+                if baseline_key != candidate_key:
+                    group['platform_mismatch'] += 1
+                    continue
+                if _compare_records(group, registry.fields, file, baseline_records, candidate_records):
+                    group['identical'] += 1
+
+    report = []
+    for group in groups.values():
+        base_seconds = group['seconds'][baseline]
+        cand_seconds = group['seconds'][candidate]
+        group['speedup'] = round(base_seconds / cand_seconds, 2) if cand_seconds else None
+        group['seconds'] = {backend: round(seconds, 3) for backend, seconds in group['seconds'].items()}
+        report.append(group)
+    return report
+
+
+def format_report(report, baseline, candidate):
+    """格式化为文本表格"""
+    header = ['类型', '平台', '文件', '一致', '平台不同', '条数不同', '出错',
+              f'{baseline}(s)', f'{candidate}(s)', '加速比']
+    rows = [header]
+    for group in report:
+        rows.append([
+            group['type'], str(group['platform']), group['files'], group['identical'],
+            group['platform_mismatch'], group['record_count_mismatch'], group['errors'],
+            group['seconds'][baseline], group['seconds'][candidate],
+            '-' if group['speedup'] is None else f"{group['speedup']}x",
+        ])
+    out = ['\t'.join(str(cell) for cell in row) for row in rows]
+
+    total_base = sum(group['seconds'][baseline] for group in report)
+    total_cand = sum(group['seconds'][candidate] for group in report)
+    total_files = sum(group['files'] for group in report)
+    total_same = sum(group['identical'] for group in report)
+    speedup = f"{total_base / total_cand:.2f}x" if total_cand else '-'
+    out.append(f"合计: {total_files} 个文件，{total_same} 个结果一致；"
+               f"{baseline} {total_base:.3f}s，{candidate} {total_cand:.3f}s，加速比 {speedup}")
+
+    for group in report:
+        for name, diff in group['field_diffs'].items():
+            out.append(f"[{group['type']}/{group['platform']}] {name} 不一致 {diff['count']} 次")
+            for example in diff['examples']:
+                out.append(f"    {example['file']}: {example['baseline']!r} -> {example['candidate']!r}")
+    return '\n'.join(out)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.types.strip().lower() == 'all':
+        task_types = list(PDF_TASKS)
+    else:
+        task_types = [t.strip() for t in args.types.split(',') if t.strip()]
+        unknown = [t for t in task_types if t not in PDF_TASKS]
+        if unknown:
+            print(f"未知的单据类型: {', '.join(unknown)}")
+            return 2
+    run_date = datetime.strptime(args.date, '%Y%m%d') if args.date else None
+
+    report = compare_backends(args.target_path, task_types, args.baseline, args.candidate, run_date)
+    print(format_report(report, args.baseline, args.candidate))
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'baseline': args.baseline, 'candidate': args.candidate, 'groups': report},
+                      f, ensure_ascii=False, indent=2, default=str)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""历史库：从已有输出导入，或按条件查询
+
+导入：遍历主目录下各日期的输出目录 <主目录>/<年>/<YYYYMMDD>，读取各类单据的输出工作簿
+（.xlsx，或沿用旧名的 .xls；也识别 single_workbook 模式的 基金单汇总.xlsx），写入 cli.py --history 使用的历史库。
+已有记录的日期和类型默认跳过（运行时写入的记录带有来源文件），--replace 时重新导入。
+每导入若干天提交一次事务。
+
+用法:
+    python tools/history_db.py import "D:/估值材料（备查）" D:/基金单历史.db --start 2023
+    python tools/history_db.py query D:/基金单历史.db --account 8012 --fund 004179 --start 20250701 --end 20250930
+"""
+import os
+import sys
+import time
+import argparse
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors.tasks import OUTPUT_BASENAMES, TASK_TYPES
+from utils import history
+from utils.output import COMBINED_BASENAME, sheet_name_for
+
+COMMIT_EVERY_DAYS = 20  # 每导入多少个日期目录提交一次
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="历史库：从已有输出导入，或按条件查询")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    importer = commands.add_parser('import', help="从已有的输出工作簿导入")
+    importer.add_argument('root', help="主目录，输出目录为 <root>/<年>/<YYYYMMDD>")
+    importer.add_argument('db', help="历史库路径")
+    importer.add_argument('--start', help="起始日期（含），YYYYMMDD / YYYYMM / YYYY")
+    importer.add_argument('--end', help="结束日期（含），格式同 --start")
+    importer.add_argument('--types', default='', help="单据类型，逗号分隔，默认全部")
+    importer.add_argument('--replace', action='store_true', help="已有记录的日期也重新导入")
+
+    query = commands.add_parser('query', help="按条件查询")
+    query.add_argument('db', help="历史库路径")
+    query.add_argument('--account', help="账套编号")
+    query.add_argument('--fund', help="基金市场代码")
+    query.add_argument('--start', help="起始日期（含），YYYYMMDD / YYYYMM / YYYY")
+    query.add_argument('--end', help="结束日期（含），格式同 --start")
+    query.add_argument('--category', help="业务类别，如 基金赎回确认")
+    query.add_argument('--platform', help="基金平台")
+    query.add_argument('--types', default='', help="单据类型，逗号分隔，默认全部")
+    query.add_argument('--limit', type=int, help="最多显示的行数")
+    query.add_argument('--out', help="结果写出到 .csv")
+    return parser.parse_args(argv)
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()] or None
+
+
+def read_outputs(output_folder, task_types):
+    """读取一个输出目录中各类单据的结果表
+
+    Returns:
+        {单据类型: DataFrame}
+    """
+    tables = {}
+    combined = os.path.join(output_folder, COMBINED_BASENAME + '.xlsx')
+    sheets = {}
+    if os.path.exists(combined):
+        sheets = pd.read_excel(combined, sheet_name=None, dtype=object, engine='openpyxl')
+    for task in task_types:
+        basename = OUTPUT_BASENAMES[task]
+        for ext in ('.xlsx', '.xls'):
+            path = os.path.join(output_folder, basename + ext)
+            if os.path.exists(path):
+                # 本程序写出的 .xls 内容也是 xlsx
+                tables[task] = pd.read_excel(path, dtype=object, engine='openpyxl')
+                break
+        else:
+            sheet = sheet_name_for(basename)
+            if sheet in sheets:
+                tables[task] = sheets[sheet]
+    return tables
+
+
+def import_outputs(root, db_path, start=None, end=None, task_types=None, replace=False):
+    """把主目录下已有的输出导入历史库
+
+    Returns:
+        (导入的日期目录数, 导入的记录数)
+    """
+    task_types = task_types or TASK_TYPES
+    conn = history.connect(db_path)
+    days = rows = 0
+    try:
+        stored = set() if replace else history.stored_days(conn)
+        pending = 0
+        for run_day, output_folder in history.output_folders(root, start, end):
+            todo = [t for t in task_types if (t, run_day) not in stored]
+            if not todo:
+                continue
+            try:
+                tables = read_outputs(output_folder, todo)
+            except Exception as e:
+                print(f"读取失败，跳过 {output_folder}: {e}", file=sys.stderr)
+                continue
+            if not tables:
+                continue
+            for task, df in tables.items():
+                task_rows = history.rows_for(task, run_day, df)
+                history.replace_day(conn, task, run_day, task_rows)
+                rows += len(task_rows)
+            days += 1
+            pending += 1
+            if pending >= COMMIT_EVERY_DAYS:
+                conn.commit()
+                pending = 0
+        conn.commit()
+    finally:
+        conn.close()
+    return days, rows
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    if args.command == 'import':
+        days, rows = import_outputs(args.root, args.db, args.start, args.end, _split(args.types), args.replace)
+        print(f"导入 {days} 个日期目录、{rows} 条记录，耗时 {time.perf_counter() - start:.1f} 秒")
+        return 0
+
+    df = history.lookup(args.db, args.account, args.fund, args.start, args.end or args.start, args.category,
+                        args.platform, _split(args.types), args.limit)
+    print(f"查询到 {len(df)} 条记录，耗时 {(time.perf_counter() - start) * 1000:.1f} 毫秒")
+    if args.out:
+        df.to_csv(args.out, index=False, encoding='utf-8-sig')
+        print(f"已写出: {args.out}")
+    elif not df.empty:
+        print(df.drop(columns=['id', '原始数据']).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""查询归档的提取结果
+
+按单据类型、日期范围和平台读取 cli.py --archive 写出的 Parquet 归档，输出汇总或明细。
+
+用法:
+    python tools/query_archive.py D:/基金单归档 --types dividend,purchase,redemption --start 202510 --end 202510
+    python tools/query_archive.py D:/基金单归档 --start 2025 --platforms 盈米基金 --out 2025_盈米.csv
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import archive
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="查询归档的提取结果")
+    parser.add_argument('archive_root', help="归档目录，即 cli.py --archive 的目录")
+    parser.add_argument('--types', default='', help="单据类型，逗号分隔，默认全部")
+    parser.add_argument('--start', help="起始日期（含），YYYYMMDD / YYYYMM / YYYY")
+    parser.add_argument('--end', help="结束日期（含），格式同 --start，默认与 --start 相同")
+    parser.add_argument('--platforms', default='', help="只看这些平台，逗号分隔")
+    parser.add_argument('--out', help="明细写出到 .csv 或 .parquet；不指定时只显示按 类型/平台 的汇总")
+    return parser.parse_args(argv)
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()] or None
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    df = archive.query(args.archive_root, _split(args.types), args.start, args.end or args.start,
+                       _split(args.platforms))
+    seconds = time.perf_counter() - start
+    print(f"读取 {len(df)} 条记录，耗时 {seconds:.3f} 秒")
+    if df.empty:
+        return 0
+    if args.out:
+        if args.out.lower().endswith('.parquet'):
+            df.to_parquet(args.out, index=False)
+        else:
+            df.to_csv(args.out, index=False, encoding='utf-8-sig')
+        print(f"已写出: {args.out}")
+    else:
+        summary = df.groupby([archive.TYPE_COL, archive.PLATFORM_COL]).agg(
+            记录数=(archive.DATE_COL, 'size'), 天数=(archive.DATE_COL, 'nunique'))
+        print(summary.to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
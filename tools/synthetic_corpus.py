@@ -0,0 +1,1416 @@
+"""生成合成基金单语料
+
+按各平台单据的版式生成PDF（文字版用 PyMuPDF 直接写入文字，万事如意为扫描图片），
+目录结构与实际一致：<输出目录>/<年>/<日期>/1场外开基/<分红|申请|确认>/...，
+同时生成 product_codes.json、product_codes_conversion.json 和记录每份单据预期结果的 manifest.json。
+只依赖本项目已有的库，不需要联网。用于性能测试和改动前后的结果对比，不含任何真实数据。
+
+用法:
+    python tools/synthetic_corpus.py D:/合成语料 --date 20251218 --files 100
+    python tools/synthetic_corpus.py <目录> --types dividend,purchase --files 1000 --seed 7
+    python tools/synthetic_corpus.py <目录> --no-scan    # 万事如意单据也写入文字，没有 EasyOCR 时使用
+"""
+import os
+import sys
+import json
+import random
+import argparse
+from collections import namedtuple
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors.tasks import TASK_TYPES
+
+# 单据类型 -> 存放的子目录（提取器按目录名筛选）
+DOC_DIRS = {
+    'dividend': '分红',
+    'purchase': '申请',
+    'purchase_confirm': '确认',
+    'redemption': '确认',
+    'conversion': '确认',
+    'manual_purchase_apply': '申请',
+    'manual_purchase_confirm': '确认',
+    'manual_redemption': '确认',
+    'manual_dividend': '分红',
+}
+
+FONT_NAME = 'china-s'   # PyMuPDF 内置的简体中文字体，不需要字体文件
+LATIN_FONT_NAME = 'helv'
+FONT_SIZE = 10
+LINE_HEIGHT = 16
+PAGE_WIDTH = 595        # A4
+PAGE_HEIGHT = 842
+MARGIN = 40
+SCAN_DPI = 110          # 扫描件的分辨率
+
+# 一份单据中的一条交易
+Sample = namedtuple('Sample', [
+    'product_name',  # 资管产品名称（账套）
+    'fund_code',     # 基金代码
+    'fund_name',     # 基金名称
+    'amount',        # 金额
+    'shares',        # 份额
+    'fee',           # 手续费
+    'account',       # 交易账号
+    'date',          # 业务日期 YYYYMMDD
+    'seq',           # 单据序号，用于生成不重复的文件名
+])
+
+# (单据类型, 平台) -> Template
+Template = namedtuple('Template', ['func', 'records', 'funds', 'scan'])
+TEMPLATES = {}
+
+
+def template(doc_type, platform, records=1, funds=None, scan=False):
+    """注册单据模板（装饰器）
+
+    模板函数接收 Sample 列表（长度为 funds），返回 (文件名, 各页文本行列表)。
+
+    Args:
+        doc_type: 单据类型，见 extractors.tasks.TASK_TYPES
+        platform: 平台标识，与提取器注册的平台一致；万事如意单据为 'manual'
+        records: 每份单据应提取出的记录条数；多笔汇总单大于1，且通常跨页
+        funds: 模板需要的交易笔数，默认与 records 相同（转换单一条记录涉及两只基金）
+        scan: 是否为扫描件（整页转为图片，没有文本层）
+    """
+    def decorator(func):
+        TEMPLATES[(doc_type, platform)] = Template(func, records, funds or records, scan)
+        return func
+    return decorator
+
+
+def money(value):
+    """金额格式：千分位、两位小数"""
+    return f"{value:,.2f}"
+
+
+def plain(value):
+    """提取器输出的格式：去掉千分位"""
+    return f"{value:.2f}"
+
+
+def paginate(header, blocks, per_page=3):
+    """把多笔交易分到多页，首页带表头
+
+    与实际单据一样，续页以标题开头、每页以页码结尾。提取时各页文本直接拼接（上一页的最后一行
+    与下一页的第一行连在一起），页码和标题行保证交易行不被拼坏。
+
+    Args:
+        header: 首页表头行，第一行为标题
+        blocks: 每笔交易的文本行
+        per_page: 每页几笔
+
+    Returns:
+        各页文本行列表
+    """
+    pages = []
+    for start in range(0, len(blocks), per_page):
+        page = list(header) if start == 0 else [header[0]]
+        for block in blocks[start:start + per_page]:
+            page.extend(block)
+        pages.append(page)
+    for i, page in enumerate(pages, 1):
+        page.append(f'第 {i} 页 共 {len(pages)} 页')
+    return pages
+
+
+# ========== 分红单 ===============
+
+@template('dividend', 'haomai')
+def _dividend_haomai(samples):
+    s = samples[0]
+    return f"好买基金_分红确认单_{s.seq:05d}.pdf", [[
+        '好买基金分红确认单',
+        f'确认日期：{s.date}',
+        s.product_name,
+        '账户名称',
+        '证件类型 营业执照',
+        f'产品代码：{s.fund_code} 产品名称：{s.fund_name}',
+        f'确认金额：{money(s.amount)}',
+        f'确认份额：{money(s.shares)}',
+        '制单人：系统',
+    ]]
+
+
+@template('dividend', 'tiantian')
+def _dividend_tiantian(samples):
+    s = samples[0]
+    return f"天天基金_分红确认单_{s.seq:05d}.pdf", [[
+        '基金分红确认单',
+        f'{s.product_name} 账户户名',
+        '账户类型 机构',
+        f'基金代码 {s.fund_code} 基金名称 {s.fund_name}',
+        '红利资金（元）',
+        f'{s.date} {money(s.amount)}',
+        '红利再投资基金份额（份）',
+        money(s.shares),
+        '销售机构：上海天天基金销售有限公司',
+    ]]
+
+
+@template('dividend', 'xingzheng')
+def _dividend_xingzheng(samples):
+    s = samples[0]
+    return f"兴证全球_分红确认书_{s.seq:05d}.pdf", [[
+        '兴证全球基金管理有限公司',
+        '基金分红确认书',
+        f'账 号 名 称：{s.product_name}',
+        f'基 金 代 码：{s.fund_code}',
+        f'基 金 名 称：{s.fund_name}',
+        f'再投资份额：{money(s.shares)}',
+    ]]
+
+
+@template('dividend', 'lide')
+def _dividend_lide(samples):
+    s = samples[0]
+    return f"利得_分红确认单_{s.seq:05d}.pdf", [[
+        '基金分红确认单',
+        f'投资者姓名/名称：{s.product_name}',
+        f'基金名称 {s.fund_name} 基金代码 {s.fund_code}',
+        f'红利总金额（元） {money(s.amount)}',
+        f'红利再投份额（份） {money(s.shares)}',
+        '上海利得基金销售有限公司',
+    ]]
+
+
+@template('dividend', 'changliang')
+def _dividend_changliang(samples):
+    s = samples[0]
+    return f"长量_分红确认单_{s.seq:05d}.pdf", [[
+        '上海长量基金销售有限公司',
+        '基金分红确认单',
+        f'投资者名称 {s.product_name}',
+        f'基金代码 {s.fund_code} 基金名称 {s.fund_name}',
+        f'红利转投份额 {money(s.shares)}',
+    ]]
+
+
+@template('dividend', 'yingmi', records=5)
+def _dividend_yingmi(samples):
+    s = samples[0]
+    header = ['盈米基金 分红确认单', f'投资者名称 {s.product_name}', f'确认日期 {s.date}']
+    blocks = [[
+        f'序号:{i} 基金代码:{r.fund_code} 基金名称:{r.fund_name}',
+        f'分红金额:{money(r.amount)}',
+        f'红利再投份额:{money(r.shares)}',
+    ] for i, r in enumerate(samples, 1)]
+    return f"盈米_分红确认单_{s.seq:05d}.pdf", paginate(header, blocks)
+
+
+@template('dividend', 'zhaoyingtong')
+def _dividend_zhaoyingtong(samples):
+    s = samples[0]
+    return f"招赢通_分红确认单_{s.seq:05d}.pdf", [[
+        '招赢通 基金分红确认单',
+        f'投资者名称 {s.product_name}',
+        f'产品代码 {s.fund_code}',
+        f'分红金额 CNY {money(s.amount)}',
+        f'转投份额(份) {money(s.shares)}',
+    ]]
+
+
+@template('dividend', 'youchu')
+def _dividend_youchu(samples):
+    s = samples[0]
+    return f"邮储_分红确认书_{s.seq:05d}.pdf", [[
+        '中国邮政储蓄银行 基金分红确认书',
+        f'客户名称：{s.product_name}',
+        f'产品代码：{s.fund_code}',
+        f'再投资金额：{money(s.amount)}元',
+        f'红股：{money(s.shares)}份',
+    ]]
+
+
+@template('dividend', 'pingan')
+def _dividend_pingan(samples):
+    s = samples[0]
+    return f"平安_分红确认单_{s.seq:05d}.pdf", [[
+        '基金分红确认单',
+        f'账户名称 {s.product_name}',
+        f'基金代码 {s.fund_code}',
+        f'确认份额(份) {money(s.shares)}',
+        f'确认日期 {s.date}',
+        '平安银行行E通',
+    ]]
+
+
+@template('dividend', 'jiaohang')
+def _dividend_jiaohang(samples):
+    s = samples[0]
+    return f"交e通_分红确认单_{s.seq:05d}.pdf", [[
+        '交通银行 交e通',
+        '基金分红确认单',
+        f'投资者信息 {s.product_name}',
+        f'产品代码 {s.fund_code}',
+        f'转投份额 {money(s.shares)}',
+        f'确认日期 {s.date}',
+    ]]
+
+
+@template('dividend', 'hexun')
+def _dividend_hexun(samples):
+    s = samples[0]
+    return f"和讯_分红确认书_{s.seq:05d}.pdf", [[
+        '基金分红确认书',
+        f'账户名称 {s.product_name} 账户类型 机构',
+        f'交易账号 {s.account}',
+        f'基金代码 {s.fund_code}',
+        f'红利资金(元) {money(s.amount)}',
+        f'红利再投资确认份额 {money(s.shares)}',
+        '北京和讯信息科技有限公司',
+    ]]
+
+
+@template('dividend', 'jianhang')
+def _dividend_jianhang(samples):
+    s = samples[0]
+    return f"建行_分红确认书_{s.seq:05d}.pdf", [[
+        '中国建设银行 基金分红确认书',
+        f'客 户 名 称：{s.product_name}',
+        f'基 金 代 码：{s.fund_code}',
+        f'红 股：{money(s.shares)}',
+    ]]
+
+
+@template('dividend', 'tengyuan')
+def _dividend_tengyuan(samples):
+    s = samples[0]
+    return f"腾元_分红确认单_{s.seq:05d}.pdf", [[
+        '基金分红确认单',
+        f'客户名称 {s.product_name}',
+        f'基金代码 {s.fund_code}',
+        f'红利再投份额 {money(s.shares)}',
+        f'确认日期 {s.date}',
+        '腾元基金销售（北京）有限公司',
+    ]]
+
+
+@template('dividend', 'wangjin')
+def _dividend_wangjin(samples):
+    s = samples[0]
+    return f"网金_分红确认单_{s.seq:05d}.pdf", [[
+        '基金分红确认单',
+        f'客户名称 {s.product_name}',
+        f'基金账号 {s.account}',
+        f'基金代码 {s.fund_code}',
+        f'红利再投份额 {money(s.shares)}',
+        '网金基金销售有限公司',
+    ]]
+
+
+@template('dividend', 'jd')
+def _dividend_jd(samples):
+    s = samples[0]
+    return f"肯特瑞_分红确认单_{s.seq:05d}.pdf", [[
+        '京东肯特瑞基金销售有限公司',
+        '基金分红确认单',
+        f'客户名称 {s.product_name}',
+        f'基金代码 {s.fund_code}',
+        f'红利再投金额 {money(s.amount)}',
+        f'红利再投份额 {money(s.shares)}',
+    ]]
+
+
+@template('dividend', 'ronglianchuang')
+def _dividend_ronglianchuang(samples):
+    s = samples[0]
+    return f"融联创_分红确认单_{s.seq:05d}.pdf", [[
+        '融联创同业交易平台',
+        '基金分红确认单',
+        f'投资主体产品名称 {s.product_name} 银行账号 {s.account}',
+        f'基金账号 {s.account}',
+        f'基金代码 {s.fund_code}',
+        f'再投资份额（份） {money(s.shares)}',
+    ]]
+
+
+@template('dividend', 'minsheng')
+def _dividend_minsheng(samples):
+    s = samples[0]
+    return f"民生_分红确认单_{s.seq:05d}.pdf", [[
+        '基金分红确认单',
+        f'客户名称：{s.product_name}',
+        f'产品代码：{s.fund_code}',
+        f'确认份额（份）：{money(s.shares)}',
+        '民生银行同业e+',
+    ]]
+
+
+@template('dividend', 'zdt', records=12)
+def _dividend_zdt(samples):
+    s = samples[0]
+    header = ['证达通 分红确认汇总', f'投资者名称：{s.product_name} 生成时间 {s.date}',
+              '序号 交易账号 基金名称 基金代码 分红方式 分红金额 分红份额']
+    blocks = []
+    for i, r in enumerate(samples, 1):
+        # 基金名称过长换行时，账号后直接是基金代码
+        fund_name = f'{r.fund_name} ' if i % 4 else ''
+        blocks.append([f'{i} {r.account} {fund_name}{r.fund_code} 红利再投资 {money(r.amount)} {money(r.shares)}'])
+    return f"证达通_分红确认汇总_{s.seq:05d}.pdf", paginate(header, blocks, per_page=5)
+
+
+@template('dividend', 'liantai', records=4)
+def _dividend_liantai(samples):
+    s = samples[0]
+    header = ['联泰基金销售有限公司 北极星', '基金分红确认单', f'投资账户 {s.product_name}']
+    blocks = [[
+        f'交易信息（{i}/{len(samples)}）',
+        f'基金代码 {r.fund_code} 基金名称 {r.fund_name}',
+        f'红利再投份额(份) {money(r.shares)}',
+    ] for i, r in enumerate(samples, 1)]
+    return f"北极星_分红确认单_{s.seq:05d}.pdf", paginate(header, blocks, per_page=2)
+
+
+@template('dividend', 'jiyu')
+def _dividend_jiyu(samples):
+    s = samples[0]
+    return f"基煜_分红确认单_{s.seq:05d}.pdf", [[
+        '上海基煜基金销售有限公司',
+        '基金分红确认单',
+        f'客户名称 {s.product_name}',
+        f'产品代码 {s.fund_code}',
+        f'再投资金额 {money(s.amount)}元',
+        f'再投资份额 {money(s.shares)}份',
+    ]]
+
+
+@template('dividend', 'ningboBank')
+def _dividend_ningbo(samples):
+    s = samples[0]
+    return f"宁波银行_分红确认书_{s.seq:05d}.pdf", [[
+        '基金分红确认书',
+        f'客户名称 {s.product_name}',
+        f'产品代码 {s.fund_code}',
+        f'红利份额（份） {money(s.shares)}',
+    ]]
+
+
+@template('dividend', 'guoxinjiali')
+def _dividend_guoxinjiali(samples):
+    s = samples[0]
+    head, tail = s.product_name[:5], s.product_name[5:]
+    return f"{s.product_name}_交易确认单_{s.date}_{s.seq:05d}.pdf", [[
+        '国信嘉利基金销售有限公司',
+        '交易确认单',
+        '产品名称 确认日期 基金名称',
+        f'{head} {s.date} {s.fund_name[:4]}',
+        f'{tail} 3 {s.fund_code} {s.fund_name[4:] or "A"} 分红 - - - - 0.00 {money(s.shares)} 0.00',
+    ]]
+
+
+@template('dividend', 'panying')
+def _dividend_panying(samples):
+    s = samples[0]
+    return f"攀赢_分红确认单_{s.seq:05d}.pdf", [[
+        '攀赢基金 分红确认单',
+        f'客户名称 {s.product_name}',
+        f'产品代码 {s.fund_code} 产品名称 {s.fund_name}',
+        f'所得现金（元） {money(s.amount)}',
+        '所得份额（份）',
+        money(s.shares),
+    ]]
+
+
+# ========== 申购申请单 ===============
+
+@template('purchase', 'haomai')
+def _purchase_haomai(samples):
+    s = samples[0]
+    return f"好买基金_申购申请单_{s.seq:05d}.pdf", [[
+        '好买基金申购申请单',
+        f'申请日期：{s.date}',
+        s.product_name,
+        '账户名称',
+        '证件类型 营业执照',
+        f'产品代码：{s.fund_code} 产品名称：{s.fund_name}',
+        f'申请金额小写：{money(s.amount)}',
+    ]]
+
+
+@template('purchase', 'tiantian')
+def _purchase_tiantian(samples):
+    s = samples[0]
+    return f"天天基金_申购申请单_{s.seq:05d}.pdf", [[
+        '基金申购申请确认单',
+        f'{s.product_name} 账户户名',
+        '账户类型 机构',
+        f'基金代码 {s.fund_code} 基金名称 {s.fund_name}',
+        f'申请金额 {money(s.amount)}',
+        '上海天天基金销售有限公司',
+    ]]
+
+
+@template('purchase', 'lide')
+def _purchase_lide(samples):
+    s = samples[0]
+    return f"利得_申购申请书_{s.seq:05d}.pdf", [[
+        '基金申购申请书',
+        f'投资者姓名/名称：{s.product_name}',
+        f'基金名称 {s.fund_name} 基金代码 {s.fund_code}',
+        f'申请金额（元） {money(s.amount)}',
+        '上海利得基金销售有限公司',
+    ]]
+
+
+@template('purchase', 'changliang')
+def _purchase_changliang(samples):
+    s = samples[0]
+    return f"长量_申购申请单_{s.seq:05d}.pdf", [[
+        '上海长量基金销售有限公司',
+        '基金申购申请单',
+        f'投资者名称 {s.product_name}',
+        f'基金代码 {s.fund_code} 基金名称 {s.fund_name}',
+        f'申请金额 {money(s.amount)}',
+    ]]
+
+
+@template('purchase', 'pingan')
+def _purchase_pingan(samples):
+    s = samples[0]
+    return f"平安_申购申请单_{s.seq:05d}.pdf", [[
+        '基金申购申请单',
+        f'账户名称 {s.product_name}',
+        f'基金代码 {s.fund_code}',
+        f'申请金额 {money(s.amount)}元',
+        f'申请日期 {s.date}',
+        '平安银行行E通',
+    ]]
+
+
+@template('purchase', 'jiaohang')
+def _purchase_jiaohang(samples):
+    s = samples[0]
+    return f"交e通_申购申请单_{s.seq:05d}.pdf", [[
+        '交通银行 交e通',
+        '基金申购申请单',
+        '投资者信息',
+        s.product_name,
+        f'产品代码 {s.fund_code}',
+        f'申请金额/份额 {money(s.amount)}',
+    ]]
+
+
+@template('purchase', 'wangjin')
+def _purchase_wangjin(samples):
+    s = samples[0]
+    return f"网金_申购申请单_{s.seq:05d}.pdf", [[
+        '基金申购申请单',
+        f'投资者名称 {s.product_name}',
+        f'基金代码 {s.fund_code} 基金名称 {s.fund_name}',
+        f'申购金额（小写） {money(s.amount)}',
+        f'申请日期 {s.date}',
+        '网金基金销售有限公司',
+    ]]
+
+
+@template('purchase', 'tengyuan')
+def _purchase_tengyuan(samples):
+    s = samples[0]
+    return f"腾元_申购申请单_{s.seq:05d}.pdf", [[
+        '基金申购申请单',
+        f'投资者名称 {s.product_name}',
+        f'基金代码 {s.fund_code}',
+        f'申购金额（小写） {money(s.amount)}',
+        f'申请日期 {s.date}',
+        '腾元基金销售（北京）有限公司',
+    ]]
+
+
+@template('purchase', 'hexun')
+def _purchase_hexun(samples):
+    s = samples[0]
+    return f"和讯_申购申请书_{s.seq:05d}.pdf", [[
+        '基金申购申请书',
+        f'账户名称 {s.product_name} 账户类型 机构',
+        f'交易账号 {s.account}',
+        f'基金代码 {s.fund_code}',
+        f'申请金额 {money(s.amount)}',
+        '北京和讯信息科技有限公司',
+    ]]
+
+
+@template('purchase', 'jd')
+def _purchase_jd(samples):
+    s = samples[0]
+    return f"肯特瑞_申购申请单_{s.seq:05d}.pdf", [[
+        '京东肯特瑞基金销售有限公司',
+        '基金申购申请单',
+        f'客户名称 {s.product_name}',
+        f'基金代码 {s.fund_code}',
+        f'申请金额(元) {money(s.amount)}',
+    ]]
+
+
+@template('purchase', 'minsheng')
+def _purchase_minsheng(samples):
+    s = samples[0]
+    return f"民生_申购申请单_{s.seq:05d}.pdf", [[
+        '基金申购申请单',
+        f'客户名称：{s.product_name} 交易类型：申购',
+        f'产品代码：{s.fund_code}',
+        f'委托金额/委托份额：{money(s.amount)}',
+        '民生银行同业e+',
+    ]]
+
+
+@template('purchase', 'zhaoyingtong')
+def _purchase_zhaoyingtong(samples):
+    s = samples[0]
+    return f"招赢通_申购申请单_{s.seq:05d}.pdf", [[
+        '招赢通 基金申购申请单',
+        f'投资者名称 {s.product_name}',
+        f'产品代码 {s.fund_code}',
+        f'申请金额 CNY {money(s.amount)}',
+    ]]
+
+
+@template('purchase', 'ronglianchuang')
+def _purchase_ronglianchuang(samples):
+    s = samples[0]
+    return f"融联创_申购申请单_{s.seq:05d}.pdf", [[
+        '基金申购申请单',
+        f'投资者名称 {s.product_name}',
+        f'银行账号 {s.account}',
+        f'基金代码 {s.fund_code}',
+        f'基金名称 {s.fund_name}',
+        f'申请金额 {money(s.amount)}元',
+        f'申请日期 {s.date}',
+        '经办人',
+        '融联创同业交易平台',
+    ]]
+
+
+@template('purchase', 'jiyu')
+def _purchase_jiyu(samples):
+    s = samples[0]
+    return f"基煜_申购申请单_{s.seq:05d}.pdf", [[
+        '上海基煜基金销售有限公司',
+        '基金申购申请单',
+        f'账户名称：{s.product_name}',
+        f'产品代码：{s.fund_code}',
+        f'申购金额（小写）：{money(s.amount)}元',
+    ]]
+
+
+@template('purchase', 'ningboBank')
+def _purchase_ningbo(samples):
+    s = samples[0]
+    return f"宁波银行_申购申请书_{s.seq:05d}.pdf", [[
+        '基金申购申请书',
+        f'客户名称 {s.product_name} 交易账号 {s.account}',
+        f'产品代码 {s.fund_code}',
+        f'申请金额（元） {money(s.amount)}',
+    ]]
+
+
+@template('purchase', 'guoxinjiali')
+def _purchase_guoxinjiali(samples):
+    s = samples[0]
+    return f"国信嘉利_申购申请单_{s.seq:05d}.pdf", [[
+        '国信嘉利基金销售有限公司',
+        '基金申购申请单',
+        f'账户名称 {s.product_name}',
+        f'产品代码 {s.fund_code}',
+        f'申请金额 {money(s.amount)}元',
+    ]]
+
+
+@template('purchase', 'panying')
+def _purchase_panying(samples):
+    s = samples[0]
+    return f"攀赢_申购申请单_{s.seq:05d}.pdf", [[
+        '攀赢基金 申购申请单',
+        f'客户名称 {s.product_name}',
+        f'产品代码 {s.fund_code}',
+        f'申购金额（小写） {money(s.amount)}元',
+    ]]
+
+
+@template('purchase', 'yingmi', records=5)
+def _purchase_yingmi(samples):
+    s = samples[0]
+    header = ['盈米基金 申购申请汇总', f'投资者名称 {s.product_name}', f'申请日期 {s.date}']
+    blocks = [[
+        f'交易类型：申购 基金代码：{r.fund_code}',
+        f'基金名称：{r.fund_name}',
+        f'申请金额：{money(r.amount)}',
+    ] for r in samples]
+    return f"盈米_申购申请汇总_{s.seq:05d}.pdf", paginate(header, blocks)
+
+
+@template('purchase', 'liantai', records=4)
+def _purchase_liantai(samples):
+    s = samples[0]
+    header = ['联泰基金销售有限公司 北极星', '基金申购申请单', f'投资账户 {s.product_name}']
+    blocks = [[
+        f'交易信息（{i}/{len(samples)}）',
+        f'基金代码 {r.fund_code} 基金名称 {r.fund_name}',
+        f'申请金额(元) {money(r.amount)}',
+    ] for i, r in enumerate(samples, 1)]
+    return f"北极星_申购申请单_{s.seq:05d}.pdf", paginate(header, blocks, per_page=2)
+
+
+@template('purchase', 'zdt', records=12)
+def _purchase_zdt(samples):
+    s = samples[0]
+    total = money(sum(r.amount for r in samples))
+    header = ['证达通 交易申请汇总', f'投资者名称：{s.product_name} 生成时间 {s.date[:4]}-{s.date[4:6]}-{s.date[6:]}',
+              f'申购交易（合计{len(samples)}笔，共计{total}元）', '赎回交易（合计0笔，共计0.00份）',
+              '序号 基金名称 基金代码 申请金额']
+    blocks = [[f'{i} {r.fund_name} {r.fund_code} {money(r.amount)}'] for i, r in enumerate(samples, 1)]
+    return f"证达通_交易申请汇总_{s.seq:05d}.pdf", paginate(header, blocks, per_page=5)
+
+
+# ========== 申购确认单 ===============
+
+@template('purchase_confirm', 'haomai')
+def _purchase_confirm_haomai(samples):
+    s = samples[0]
+    return f"好买基金_申购确认单_{s.seq:05d}.pdf", [[
+        '好买基金申购确认单',
+        f'确认日期：{s.date}',
+        s.product_name,
+        '账户名称',
+        '证件类型 营业执照',
+        f'产品代码：{s.fund_code} 产品名称：{s.fund_name}',
+        f'确认金额：{money(s.amount)}',
+        f'确认份额：{money(s.shares)}',
+        f'手续费：{money(s.fee)}',
+        '制单人：系统',
+    ]]
+
+
+@template('purchase_confirm', 'tiantian')
+def _purchase_confirm_tiantian(samples):
+    s = samples[0]
+    return f"天天基金_申购确认单_{s.seq:05d}.pdf", [[
+        '基金申购确认单',
+        f'{s.product_name} 账户户名',
+        '账户类型 机构',
+        f'基金代码 {s.fund_code} 基金名称 {s.fund_name}',
+        f'确认金额：{money(s.amount)}',
+        f'确认份额：{money(s.shares)}',
+        f'确认费用：{money(s.fee)}',
+        '销售机构：上海天天基金销售有限公司',
+    ]]
+
+
+@template('purchase_confirm', 'lide')
+def _purchase_confirm_lide(samples):
+    s = samples[0]
+    return f"申购确认_{s.seq:05d}.pdf", [[
+        '基金交易确认单',
+        '业务类型：申购',
+        f'确认日期：{s.date}',
+        '销售机构：利得基金销售有限公司',
+        f'投资者姓名/名称：{s.product_name}',
+        f'基金代码：{s.fund_code} 基金名称：{s.fund_name}',
+        f'确认金额（元） {money(s.amount)}',
+        f'确认份额（份） {money(s.shares)}',
+        f'交易费用（元） {money(s.fee)}',
+    ]]
+
+
+@template('purchase_confirm', 'changliang')
+def _purchase_confirm_changliang(samples):
+    s = samples[0]
+    return f"长量_申购确认_{s.seq:05d}.pdf", [[
+        '长量基金销售有限公司',
+        '申购确认书',
+        f'投资者名称 {s.product_name}',
+        f'基金代码 {s.fund_code} 基金名称 {s.fund_name}',
+        f'确认金额 {money(s.amount)} (元)',
+        f'确认份额 {money(s.shares)} (份)',
+        f'手续费 {money(s.fee)} (元)',
+    ]]
+
+
+@template('purchase_confirm', 'jiaohang')
+def _purchase_confirm_jiaohang(samples):
+    s = samples[0]
+    return f"交e通_申购确认_{s.seq:05d}.pdf", [[
+        '交易确认书',
+        f'投资者信息 {s.product_name}',
+        f'产品代码 {s.fund_code} 产品名称 {s.fund_name}',
+        f'确认金额 {money(s.amount)}',
+        f'确认份额 {money(s.shares)}',
+        f'认申购手续费 {money(s.fee)}',
+    ]]
+
+
+@template('purchase_confirm', 'jd')
+def _purchase_confirm_jd(samples):
+    s = samples[0]
+    return f"京东_申购确认_{s.seq:05d}.pdf", [[
+        '北京肯特瑞基金销售有限公司',
+        '申购确认单',
+        f'客户名称 {s.product_name}',
+        f'基金代码 {s.fund_code}',
+        f'基金名称 {s.fund_name}',
+        f'确认金额 {money(s.amount)}',
+        f'确认份额 {money(s.shares)}',
+        f'手续费 {money(s.fee)}',
+    ]]
+
+
+@template('purchase_confirm', 'wangjin')
+def _purchase_confirm_wangjin(samples):
+    s = samples[0]
+    return f"网金_申购确认_{s.seq:05d}.pdf", [[
+        '基金申购确认书',
+        f'投资者名称 {s.product_name}',
+        f'基金代码 {s.fund_code}',
+        f'基金名称 {s.fund_name}',
+        f'申购金额（小写） {money(s.amount)}',
+        f'确认净额 {money(s.shares)} 份',
+        f'手续费开户 {money(s.fee)}',
+        '网金基金销售有限公司',
+    ]]
+
+
+@template('purchase_confirm', 'pingan')
+def _purchase_confirm_pingan(samples):
+    s = samples[0]
+    return f"平安_申购确认_{s.seq:05d}.pdf", [[
+        '基金交易确认单',
+        f'账户名称 {s.product_name}',
+        f'基金代码 {s.fund_code}',
+        f'基金名称 {s.fund_name}',
+        f'确认金额 {money(s.amount)}元',
+        f'确认份额 {money(s.shares)}份',
+        f'手续费 {money(s.fee)}元',
+        '平安银行 行E通',
+    ]]
+
+
+@template('purchase_confirm', 'jianhang')
+def _purchase_confirm_jianhang(samples):
+    s = samples[0]
+    return f"建行_申购确认_{s.seq:05d}.pdf", [[
+        '基金申购确认书',
+        f'客 户 名 称：{s.product_name}',
+        f'基 金 代 码：{s.fund_code}',
+        f'确 认 金 额：{money(s.amount)}',
+        f'确 认 份 额：{money(s.shares)}',
+        f'手 续 费：{money(s.fee)}',
+    ]]
+
+
+@template('purchase_confirm', 'tengyuan')
+def _purchase_confirm_tengyuan(samples):
+    s = samples[0]
+    return f"腾元_申购确认_{s.seq:05d}.pdf", [[
+        '基金交易确认书',
+        '业务类型：申购',
+        f'┃客户名称 │{s.product_name} ┃',
+        f'┃基金代码 │{s.fund_code} │基金名称 │{s.fund_name} ┃',
+        f'┃确认金额 │{money(s.amount)} │确认份额 │{money(s.shares)} ┃',
+        f'┃单位净值 │1.15380 │手 续 费 │{money(s.fee)} ┃',
+        '腾元基金销售有限公司',
+    ]]
+
+
+@template('purchase_confirm', 'ronglianchuang')
+def _purchase_confirm_ronglianchuang(samples):
+    s = samples[0]
+    return f"融联创_申购确认_{s.seq:05d}.pdf", [[
+        '融联创 基金交易确认单',
+        '业务类型 申购',
+        f'来款账号名称：{s.product_name}',
+        '大额支付行号：313301099999',
+        f'产品代码：{s.fund_code}',
+        f'确认金额：{money(s.amount)}',
+        f'确认份额：{money(s.shares)}',
+        f'手续费：{money(s.fee)}',
+    ]]
+
+
+@template('purchase_confirm', 'minsheng')
+def _purchase_confirm_minsheng(samples):
+    s = samples[0]
+    return f"民生同业e+_申购确认_{s.seq:05d}.pdf", [[
+        '中国民生银行',
+        '基金申购确认单',
+        '同业e+',
+        f'客户名称：{s.product_name}',
+        f'产品代码：{s.fund_code}',
+        f'确认金额（元）：{money(s.amount)}',
+        f'确认份额（份）：{money(s.shares)}',
+        f'手续费（元）：{money(s.fee)}',
+    ]]
+
+
+@template('purchase_confirm', 'hexun')
+def _purchase_confirm_hexun(samples):
+    s = samples[0]
+    return f"和讯_申购确认_{s.seq:05d}.pdf", [[
+        '基金申购确认单',
+        f'账户名称 {s.product_name} 账户类型 机构',
+        f'交易账号 {s.account}',
+        f'基金代码 {s.fund_code}',
+        f'确认金额 {money(s.amount)}',
+        f'确认份额 {money(s.shares)}',
+        f'确认费用 {money(s.fee)}',
+        '和讯信息科技有限公司',
+    ]]
+
+
+@template('purchase_confirm', 'zhaoyingtong')
+def _purchase_confirm_zhaoyingtong(samples):
+    s = samples[0]
+    return f"招赢通_申购确认_{s.seq:05d}.pdf", [[
+        '招赢通 交易确认单',
+        f'投资者名称 {s.product_name}',
+        '证件类型 营业执照',
+        f'产品代码 {s.fund_code}',
+        f'确认金额 CNY {money(s.amount)}',
+        f'确认份额 {money(s.shares)}',
+        f'交易费用 CNY {money(s.fee)}',
+    ]]
+
+
+@template('purchase_confirm', 'xingzheng')
+def _purchase_confirm_xingzheng(samples):
+    s = samples[0]
+    return f"兴证全球_申购确认_{s.seq:05d}.pdf", [[
+        '兴证全球基金管理有限公司',
+        '基金申购确认书',
+        f'账 号 名 称：{s.product_name}',
+        f'基 金 代 码：{s.fund_code}',
+        f'确 认 金 额：{money(s.amount)}',
+        f'确 认 份 额：{money(s.shares)}',
+        f'手 续 费：{money(s.fee)}',
+    ]]
+
+
+@template('purchase_confirm', 'youchu')
+def _purchase_confirm_youchu(samples):
+    s = samples[0]
+    return f"邮储_申购确认_{s.seq:05d}.pdf", [[
+        '基金申购确认书',
+        f'客户名称:{s.product_name}',
+        f'产品代码: {s.fund_code}',
+        f'确认金额（元）: {money(s.amount)}',
+        f'确认份额（份）: {money(s.shares)}',
+        f'手续费（元）: {money(s.fee)}',
+    ]]
+
+
+@template('purchase_confirm', 'jiyu')
+def _purchase_confirm_jiyu(samples):
+    s = samples[0]
+    return f"基煜_申购确认_{s.seq:05d}.pdf", [[
+        '上海基煜基金销售有限公司',
+        '基金申购确认单',
+        f'账户名称 {s.product_name}',
+        f'产品代码 {s.fund_code}',
+        f'确认金额 {money(s.amount)}元',
+        f'确认份额 {money(s.shares)}份',
+        f'手续费 {money(s.fee)}元',
+    ]]
+
+
+@template('purchase_confirm', 'ningboBank')
+def _purchase_confirm_ningbo(samples):
+    s = samples[0]
+    return f"宁波银行_申购确认_{s.seq:05d}.pdf", [[
+        '基金申购确认书',
+        f'客户名称 {s.product_name}',
+        f'产品代码 {s.fund_code}',
+        f'确认金额（元） {money(s.amount)}',
+        f'确认份额（份） {money(s.shares)}',
+        f'申购费用（元） {money(s.fee)}',
+    ]]
+
+
+@template('purchase_confirm', 'guoxinjiali')
+def _purchase_confirm_guoxinjiali(samples):
+    s = samples[0]
+    return f"国信嘉利_申购确认_{s.seq:05d}.pdf", [[
+        '国信嘉利基金销售有限公司',
+        '基金申购确认单',
+        f'账户名称 {s.product_name}',
+        f'产品代码 {s.fund_code}',
+        f'确认金额 {money(s.amount)}元',
+        f'确认份额 {money(s.shares)}份',
+        f'手续费 {money(s.fee)}',
+    ]]
+
+
+@template('purchase_confirm', 'panying')
+def _purchase_confirm_panying(samples):
+    s = samples[0]
+    return f"攀赢_申购确认_{s.seq:05d}.pdf", [[
+        '攀赢基金 申购确认单',
+        f'客户名称 {s.product_name}',
+        f'产品代码 {s.fund_code}',
+        f'确认金额 {money(s.amount)}',
+        f'确认份额 {money(s.shares)}',
+        f'手续费 {money(s.fee)}',
+    ]]
+
+
+@template('purchase_confirm', 'zdt')
+def _purchase_confirm_zdt(samples):
+    s = samples[0]
+    return f"证达通_申购确认_{s.seq:05d}.pdf", [[
+        '证达通 申购确认单',
+        f'投资者名称：{s.product_name} 投资者类型：产品',
+        f'基金名称：{s.fund_name} 基金代码：{s.fund_code}',
+        f'确认金额：{money(s.amount)}元',
+        f'确认份额：{money(s.shares)}份',
+        f'基金净值：1.0000 手续费：{money(s.fee)}元',
+    ]]
+
+
+@template('purchase_confirm', 'yingmi', records=5)
+def _purchase_confirm_yingmi(samples):
+    s = samples[0]
+    header = ['盈米基金 申购确认汇总', f'投资者名称 {s.product_name}', f'确认日期 {s.date}']
+    blocks = [[
+        f'交易序号 {i} 交易类型：申购',
+        f'基金代码：{r.fund_code} 基金名称：{r.fund_name}',
+        f'确认金额：{money(r.amount)}',
+        f'确认份额：{money(r.shares)}',
+        f'手续费：{money(r.fee)}',
+    ] for i, r in enumerate(samples, 1)]
+    return f"盈米_申购确认汇总_{s.seq:05d}.pdf", paginate(header, blocks)
+
+
+@template('purchase_confirm', 'liantai', records=4)
+def _purchase_confirm_liantai(samples):
+    s = samples[0]
+    header = ['联泰基金销售有限公司 北极星', '基金申购确认单', f'投资账户 {s.product_name}']
+    blocks = [[
+        f'交易信息（{i}/{len(samples)}）',
+        f'基金代码 {r.fund_code} 基金名称 {r.fund_name}',
+        f'确认金额(元) {money(r.amount)}',
+        f'确认份额(份) {money(r.shares)}',
+        f'手续费(元) {money(r.fee)}',
+    ] for i, r in enumerate(samples, 1)]
+    return f"北极星_申购确认单_{s.seq:05d}.pdf", paginate(header, blocks, per_page=2)
+
+
+# ========== 赎回确认单 ===============
+
+def dashed(date):
+    """YYYYMMDD -> YYYY-MM-DD"""
+    return f"{date[:4]}-{date[4:6]}-{date[6:]}"
+
+
+@template('redemption', 'haomai')
+def _redemption_haomai(samples):
+    s = samples[0]
+    return f"好买基金_赎回确认单_{s.seq:05d}.pdf", [[
+        '好买基金赎回确认单',
+        f'确认日期：{s.date}',
+        s.product_name,
+        '账户名称',
+        '证件类型 营业执照',
+        f'产品代码：{s.fund_code} 产品名称：{s.fund_name}',
+        f'确认金额：{money(s.amount)}',
+        f'确认份额：{money(s.shares)}',
+        f'手续费：{money(s.fee)}',
+        f'预计到账日：{dashed(s.date)}',
+        '制单人：系统',
+    ]]
+
+
+@template('redemption', 'tiantian')
+def _redemption_tiantian(samples):
+    s = samples[0]
+    return f"天天基金_赎回确认单_{s.seq:05d}.pdf", [[
+        '基金赎回确认单',
+        f'{s.product_name} 账户户名',
+        '账户类型 机构',
+        f'基金代码 {s.fund_code} 基金名称 {s.fund_name}',
+        f'确认金额：{money(s.amount)}',
+        f'确认份额：{money(s.shares)}',
+        f'确认费用：{money(s.fee)}',
+        '预计赎回到账日期',
+        s.date,
+        '销售机构：上海天天基金销售有限公司',
+    ]]
+
+
+@template('redemption', 'lide')
+def _redemption_lide(samples):
+    s = samples[0]
+    return f"赎回确认_{s.seq:05d}.pdf", [[
+        '基金交易确认单',
+        '业务类型：赎回',
+        f'确认日期：{s.date}',
+        '销售机构：利得基金销售有限公司',
+        f'投资者姓名/名称：{s.product_name}',
+        f'基金代码：{s.fund_code} 基金名称：{s.fund_name}',
+        f'确认金额（元） {money(s.amount)}',
+        f'确认份额（份） {money(s.shares)}',
+        f'交易费用（元） {money(s.fee)}',
+        f'预计到账日期：{dashed(s.date)}',
+    ]]
+
+
+@template('redemption', 'changliang')
+def _redemption_changliang(samples):
+    s = samples[0]
+    return f"长量_赎回确认_{s.seq:05d}.pdf", [[
+        '长量基金销售有限公司',
+        '赎回确认书',
+        f'投资者名称 {s.product_name}',
+        f'基金代码 {s.fund_code} 基金名称 {s.fund_name}',
+        f'确认金额 {money(s.amount)} (元)',
+        f'确认份额 {money(s.shares)} (份)',
+        f'手续费 {money(s.fee)} (元)',
+        f'预计赎回款到账日 {s.date}',
+    ]]
+
+
+@template('redemption', 'jd')
+def _redemption_jd(samples):
+    s = samples[0]
+    return f"京东_赎回确认_{s.seq:05d}.pdf", [[
+        '北京肯特瑞基金销售有限公司',
+        '赎回确认单',
+        f'客户名称 {s.product_name}',
+        f'基金代码 {s.fund_code}',
+        f'基金名称 {s.fund_name}',
+        f'确认金额 {money(s.amount)}',
+        f'确认份额 {money(s.shares)}',
+        f'手续费 {money(s.fee)}',
+        f'预计到账日 {dashed(s.date)}',
+    ]]
+
+
+@template('redemption', 'yingmi', records=5)
+def _redemption_yingmi(samples):
+    s = samples[0]
+    header = ['盈米基金 赎回确认汇总', f'投资者名称 {s.product_name}', f'确认日期 {s.date}']
+    blocks = [[
+        f'交易序号 {i} 交易类型：赎回',
+        f'基金代码：{r.fund_code} 基金名称：{r.fund_name}',
+        f'确认金额：{money(r.amount)}',
+        f'确认份额：{money(r.shares)}',
+        f'手续费：{money(r.fee)}',
+        f'到账日期：{dashed(r.date)}',
+    ] for i, r in enumerate(samples, 1)]
+    return f"盈米_赎回确认汇总_{s.seq:05d}.pdf", paginate(header, blocks)
+
+
+@template('redemption', 'liantai', records=4)
+def _redemption_liantai(samples):
+    s = samples[0]
+    header = ['联泰基金销售有限公司 北极星', '基金赎回确认单', f'投资账户 {s.product_name}']
+    blocks = [[
+        f'交易信息（{i}/{len(samples)}）',
+        f'基金代码 {r.fund_code} 基金名称 {r.fund_name}',
+        f'确认金额（元） {money(r.amount)}',
+        f'确认份额（份） {money(r.shares)}',
+        f'手续费（元） {money(r.fee)}',
+        f'预计到账日期：{dashed(r.date)}',
+    ] for i, r in enumerate(samples, 1)]
+    return f"北极星_赎回确认单_{s.seq:05d}.pdf", paginate(header, blocks, per_page=2)
+
+
+@template('redemption', 'tengyuan', records=6)
+def _redemption_tengyuan(samples):
+    s = samples[0]
+    header = ['基金交易确认书', f'┃客户名称 │{s.product_name} ┃']
+    blocks = [[
+        '┃业务类型 │赎回确认 ┃',
+        f'┃基金代码 │{r.fund_code} │基金名称 │{r.fund_name} ┃',
+        f'┃确认金额 │{money(r.amount)} │确认份额 │{money(r.shares)} │手 续 费 │{money(r.fee)} ┃',
+    ] for r in samples]
+    pages = paginate(header, blocks, per_page=2)
+    pages[-1].append('腾元基金销售有限公司')
+    return f"腾元_赎回确认_{s.seq:05d}.pdf", pages
+
+
+@template('redemption', 'zdt', records=12)
+def _redemption_zdt(samples):
+    s = samples[0]
+    header = ['证达通 赎回确认汇总', f'投资者名称：{s.product_name} 生成时间 {dashed(s.date)}',
+              '序号 交易账号 基金名称 基金代码 赎回份额 确认份额 确认金额 手续费 净值 确认日期 状态']
+    blocks = [[
+        f'{i} {r.account} {r.fund_name} {r.fund_code} {money(r.shares)} {money(r.shares)} '
+        f'{money(r.amount)} {money(r.fee)} 1.0000 {r.date} 成功'
+    ] for i, r in enumerate(samples, 1)]
+    return f"证达通_赎回确认汇总_{s.seq:05d}.pdf", paginate(header, blocks, per_page=5)
+
+
+# ========== 超级转换确认单 ===============
+# 转换单使用两笔交易的基金：第一笔为转出，第二笔为转入
+
+@template('conversion', 'jd', funds=2)
+def _conversion_jd(samples):
+    out, into = samples
+    return f"肯特瑞基金_超级转换确认_{out.seq:05d}.pdf", [[
+        '北京肯特瑞基金销售有限公司',
+        '超级转换确认单',
+        f'客户名称 {out.product_name}',
+        f'转出基金代码 {out.fund_code}',
+        f'转出基金确认金额 {money(out.amount)}',
+        f'转出基金确认份额 {money(out.shares)}',
+        f'转入基金代码 {into.fund_code}',
+        f'转入基金确认金额 {money(out.amount - out.fee)}',
+        f'转入基金确认份额 {money(into.shares)}',
+        f'转换手续费 {money(out.fee)}',
+    ]]
+
+
+@template('conversion', 'tiantian', funds=2)
+def _conversion_tiantian(samples):
+    out, into = samples
+    return f"天天基金_超级转换确认_{out.seq:05d}.pdf", [[
+        '基金超级转换确认单',
+        out.product_name,
+        f'转出基金代码 {out.fund_code} 转出基金名称 {out.fund_name}',
+        '转出基金确认',
+        f'{money(out.shares)}份 {money(out.amount)}元',
+        f'转入基金代码 {into.fund_code} 转入基金名称 {into.fund_name}',
+        f'手续费 {money(out.fee)}',
+        '转入基金确认',
+        money(into.shares),
+        '销售机构：上海天天基金销售有限公司',
+    ]]
+
+
+# ========== 万事如意（扫描件） ===============
+# 万事如意单据为扫描图片，没有文本层，提取时走OCR；基金代码以 B 开头
+
+@template('manual_purchase_apply', 'manual', scan=True)
+def _manual_purchase_apply(samples):
+    s = samples[0]
+    return f"万事如意申购_{s.seq:05d}.pdf", [[
+        '基金交易申请受理单',
+        f'申请日期：{s.date}',
+        '业务类型：申购',
+        f'基金代码：{s.fund_code}',
+        f'基金名称：{s.fund_name}',
+        f'申请金额（小写）：{money(s.amount)}',
+    ]]
+
+
+@template('manual_purchase_confirm', 'manual', scan=True)
+def _manual_purchase_confirm(samples):
+    s = samples[0]
+    return f"万事如意确认单_申购_{s.seq:05d}.pdf", [[
+        '申购确认单',
+        f'确认日期：{s.date}',
+        '业务类型：申购确认',
+        f'基金代码：{s.fund_code}',
+        f'申请金额：{money(s.amount + s.fee)}',
+        f'确认金额：{money(s.amount)}',
+        f'确认份额：{money(s.shares)}',
+    ]]
+
+
+@template('manual_redemption', 'manual', scan=True)
+def _manual_redemption(samples):
+    s = samples[0]
+    return f"万事如意确认单_赎回_{s.seq:05d}.pdf", [[
+        '赎回确认单',
+        f'确认日期：{s.date}',
+        '业务类型：赎回确认',
+        f'基金代码：{s.fund_code}',
+        f'确认金额：{money(s.amount)}',
+        f'确认份额：{money(s.shares)}',
+    ]]
+
+
+@template('manual_dividend', 'manual', scan=True)
+def _manual_dividend(samples):
+    s = samples[0]
+    return f"万事如意分红_{s.seq:05d}.pdf", [[
+        '红利发放确认单',
+        f'确认日期：{s.date}',
+        '业务类型：红利发放',
+        f'基金代码：{s.fund_code}',
+        f'确认金额：{money(s.amount)}',
+    ]]
+
+
+# ========== 生成 ===============
+
+PRODUCT_STYLES = ['稳健', '安鑫', '睿远', '恒盈', '添利', '鑫享', '丰泽', '长盈', '聚益', '汇智']
+PRODUCT_KINDS = ['集合资产管理计划', '单一资产管理计划']
+FUND_NAMES = ['易方达货币', '南方现金增利', '华夏现金宝', '博时安盈债券', '广发纯债', '招商中短债',
+              '嘉实超短债', '英大现金宝', '富国天利', '工银瑞信薪金', '鹏华安盈宝', '中欧短债']
+FUND_CLASSES = ['A', 'B', 'C', 'E']
+
+
+def _random_samples(rng, doc_type, count, products, date, seq):
+    """生成一份单据的交易"""
+    product_name = rng.choice(products)
+    samples = []
+    for _ in range(count):
+        if doc_type.startswith('manual_'):
+            fund_code = 'B' + ''.join(rng.choice('0123456789') for _ in range(5))
+        else:
+            fund_code = f"{rng.randrange(1, 1000000):06d}"
+        amount = round(rng.uniform(10000, 50000000), 2)
+        nav = rng.uniform(0.9, 1.6)
+        fee = 0.0 if doc_type in ('dividend', 'manual_dividend') else round(amount * rng.choice([0, 0, 0.0015]), 2)
+        samples.append(Sample(
+            product_name=product_name,
+            fund_code=fund_code,
+            fund_name=rng.choice(FUND_NAMES) + rng.choice(FUND_CLASSES),
+            amount=amount,
+            shares=round((amount - fee) / nav, 2),
+            fee=fee,
+            account=f"{rng.randrange(10 ** 11, 10 ** 12)}",
+            date=date,
+            seq=seq,
+        ))
+    return samples
+
+
+def _insert_line(page, x, y, line):
+    """写入一行文字：中文用内置中文字体，ASCII 字符用 Helvetica
+
+    内置中文字体中的数字和字母是等宽的全角字形，扫描后OCR会在字符间识别出空格，
+    与实际单据不符，因此按字符类型分段写入。
+    """
+    import fitz  # PyMuPDF
+    for ascii_run, text in _font_runs(line):
+        fontname = LATIN_FONT_NAME if ascii_run else FONT_NAME
+        page.insert_text((x, y), text, fontname=fontname, fontsize=FONT_SIZE)
+        x += fitz.get_text_length(text, fontname=fontname, fontsize=FONT_SIZE)
+
+
+def _font_runs(line):
+    """按是否为 ASCII 字符切分，返回 [(是否ASCII, 文本), ...]"""
+    runs = []
+    for char in line:
+        ascii_char = char.isascii()
+        if runs and runs[-1][0] == ascii_char:
+            runs[-1][1].append(char)
+        else:
+            runs.append((ascii_char, [char]))
+    return [(ascii_run, ''.join(chars)) for ascii_run, chars in runs]
+
+
+def render_pdf(pages, file_path, scan=False):
+    """把各页文本行写成PDF
+
+    Args:
+        pages: 各页文本行列表
+        file_path: 输出路径
+        scan: 为 True 时整页转为灰度图片，模拟没有文本层的扫描件
+    """
+    import fitz  # PyMuPDF
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        y = MARGIN + FONT_SIZE
+        for line in lines:
+            _insert_line(page, MARGIN, y, line)
+            y += LINE_HEIGHT
+    if scan:
+        scanned = fitz.open()
+        for page in doc:
+            pix = page.get_pixmap(dpi=SCAN_DPI, colorspace=fitz.csGRAY)
+            scanned.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT).insert_image(page.rect, pixmap=pix)
+        doc.close()
+        doc = scanned
+    doc.save(file_path, garbage=3, deflate=True)
+    doc.close()
+
+
+def generate_corpus(root, run_date=None, files=100, types=None, seed=0, scan=True):
+    """生成合成语料
+
+    Args:
+        root: 输出的主目录（相当于估值材料主目录）
+        run_date: 业务日期（datetime），为空时取当天
+        files: 每类单据生成的文件数，按平台轮流分配
+        types: 单据类型列表，默认全部
+        seed: 随机种子，相同参数生成的语料相同
+        scan: 万事如意单据是否生成为扫描图片；为 False 时写入文字，不需要OCR即可提取
+
+    Returns:
+        manifest 字典：{'date', 'target_path', 'files': [{'file', 'type', 'platform', 'records', 'samples'}]}
+    """
+    rng = random.Random(seed)
+    today = run_date or datetime.now()
+    date = today.strftime('%Y%m%d')
+    target_path = os.path.join(root, str(today.year), date, '1场外开基')
+
+    products = [f"万联资管{rng.choice(PRODUCT_STYLES)}{i}号{rng.choice(PRODUCT_KINDS)}" for i in range(1, 21)]
+    product_codes = {name: str(8000 + i) for i, name in enumerate(products)}
+    os.makedirs(root, exist_ok=True)
+    for filename in ('product_codes.json', 'product_codes_conversion.json'):
+        with open(os.path.join(root, filename), 'w', encoding='utf-8') as f:
+            json.dump(product_codes, f, ensure_ascii=False, indent=2)
+
+    entries = []
+    seq = 0
+    for doc_type in types or TASK_TYPES:
+        platforms = [key for key in TEMPLATES if key[0] == doc_type]
+        if not platforms:
+            continue
+        folder = os.path.join(target_path, DOC_DIRS[doc_type])
+        os.makedirs(folder, exist_ok=True)
+        for i in range(files):
+            seq += 1
+            key = platforms[i % len(platforms)]
+            tmpl = TEMPLATES[key]
+            samples = _random_samples(rng, doc_type, tmpl.funds, products, date, seq)
+            filename, pages = tmpl.func(samples)
+            render_pdf(pages, os.path.join(folder, filename), scan=scan and tmpl.scan)
+            entries.append({
+                'file': os.path.join(DOC_DIRS[doc_type], filename),
+                'type': doc_type,
+                'platform': key[1],
+                'records': tmpl.records,
+                'samples': [{
+                    'product_name': s.product_name,
+                    'fund_code': s.fund_code,
+                    'amount': plain(s.amount),
+                    'shares': plain(s.shares),
+                    'fee': plain(s.fee),
+                } for s in samples],
+            })
+
+    manifest = {'date': date, 'target_path': target_path, 'files': entries}
+    with open(os.path.join(root, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="生成合成基金单语料")
+    parser.add_argument('root', help="输出的主目录")
+    parser.add_argument('--date', help="业务日期 YYYYMMDD，默认当天")
+    parser.add_argument('--files', type=int, default=100, help="每类单据的文件数，默认 100")
+    parser.add_argument('--types', default='all', help="单据类型，逗号分隔，默认 all。可选: " + ', '.join(TASK_TYPES))
+    parser.add_argument('--seed', type=int, default=0, help="随机种子，默认 0")
+    parser.add_argument('--no-scan', action='store_true', help="万事如意单据写入文字而不是扫描图片（不需要OCR）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.types.strip().lower() == 'all':
+        types = list(TASK_TYPES)
+    else:
+        types = [t.strip() for t in args.types.split(',') if t.strip()]
+        unknown = [t for t in types if t not in TASK_TYPES]
+        if unknown:
+            print(f"未知的单据类型: {', '.join(unknown)}")
+            return 2
+    run_date = datetime.strptime(args.date, '%Y%m%d') if args.date else None
+
+    manifest = generate_corpus(args.root, run_date, args.files, types, args.seed, scan=not args.no_scan)
+    counts = {}
+    for entry in manifest['files']:
+        counts[entry['type']] = counts.get(entry['type'], 0) + 1
+    for doc_type, count in counts.items():
+        print(f"{doc_type}: {count} 个文件")
+    print(f"已生成到: {manifest['target_path']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import queue
+import tkinter as tk
+from utils.common import LOG_DETAIL, LOG_INFO
+
+# 文本框最多保留的行数，超出后删除最早的行
+DEFAULT_MAX_LINES = 5000
+# 主线程刷新日志的间隔（毫秒）
+DEFAULT_INTERVAL_MS = 100
+
+
+class QueueLogSink:
+    """线程安全的界面日志
+
+    提取线程调用 write() 把日志放入队列，主线程每隔 interval_ms 用 after() 取出
+    队列中的全部日志一次性写入文本框，避免每行日志都触发一次界面重绘。
+    文本框按环形缓冲处理，最多保留 max_lines 行。
+    """
+
+    def __init__(self, text_widget, max_lines=DEFAULT_MAX_LINES, level=LOG_INFO,
+                 interval_ms=DEFAULT_INTERVAL_MS):
+        self.text_widget = text_widget
+        self.max_lines = max_lines
+        self.level = level
+        self.interval_ms = interval_ms
+        self._queue = queue.SimpleQueue()
+        self._line_count = 0
+        self._after_id = None
+
+    def write(self, msg, level=LOG_INFO):
+        """放入一条日志，可在任意线程调用；低于当前级别的日志直接丢弃"""
+        if level >= self.level:
+            self._queue.put(msg)
+
+    def set_verbose(self, verbose):
+        """是否显示逐目录、逐文件的过程信息"""
+        self.level = LOG_DETAIL if verbose else LOG_INFO
+
+    def start(self):
+        """开始定时刷新，需在主线程调用"""
+        if self._after_id is None:
+            self._poll()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.text_widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def clear(self):
+        """清空文本框和尚未显示的日志，需在主线程调用"""
+        self._drain_queue()
+        self.text_widget.config(state=tk.NORMAL)
+        self.text_widget.delete(1.0, tk.END)
+        self.text_widget.config(state=tk.DISABLED)
+        self._line_count = 0
+
+    def flush(self):
+        """把队列中的日志写入文本框，需在主线程调用"""
+        lines = self._drain_queue()
+        if not lines:
+            return
+        # 一批日志本身超过上限时只保留最后 max_lines 行
+        text = '\n'.join(lines).split('\n')[-self.max_lines:]
+        widget = self.text_widget
+        widget.config(state=tk.NORMAL)
+        widget.insert(tk.END, '\n'.join(text) + '\n')
+        self._line_count += len(text)
+        excess = self._line_count - self.max_lines
+        if excess > 0:
+            widget.delete(1.0, f'{excess + 1}.0')
+            self._line_count -= excess
+        widget.see(tk.END)
+        widget.config(state=tk.DISABLED)
+
+    def _drain_queue(self):
+        lines = []
+        while True:
+            try:
+                lines.append(self._queue.get_nowait())
+            except queue.Empty:
+                return lines
+
+    def _poll(self):
+        self.flush()
+        self._after_id = self.text_widget.after(self.interval_ms, self._poll)
@@ -0,0 +1,158 @@
+import os
+import threading
+from datetime import datetime
+from utils.common import log
+from utils.output import parquet_available, parquet_frame
+
+# ========== 归档 ===============
+# 每次运行把各类单据的结果（映射账套编号之后、与输出文件相同的行）连同来源文件写入按列存储的归档：
+#     <归档目录>/<单据类型>/<YYYY>/<YYYYMM>.parquet
+# 每个类型每月一个文件，按 (归档日期, 基金平台) 排序，并附加 归档日期、单据类型、基金平台、来源文件、归档时间 列。
+# 重跑某天时只替换该天的行，不会重复累加。一年只有十几个文件，query() 用 pyarrow 一次扫描，
+# 按月或按年汇总分红、申购、赎回时不必逐个打开Excel。
+# 需要 pyarrow；未调用 configure() 时不归档。
+
+DATE_COL = '归档日期'
+TYPE_COL = '单据类型'
+PLATFORM_COL = '基金平台'
+SOURCE_COL = '来源文件'
+ARCHIVED_AT_COL = '归档时间'
+
+_root = None
+_lock = threading.Lock()
+
+
+def configure(archive_root):
+    """启用归档，archive_root 为空时关闭"""
+    global _root
+    if archive_root and not parquet_available():
+        raise ValueError("归档需要先安装 pyarrow")
+    _root = archive_root or None
+
+
+def partition_path(archive_root, task, day):
+    """某类型某天（YYYYMMDD）所在的月度文件"""
+    return os.path.join(archive_root, task, day[:4], day[:6] + '.parquet')
+
+
+def _archive_frame(df, day, task, sources, platform):
+    data = parquet_frame(df.reset_index(drop=True))
+    # 文本列统一为 string 类型，整列为空时也不会被推断为 null 类型，各月文件的结构保持一致
+    for col in data.columns:
+        if data[col].dtype == object:
+            data[col] = data[col].astype('string')
+    data.insert(0, DATE_COL, day)
+    data.insert(1, TYPE_COL, task)
+    if PLATFORM_COL not in data.columns:
+        data[PLATFORM_COL] = platform
+    data[PLATFORM_COL] = data[PLATFORM_COL].fillna('')
+    data[SOURCE_COL] = [sources[i] for i in df.index] if sources is not None else None
+    data[SOURCE_COL] = data[SOURCE_COL].astype('string')
+    data[ARCHIVED_AT_COL] = datetime.now().isoformat(timespec='seconds')
+    return data.astype({DATE_COL: 'string', TYPE_COL: 'string', PLATFORM_COL: 'string', ARCHIVED_AT_COL: 'string'})
+
+
+def append(task, run_date, df, sources=None, log_text=None, platform=''):
+    """归档一类单据当天的结果；没有启用归档时直接返回
+
+    Args:
+        task: 单据类型，如 'dividend'
+        run_date: 业务日期（datetime），决定写入哪一天
+        df: 与输出文件相同的结果表；行索引为 RecordSink 结果中的行号（筛选后也保留原索引）
+        sources: RecordSink.sources，各行的来源文件
+        log_text: 日志文本框对象
+        platform: 结果表没有 基金平台 列时使用的平台名，如 '万事如意'
+
+    Returns:
+        写出的文件路径，未归档时为 None
+    """
+    archive_root = _root
+    if archive_root is None:
+        return None
+    try:
+        import pandas as pd
+        day = run_date.strftime('%Y%m%d')
+        data = _archive_frame(df, day, task, sources, platform)
+        path = partition_path(archive_root, task, day)
+        with _lock:
+            if os.path.exists(path):
+                # 替换该天已归档的行，其余日期原样保留
+                existing = pd.read_parquet(path)
+                data = pd.concat([existing[existing[DATE_COL] != day], data], ignore_index=True)
+            data = data.sort_values([DATE_COL, PLATFORM_COL], kind='stable')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            data.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        log(f"已归档 {len(data)} 条记录到: {path}", log_text)
+        return path
+    except Exception as e:
+        log(f"归档失败: {e}", log_text)
+        return None
+
+
+def _date_range(start, end):
+    return (start or '').ljust(8, '0'), (end or '').ljust(8, '9')
+
+
+def archive_files(archive_root, tasks=None, start=None, end=None):
+    """列出与日期范围有交集的月度文件
+
+    Args:
+        archive_root: 归档目录
+        tasks: 单据类型列表，默认全部
+        start, end: 起止日期 YYYYMMDD（含），也可只写 YYYYMM 或 YYYY
+
+    Returns:
+        {单据类型: [路径, ...]}
+    """
+    start, end = _date_range(start, end)
+    if not os.path.isdir(archive_root):
+        return {}
+    files = {}
+    for task in tasks or sorted(os.listdir(archive_root)):
+        task_dir = os.path.join(archive_root, task)
+        if not os.path.isdir(task_dir):
+            continue
+        for year in sorted(os.listdir(task_dir)):
+            if not (start[:4] <= year <= end[:4]):
+                continue
+            for name in sorted(os.listdir(os.path.join(task_dir, year))):
+                month, ext = os.path.splitext(name)
+                if ext == '.parquet' and start[:6] <= month <= end[:6]:
+                    files.setdefault(task, []).append(os.path.join(task_dir, year, name))
+    return files
+
+
+def query(archive_root, tasks=None, start=None, end=None, platforms=None, columns=None):
+    """读取归档记录
+
+    Args:
+        archive_root: 归档目录
+        tasks: 单据类型列表，如 ['dividend', 'purchase', 'redemption']，默认全部
+        start, end: 起止日期（含），YYYYMMDD / YYYYMM / YYYY
+        platforms: 只读取这些平台
+        columns: 只读取这些列；归档日期、单据类型总会带上
+
+    Returns:
+        DataFrame；不同类型的列不同，缺少的列为空
+    """
+    import pandas as pd
+    import pyarrow.dataset as ds
+    low, high = _date_range(start, end)
+    if columns is not None:
+        columns = list(dict.fromkeys([DATE_COL, TYPE_COL] + list(columns)))
+    frames = []
+    # 同一类型的各月文件结构相同，作为一个数据集扫描；日期和平台条件下推到文件内的行组统计
+    for task, paths in archive_files(archive_root, tasks, start, end).items():
+        dataset = ds.dataset(paths, format='parquet')
+        condition = (ds.field(DATE_COL) >= low) & (ds.field(DATE_COL) <= high)
+        if platforms:
+            condition &= ds.field(PLATFORM_COL).isin(list(platforms))
+        task_columns = None
+        if columns is not None:
+            task_columns = [c for c in columns if c in dataset.schema.names]
+        frames.append(dataset.to_table(columns=task_columns, filter=condition).to_pandas())
+    if not frames:
+        return pd.DataFrame(columns=columns or [DATE_COL, TYPE_COL])
+    return pd.concat(frames, ignore_index=True)
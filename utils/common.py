@@ -1,16 +1,27 @@
-import tkinter as tk
+# 日志级别：DETAIL 为逐目录、逐文件的过程信息，界面可以只显示 INFO 及以上
+LOG_DETAIL = 10
+LOG_INFO = 20
 
-def log(msg, log_text=None):
+
+def log(msg, log_text=None, level=LOG_INFO):
     """日志输出函数
-    
+
     Args:
         msg: 要输出的消息
-        log_text: tkinter.scrolledtext.ScrolledText对象，用于显示日志
+        log_text: 界面日志队列（ui.log_sink.QueueLogSink），或 tkinter.scrolledtext.ScrolledText 对象
+        level: 日志级别，LOG_DETAIL 或 LOG_INFO
     """
     print(msg)
-    if log_text is not None:
-        log_text.config(state=tk.NORMAL)
-        log_text.insert(tk.END, msg + "\n")
-        log_text.see(tk.END)
-        log_text.config(state=tk.DISABLED)
-        log_text.update() 
\ No newline at end of file
+    if log_text is None:
+        return
+    if hasattr(log_text, 'write'):
+        # 日志队列线程安全，由界面主线程批量写入文本框
+        log_text.write(msg, level)
+        return
+    # 直接写文本框，只能在主线程中调用
+    import tkinter as tk
+    log_text.config(state=tk.NORMAL)
+    log_text.insert(tk.END, msg + "\n")
+    log_text.see(tk.END)
+    log_text.config(state=tk.DISABLED)
+    log_text.update()
\ No newline at end of file
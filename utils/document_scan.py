@@ -0,0 +1,375 @@
+import os
+import sys
+import pickle
+import contextlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from utils.common import log
+from utils.text_cache import get_default_cache
+from utils.pdf_backends import DEFAULT_BACKEND, extract_pages, check_backend
+from utils import run_report
+
+# 默认并行进程数：保留一个核心给界面线程
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+
+# 扫描时预取的页数：识别平台只看首页，其余页由提取函数按需读取
+HEAD_PAGES = 1
+
+
+class PdfText(namedtuple('PdfText', ['text', 'page_ends', 'page_count'])):
+    """已提取的PDF文本
+
+    text 为已提取各页的文本直接拼接（与逐页 += 的结果一致），
+    page_ends[i] 为第 i 页文本在 text 中的结束位置，page_count 为总页数。
+    """
+    __slots__ = ()
+
+    @property
+    def pages(self):
+        """已提取的页数"""
+        return len(self.page_ends)
+
+    def covers(self, pages=None):
+        """是否已包含前 pages 页（None 为全部页）"""
+        if self.pages >= self.page_count:
+            return True
+        return pages is not None and self.pages >= pages
+
+    def head(self, pages=None):
+        """前 pages 页的文本（None 为全部已提取的页）"""
+        if pages is None or pages >= self.pages:
+            return self.text
+        return self.text[:self.page_ends[pages - 1]] if pages > 0 else ''
+
+    def extend(self, page_texts, page_count):
+        """追加后续页的文本，返回新的 PdfText"""
+        text = self.text
+        page_ends = list(self.page_ends)
+        for page_text in page_texts:
+            text += page_text
+            page_ends.append(len(text))
+        return PdfText(text, page_ends, page_count)
+
+
+EMPTY_PDF_TEXT = PdfText('', [], 0)
+
+
+def extract_pdf_pages(file_path, start=0, stop=None, backend=None, timings=None):
+    """提取PDF第 start 页到第 stop 页（不含）的文本
+
+    Args:
+        file_path: PDF文件路径
+        start: 起始页（从0开始）
+        stop: 结束页，None 为到最后一页
+        backend: 文本提取方式，见 pdf_backends.BACKENDS，默认 pdfplumber
+        timings: 传入 {'open': 0.0, 'text': 0.0} 时累加打开文件和提取文本的耗时
+
+    Returns:
+        (page_texts, page_count): 各页文本（无文本的页为空字符串），以及PDF总页数
+    """
+    return extract_pages(file_path, start, stop, backend, timings)
+
+
+def extract_pdf_text(file_path, backend=None):
+    """提取PDF全文
+
+    Args:
+        file_path: PDF文件路径
+        backend: 文本提取方式，默认 pdfplumber
+
+    Returns:
+        (text, lines): 拼接后的全文及按行切分的列表
+    """
+    page_texts, _ = extract_pdf_pages(file_path, backend=backend)
+    text = ''.join(page_texts)
+    lines = text.split('\n')
+    return text, lines
+
+
+def _init_worker():
+    """子进程初始化：输出转到 stderr
+
+    子进程不继承 cli 对 sys.stdout 的重定向，PyMuPDF 导入 fitz 时打印的弃用提示等会混入 stdout，
+    破坏命令行最后输出的 JSON 汇总。PyMuPDF 在导入时记下输出流，已导入时另行设置。
+    """
+    sys.stdout = sys.stderr
+    os.environ.setdefault('PYMUPDF_MESSAGE', 'fd:2')
+    if 'pymupdf' in sys.modules:
+        sys.modules['pymupdf'].set_messages(fd=2)
+
+
+def _extract_pdf_pages_safe(file_path, start, stop, backend):
+    """子进程入口：提取失败时返回异常而不是抛出，保证整批结果都能返回"""
+    timings = {'open': 0.0, 'text': 0.0}
+    try:
+        return extract_pdf_pages(file_path, start, stop, backend, timings), None, timings
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(str(e))
+        return None, e, timings
+
+
+def _new_executor(workers):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def extract_pdf_texts(file_paths, workers=None, pages=None, starts=None, backend=None, executor=None):
+    """并行提取多个PDF的文本
+
+    pdfplumber 的版面分析是纯 Python 计算，受 GIL 限制，因此使用进程池。
+    返回顺序与 file_paths 一致。
+
+    Args:
+        file_paths: PDF文件路径列表
+        workers: 进程数，默认 DEFAULT_WORKERS；为 1 时在当前进程串行提取
+        pages: 只提取到第几页为止，None 为全部页
+        starts: 各文件的起始页（已提取过前几页时从其后继续），默认都从第0页开始
+        backend: 文本提取方式，默认 pdfplumber
+        executor: 复用的进程池（见 DocumentScan），为空时临时创建一个，提取完即关闭
+
+    Returns:
+        [((page_texts, page_count) 或 None, 异常或 None, {'open': 耗时, 'text': 耗时}), ...]
+    """
+    file_paths = list(file_paths)
+    starts = list(starts) if starts is not None else [0] * len(file_paths)
+    stops = [pages] * len(file_paths)
+    backends = [backend] * len(file_paths)
+    if workers is None:
+        workers = DEFAULT_WORKERS
+    workers = min(workers, len(file_paths))
+    if workers <= 1:
+        return list(map(_extract_pdf_pages_safe, file_paths, starts, stops, backends))
+    # 每个进程一次领取若干文件，减少进程间通信次数
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    if executor is not None:
+        return list(executor.map(_extract_pdf_pages_safe, file_paths, starts, stops, backends, chunksize=chunksize))
+    with _new_executor(workers) as executor:
+        return list(executor.map(_extract_pdf_pages_safe, file_paths, starts, stops, backends, chunksize=chunksize))
+
+
+class DocumentScan:
+    """一次目录扫描的结果
+
+    目录只遍历一次，PDF文本只提取一次，所有提取器共享同一份结果。
+    同一文件可以用不同的提取方式各读取一次（平台注册时可指定 backend），文本分别保存。
+    并行提取用的进程池在第一次需要时创建，之后各次预取（如逐个子文件夹预取）共用，close 时关闭。
+    """
+
+    def __init__(self, target_path, walk_entries, workers=None, cache=None, retain_text=True, backend=None):
+        self.target_path = target_path
+        self.walk_entries = walk_entries  # [(root, dirs, files), ...]，顺序与 os.walk 一致
+        self.workers = workers
+        self.cache = cache  # PdfTextCache，跨运行复用已提取的文本
+        self.retain_text = retain_text  # 为 False 时文本用完即释放（单个提取器独占扫描结果时）
+        self.backend = check_backend(backend) or DEFAULT_BACKEND  # 未指定提取方式时使用
+        self._texts = {}   # (file_path, backend) -> PdfText
+        self._errors = {}  # (file_path, backend) -> Exception
+        self._ocr = {}     # (file_path, doc_type) -> (text, lines)，OCR类提取器的识别结果
+        self._executor = None
+
+    def walk(self):
+        """按 os.walk 的顺序返回 (root, dirs, files)"""
+        return iter(self.walk_entries)
+
+    def pdf_paths(self):
+        """返回扫描到的所有PDF文件路径"""
+        return [
+            os.path.join(root, f)
+            for root, dirs, files in self.walk_entries
+            for f in files
+            if f.lower().endswith('.pdf')
+        ]
+
+    def _covered(self, key, pages):
+        pdf_text = self._texts.get(key)
+        return pdf_text is not None and pdf_text.covers(pages)
+
+    def prefetch(self, file_paths=None, pages=None, backend=None):
+        """预先提取PDF文本并缓存
+
+        已提取过前几页的文件只补提取后续页。
+
+        Args:
+            file_paths: 需要提取的文件路径，默认提取全部PDF
+            pages: 只提取前几页，None 为全部页
+            backend: 文本提取方式，默认 self.backend
+        """
+        backend = check_backend(backend) or self.backend
+        if file_paths is None:
+            file_paths = self.pdf_paths()
+        pending = [
+            file_path for file_path in dict.fromkeys(file_paths)
+            if not self._covered((file_path, backend), pages) and (file_path, backend) not in self._errors
+        ]
+        if not pending:
+            return
+        keys = {}
+        if self.cache is not None:
+            hits, keys = self.cache.lookup(pending, backend)
+            for file_path, (text, page_ends, page_count) in hits.items():
+                cached = PdfText(text, page_ends, page_count)
+                known = self._texts.get((file_path, backend))
+                if known is None or cached.pages > known.pages:
+                    self._texts[(file_path, backend)] = cached
+            pending = [file_path for file_path in pending if not self._covered((file_path, backend), pages)]
+            if not pending:
+                return
+        known = [self._texts.get((file_path, backend), EMPTY_PDF_TEXT) for file_path in pending]
+        starts = [pdf_text.pages for pdf_text in known]
+        workers = self.workers or DEFAULT_WORKERS
+        executor = None
+        if min(workers, len(pending)) > 1:
+            if self._executor is None:
+                self._executor = _new_executor(workers)
+            executor = self._executor
+        results = extract_pdf_texts(pending, workers, pages, starts, backend, executor)
+        extracted = {}
+        for file_path, pdf_text, (result, error, timings) in zip(pending, known, results):
+            for stage, seconds in timings.items():
+                run_report.add(stage, seconds, file_path)
+            if error is not None:
+                self._errors[(file_path, backend)] = error
+            else:
+                extracted[file_path] = pdf_text.extend(*result)
+        self._texts.update(((file_path, backend), pdf_text) for file_path, pdf_text in extracted.items())
+        if self.cache is not None:
+            self.cache.store(
+                {file_path: (pdf_text.text, pdf_text.page_ends, pdf_text.page_count) for file_path, pdf_text in extracted.items()},
+                keys,
+                backend
+            )
+
+    def read_text(self, file_path, pages=None, backend=None):
+        """读取PDF前 pages 页的文本（None 为全部页），优先使用缓存
+
+        即使已提取了更多页，也只返回前 pages 页，结果与是否命中缓存无关。
+        提取失败时抛出原始异常，由各提取器按原有逻辑记录为失败文件。
+
+        Args:
+            file_path: PDF文件路径
+            pages: 读取的页数，None 为全部页
+            backend: 文本提取方式，默认 self.backend
+
+        Returns:
+            (text, lines)；每次调用返回新的行列表，提取器修改后不影响其它提取器
+        """
+        backend = check_backend(backend) or self.backend
+        key = (file_path, backend)
+        if not self._covered(key, pages) and key not in self._errors:
+            self.prefetch([file_path], pages, backend)
+        if not self._covered(key, pages):
+            raise self._errors[key]
+        text = self._texts[key].head(pages)
+        return text, text.split('\n')
+
+    def is_complete(self, file_path, backend=None):
+        """已读取的文本是否包含全部页"""
+        return self._covered((file_path, check_backend(backend) or self.backend), None)
+
+    def ocr_text(self, file_path, doc_type, extract):
+        """返回OCR类提取器的识别结果，同一文件只识别一次
+
+        Args:
+            file_path: PDF文件路径
+            doc_type: 单据类型，不同类型按各自的字段模板识别，结果分别保存
+            extract: 识别函数 extract(file_path) -> (text, lines)
+
+        Returns:
+            (text, lines)；每次调用返回新的行列表
+        """
+        key = (file_path, doc_type)
+        if key in self._ocr:
+            text, lines = self._ocr[key]
+        else:
+            text, lines = extract(file_path)
+            # 没识别出文本的不保存，下次再试
+            if text and self.retain_text:
+                self._ocr[key] = (text, lines)
+        return text, list(lines)
+
+    def release(self, file_path):
+        """提取器处理完一个文件后调用；retain_text 为 False 时释放其文本"""
+        if not self.retain_text:
+            self.forget([file_path])
+
+    def forget(self, file_paths):
+        """丢弃这些文件已读取的文本、识别结果和错误，下次读取时重新提取"""
+        file_paths = set(file_paths)
+        for store in (self._texts, self._errors, self._ocr):
+            for key in [key for key in store if key[0] in file_paths]:
+                del store[key]
+
+    def refresh(self, walk_entries, changed):
+        """换用新的目录遍历结果，其余文件已提取的文本继续复用（监控模式下每轮调用）
+
+        Args:
+            walk_entries: 新的 [(root, dirs, files), ...]
+            changed: 新增、修改或删除的文件路径
+        """
+        self.walk_entries = walk_entries
+        self.forget(changed)
+
+    def close(self):
+        """关闭进程池；之后仍可读取，需要时重新创建"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def scan_documents(target_path, log_text=None, prefetch=False, workers=None, cache=None, retain_text=True,
+                   backend=None, skip=()):
+    """遍历目标目录一次，返回可供多个提取器共享的扫描结果
+
+    Args:
+        target_path: 待扫描目录，通常为 <主目录>/<年>/<日期>/1场外开基
+        log_text: 日志文本框对象
+        prefetch: 是否立即提取所有PDF前 HEAD_PAGES 页的文本
+        workers: 并行提取文本的进程数，默认 DEFAULT_WORKERS
+        cache: PdfTextCache 对象；为空时使用默认缓存，传 False 关闭缓存
+        retain_text: 是否在读取后保留文本；多个提取器共享时需保留
+        backend: 默认的文本提取方式，见 pdf_backends.BACKENDS；平台注册时指定的方式优先
+        skip: 预取时跳过的文件，通常是处理清单中未变化的文件（见 manifest.current_files）
+
+    Returns:
+        DocumentScan 对象；目录不存在时返回 None
+    """
+    if not os.path.isdir(target_path):
+        return None
+    if cache is None:
+        cache = get_default_cache()
+    with run_report.stage('walk'):
+        walk_entries = [(root, dirs, files) for root, dirs, files in os.walk(target_path)]
+    documents = DocumentScan(target_path, walk_entries, workers, cache or None, retain_text, backend)
+    if prefetch:
+        pdf_paths = documents.pdf_paths()
+        pending = [file_path for file_path in pdf_paths if file_path not in skip]
+        if len(pending) < len(pdf_paths):
+            log(f"共扫描到 {len(pdf_paths)} 个PDF文件，其中 {len(pdf_paths) - len(pending)} 个与上次处理时相同，"
+                f"正在提取其余文件的文本...", log_text)
+        else:
+            log(f"共扫描到 {len(pdf_paths)} 个PDF文件，正在提取文本...", log_text)
+        documents.prefetch(pending, HEAD_PAGES)
+    return documents
+
+
+@contextlib.contextmanager
+def scan_if_needed(documents, target_path):
+    """提取器使用的扫描结果：传入了共享的扫描结果时直接使用（由调用方关闭），
+    否则自行遍历一次 target_path，文本读取后即释放，用完关闭进程池
+
+    Yields:
+        DocumentScan 对象
+    """
+    if documents is not None:
+        yield documents
+        return
+    with scan_documents(target_path, retain_text=False) as documents:
+        yield documents
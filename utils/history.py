@@ -0,0 +1,293 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from utils.common import log
+
+# ========== 历史库 ===============
+# 每次运行把各类单据的结果（映射账套编号之后、与输出文件相同的行）写入本地 SQLite 数据库，
+# 供 "某账套本季度某基金的全部赎回" 这类查询使用，不必再逐个打开共享盘上的Excel。
+# 各类型的列名不同，写入时统一为 账套编号、基金市场代码、日期、业务类别、基金平台、产品名称、数量、金额、费用，
+# 原始行以 JSON 保存在 原始数据 列；超级转换拆成转出、转入两条。
+# 重跑某天时先删除该天该类型的记录再插入，不会重复累加。插入用 executemany 分批执行，
+# 账套编号、基金市场代码、日期、业务类别、基金平台 各有索引（均带日期），跨年的单点查询也在毫秒级。
+# 未调用 configure() 时不写入。
+
+TABLE = '记录'
+SCHEMA_VERSION = 1
+BATCH_SIZE = 5000  # 每次 executemany 的行数
+
+FIELDS = ('账套编号', '基金市场代码', '日期', '业务类别', '基金平台', '产品名称', '数量', '金额', '费用')
+NUMERIC_FIELDS = ('数量', '金额', '费用')
+COLUMNS = ('单据类型', '运行日期') + FIELDS + ('来源文件', '原始数据')
+# 各索引都带上日期，"某账套/某基金/某平台某段时间" 的查询只扫描命中的行，不依赖 ANALYZE 统计信息
+INDEXES = {
+    '账套编号': ('账套编号', '日期'),
+    '基金市场代码': ('基金市场代码', '日期'),
+    '日期': ('日期',),
+    '业务类别': ('业务类别', '日期'),
+    '基金平台': ('基金平台', '日期'),
+    '运行': ('单据类型', '运行日期'),
+}
+
+
+class Const(str):
+    """字段映射中的固定值（而不是列名）"""
+
+
+# 各类型的字段映射：每项为一条记录（超级转换有转出、转入两条），
+# 值为列名、按顺序取第一个非空值的列名元组，或 Const 固定值；未列出的字段取同名列
+_FIELD_MAPS = {
+    'dividend': [{'业务类别': Const('红利再投'), '数量': '派送份额', '金额': '派送金额'}],
+    'purchase': [{'费用': '手续费'}],
+    'purchase_confirm': [{'费用': '手续费'}],
+    'redemption': [{'费用': '手续费'}],
+    'conversion': [
+        {'账套编号': '产品代码', '基金市场代码': '转出基金市场代码', '日期': '转出确认日期',
+         '业务类别': Const('超级转换转出'), '基金平台': '平台', '数量': '转出份额', '金额': '转出金额', '费用': '转出费用'},
+        {'账套编号': '产品代码', '基金市场代码': '转入基金市场代码', '日期': ('转入确认日期', '转出确认日期'),
+         '业务类别': Const('超级转换转入'), '基金平台': '平台', '数量': '转入份额', '金额': '转入金额', '费用': '转入费用'},
+    ],
+    'manual_purchase_apply': [{'基金市场代码': '证券代码', '日期': '申购日期', '业务类别': Const('申购申请'),
+                               '基金平台': Const('万事如意'), '金额': '申购金额', '费用': '申购费用'}],
+    'manual_purchase_confirm': [{'基金市场代码': '证券代码', '日期': '确认日期', '业务类别': '业务类型',
+                                 '基金平台': Const('万事如意'), '数量': '确认份额', '金额': '成交金额'}],
+    'manual_redemption': [{'基金市场代码': '证券代码', '日期': '确认日期', '业务类别': '业务类型',
+                           '基金平台': Const('万事如意'), '数量': '确认份额', '金额': '确认金额'}],
+    'manual_dividend': [{'基金市场代码': '市场代码', '日期': '凭证日期', '业务类别': Const('红利除权'),
+                         '基金平台': Const('万事如意'), '金额': '派送金额'}],
+}
+
+_db_path = None
+_lock = threading.Lock()
+
+
+def configure(db_path):
+    """启用历史库并建好表和索引，db_path 为空时关闭"""
+    global _db_path
+    if db_path:
+        try:
+            connect(db_path).close()
+        except sqlite3.Error as e:
+            raise ValueError(f"无法打开历史库 {db_path}: {e}")
+    _db_path = db_path or None
+
+
+def connect(db_path):
+    """打开历史库，第一次打开时建表和索引"""
+    folder = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(folder, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+        columns = ', '.join(f'"{c}" REAL' if c in NUMERIC_FIELDS else f'"{c}" TEXT' for c in COLUMNS)
+        with conn:
+            # WAL 模式下查询不会被正在写入的运行阻塞
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{TABLE}" (id INTEGER PRIMARY KEY, {columns})')
+            for name, fields in INDEXES.items():
+                columns = ', '.join(f'"{f}"' for f in fields)
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{name}" ON "{TABLE}" ({columns})')
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    return conn
+
+
+def _is_empty(value):
+    return value is None or (isinstance(value, float) and value != value) or value == ''
+
+
+def _text(value):
+    if _is_empty(value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        # 从Excel读回的代码可能变成浮点数
+        value = int(value)
+    return str(value).strip() or None
+
+
+def _day(value):
+    """日期统一为 YYYYMMDD，便于按范围查询"""
+    if _is_empty(value):
+        return None
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y%m%d')
+    digits = re.sub(r'\D', '', _text(value) or '')
+    return digits[:8] if len(digits) >= 8 else _text(value)
+
+
+def _number(value):
+    if _is_empty(value):
+        return None
+    try:
+        return float(str(value).replace(',', ''))
+    except ValueError:
+        return None
+
+
+def _json_value(value):
+    if _is_empty(value):
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def _resolve(row, source):
+    if isinstance(source, Const):
+        return str(source)
+    for col in (source if isinstance(source, tuple) else (source,)):
+        value = row.get(col)
+        if not _is_empty(value):
+            return value
+    return None
+
+
+def rows_for(task, run_day, df, sources=None):
+    """把一张结果表转为历史库的行
+
+    Args:
+        task: 单据类型
+        run_day: 运行日期 YYYYMMDD
+        df: 结果表，行索引为 RecordSink 结果中的行号
+        sources: RecordSink.sources，各行的来源文件；从已有工作簿导入时为 None
+
+    Returns:
+        与 COLUMNS 顺序相同的元组列表
+    """
+    field_maps = _FIELD_MAPS.get(task, [{}])
+    rows = []
+    for index, row in zip(df.index, df.to_dict('records')):
+        source_file = sources[index] if sources is not None else None
+        original = json.dumps({k: _json_value(v) for k, v in row.items()}, ensure_ascii=False)
+        for field_map in field_maps:
+            values = {field: _resolve(row, field_map.get(field, field)) for field in FIELDS}
+            values['日期'] = _day(values['日期'])
+            for field in NUMERIC_FIELDS:
+                values[field] = _number(values[field])
+            for field in ('账套编号', '基金市场代码', '业务类别', '基金平台', '产品名称'):
+                values[field] = _text(values[field])
+            rows.append((task, run_day) + tuple(values[f] for f in FIELDS) + (source_file, original))
+    return rows
+
+
+def replace_day(conn, task, run_day, rows):
+    """在当前事务中替换某类型某天的记录（调用方负责提交）"""
+    conn.execute(f'DELETE FROM "{TABLE}" WHERE "单据类型" = ? AND "运行日期" = ?', (task, run_day))
+    placeholders = ', '.join('?' for _ in COLUMNS)
+    names = ', '.join(f'"{c}"' for c in COLUMNS)
+    sql = f'INSERT INTO "{TABLE}" ({names}) VALUES ({placeholders})'
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.executemany(sql, rows[start:start + BATCH_SIZE])
+
+
+def stored_days(conn):
+    """已有记录的 {(单据类型, 运行日期)}"""
+    return set(conn.execute(f'SELECT DISTINCT "单据类型", "运行日期" FROM "{TABLE}"'))
+
+
+def append(task, run_date, df, sources=None, log_text=None):
+    """写入一类单据当天的结果；没有启用历史库时直接返回
+
+    Args:
+        task: 单据类型，如 'dividend'
+        run_date: 业务日期（datetime）
+        df: 与输出文件相同的结果表；行索引为 RecordSink 结果中的行号
+        sources: RecordSink.sources，各行的来源文件
+        log_text: 日志文本框对象
+
+    Returns:
+        写入的行数，未写入时为 None
+    """
+    db_path = _db_path
+    if db_path is None:
+        return None
+    try:
+        run_day = run_date.strftime('%Y%m%d')
+        rows = rows_for(task, run_day, df, sources)
+        with _lock:
+            conn = connect(db_path)
+            try:
+                with conn:
+                    replace_day(conn, task, run_day, rows)
+            finally:
+                conn.close()
+        log(f"已写入历史库 {len(rows)} 条记录: {db_path}", log_text)
+        return len(rows)
+    except Exception as e:
+        log(f"写入历史库失败: {e}", log_text)
+        return None
+
+
+def lookup(db_path, account=None, fund_code=None, start=None, end=None, category=None, platform=None,
+           tasks=None, limit=None):
+    """按条件查询历史记录
+
+    Args:
+        db_path: 历史库路径
+        account: 账套编号
+        fund_code: 基金市场代码
+        start, end: 日期范围（含），YYYYMMDD / YYYYMM / YYYY
+        category: 业务类别，如 '基金赎回确认'
+        platform: 基金平台
+        tasks: 单据类型列表
+        limit: 最多返回的行数
+
+    Returns:
+        DataFrame，按 日期 排序
+    """
+    import pandas as pd
+    conditions, params = [], []
+    # 给了账套编号或基金代码时，业务类别、平台的取值少、命中行多，加 + 号让 SQLite 不选它们的索引
+    selective = bool(account or fund_code)
+    for field, value in (('账套编号', account), ('基金市场代码', fund_code), ('业务类别', category), ('基金平台', platform)):
+        if value:
+            prefix = '+' if selective and field in ('业务类别', '基金平台') else ''
+            conditions.append(f'{prefix}"{field}" = ?')
+            params.append(value)
+    if start:
+        conditions.append('"日期" >= ?')
+        params.append(start.ljust(8, '0'))
+    if end:
+        conditions.append('"日期" <= ?')
+        params.append(end.ljust(8, '9'))
+    if tasks:
+        conditions.append(f'"单据类型" IN ({", ".join("?" for _ in tasks)})')
+        params.extend(tasks)
+    sql = f'SELECT * FROM "{TABLE}"'
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    sql += ' ORDER BY "日期", id'
+    if limit:
+        sql += f' LIMIT {int(limit)}'
+    conn = connect(db_path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+
+def output_folders(root, start=None, end=None):
+    """列出主目录下已有输出的日期目录 <主目录>/<年>/<YYYYMMDD>
+
+    Returns:
+        [(运行日期, 目录), ...]，按日期排序
+    """
+    low, high = (start or '').ljust(8, '0'), (end or '').ljust(8, '9')
+    folders = []
+    if not os.path.isdir(root):
+        return folders
+    for year in sorted(os.listdir(root)):
+        year_dir = os.path.join(root, year)
+        if not (year.isdigit() and len(year) == 4 and os.path.isdir(year_dir)):
+            continue
+        for day in sorted(os.listdir(year_dir)):
+            if len(day) == 8 and day.isdigit() and low <= day <= high:
+                try:
+                    datetime.strptime(day, '%Y%m%d')
+                except ValueError:
+                    continue
+                folders.append((day, os.path.join(year_dir, day)))
+    return folders
@@ -0,0 +1,203 @@
+import os
+import json
+import threading
+from datetime import datetime
+
+# ========== 处理清单 ===============
+# 每天一份，放在输出目录 <主目录>/<年>/<日期>/处理清单.jsonl。每处理完一个源文件追加一行：
+# 单据类型、文件路径、指纹（大小、修改时间）、状态、产出的记录编号和记录内容。
+# 再次运行时指纹未变的文件不再读取和解析，直接沿用清单中的记录；新增或修改的文件重新提取，
+# 已删除文件的记录不再输出。中途崩溃后重跑，已写入清单的文件也不必重新处理。
+# 清单中的记录是映射账套编号之前的原始记录，映射文件更新后重跑仍会按新映射输出。
+
+MANIFEST_FILENAME = "处理清单.jsonl"
+# 提取逻辑有不兼容的改动时加一，旧版本清单中的条目全部视为需要重新处理
+MANIFEST_VERSION = 1
+
+STATUS_DONE = 'done'       # 已提取，records 为产出的记录（可能为空，如未识别的平台）
+STATUS_FAILED = 'failed'   # 处理失败，下次运行重新处理
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path):
+    with _locks_guard:
+        return _locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def manifest_path_for(output_folder):
+    return os.path.join(output_folder, MANIFEST_FILENAME)
+
+
+def reset(output_folder):
+    """删除当天的处理清单，下次运行全部重新提取"""
+    path = manifest_path_for(output_folder)
+    with _lock_for(path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _read_entries(path):
+    """逐行读取清单条目，跳过崩溃时只写了一半的行；调用方持有锁"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def current_files(output_folder, tasks):
+    """清单中按当前指纹已成功处理过的文件（tasks 中任一类型）
+
+    扫描后统一预取首页文本前调用：这些文件由提取器直接沿用清单中的记录，不必先提取文本。
+    其它类型仍需处理的，由该类型的提取器在遍历到所在目录时补提取。
+
+    Args:
+        output_folder: 当天的输出目录
+        tasks: 本次运行的单据类型
+
+    Returns:
+        文件路径集合
+    """
+    path = manifest_path_for(output_folder)
+    tasks = set(tasks)
+    latest = {}  # (单据类型, 文件路径) -> 最后一条条目
+    with _lock_for(path):
+        for entry in _read_entries(path):
+            if entry.get('task') in tasks and entry.get('version') == MANIFEST_VERSION:
+                latest[(entry['task'], entry['file'])] = entry
+    return {
+        file_path for (_, file_path), entry in latest.items()
+        if entry['status'] == STATUS_DONE and entry['fingerprint'] == file_fingerprint(file_path)
+    }
+
+
+def file_fingerprint(file_path):
+    """文件指纹 [大小, 修改时间(纳秒)]；文件不存在时返回 None"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class FileManifest:
+    """一个单据类型在当天处理清单中的条目
+
+    由 iter_documents 在每个文件开始和结束时调用（通过 ExtractionStats.manifest），
+    由 RecordSink 登记文件产出的记录、回放未变化文件的记录。
+
+    Args:
+        output_folder: 当天的输出目录
+        task: 单据类型，如 'dividend'
+    """
+
+    def __init__(self, output_folder, task):
+        self.path = manifest_path_for(output_folder)
+        self.task = task
+        self.sink = None
+        self._lock = _lock_for(self.path)
+        self._entries = self._load()  # 文件路径 -> 清单条目
+        self._seen = set()            # 本次运行遍历到的文件
+        self._current = None          # 正在处理的文件
+        self._fingerprint = None      # 正在处理的文件开始读取前的指纹
+        self._records = []
+        self.unchanged = 0
+        self.reprocessed = 0
+
+    def _load(self):
+        entries = {}
+        with self._lock:
+            for entry in _read_entries(self.path):
+                if entry.get('task') == self.task and entry.get('version') == MANIFEST_VERSION:
+                    entries[entry['file']] = entry
+        return entries
+
+    def attach(self, sink):
+        """绑定写出阶段，未变化文件的记录回放给它"""
+        self.sink = sink
+
+    def is_current(self, file_path):
+        """文件已按当前指纹成功处理过"""
+        self._seen.add(file_path)
+        entry = self._entries.get(file_path)
+        return (entry is not None and entry['status'] == STATUS_DONE
+                and entry['fingerprint'] == file_fingerprint(file_path))
+
+    def replay(self, file_path):
+        """沿用清单中的记录"""
+        self.unchanged += 1
+        if self.sink is not None:
+            for record in self._entries[file_path]['records']:
+                self.sink.write(record, source=file_path)
+
+    def begin(self, file_path):
+        """开始处理一个新增或修改的文件
+
+        指纹在读取前取得：处理期间文件被改写时，清单中记的是旧指纹，下次运行会重新处理。
+        """
+        self._seen.add(file_path)
+        self._current = file_path
+        self._fingerprint = file_fingerprint(file_path)
+        self._records = []
+        if file_path in self._entries:
+            self.reprocessed += 1
+
+    def add(self, record):
+        """登记当前文件产出的一条记录，返回当前文件路径"""
+        if self._current is not None:
+            self._records.append(record)
+        return self._current
+
+    def commit(self, file_path, failed=False):
+        """当前文件处理结束，追加一行清单"""
+        base = os.path.splitext(os.path.basename(file_path))[0]
+        entry = {
+            'task': self.task,
+            'version': MANIFEST_VERSION,
+            'file': file_path,
+            'fingerprint': self._fingerprint if file_path == self._current else file_fingerprint(file_path),
+            'status': STATUS_FAILED if failed else STATUS_DONE,
+            'record_ids': [f"{base}#{i + 1}" for i in range(len(self._records))],
+            'records': self._records,
+            'time': datetime.now().isoformat(timespec='seconds'),
+        }
+        self._entries[file_path] = entry
+        self._current = None
+        self._fingerprint = None
+        self._records = []
+        self._append([entry])
+
+    def _append(self, entries):
+        content = ''.join(json.dumps(e, ensure_ascii=False, default=str) + '\n' for e in entries)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(content)
+
+    def close(self):
+        """遍历结束后整理清单：去掉本类型已删除文件和被覆盖的旧条目，其它类型的条目原样保留"""
+        keep = [entry for file_path, entry in self._entries.items() if file_path in self._seen]
+        with self._lock:
+            if not keep and not os.path.exists(self.path):
+                return 0
+            others = []
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        if entry.get('task') != self.task:
+                            others.append(line if line.endswith('\n') else line + '\n')
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(others)
+                f.writelines(json.dumps(e, ensure_ascii=False, default=str) + '\n' for e in keep)
+            os.replace(tmp_path, self.path)
+        return len(self._entries) - len(keep)
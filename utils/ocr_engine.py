@@ -0,0 +1,102 @@
+import gc
+import threading
+
+# EasyOCR 识别语言：中文简体和英文
+OCR_LANGUAGES = ['ch_sim', 'en']
+
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def is_loaded():
+    """OCR模型是否已经加载"""
+    return _reader is not None
+
+
+def get_reader():
+    """返回进程内共享的 EasyOCR Reader，首次调用时加载模型
+
+    模型加载需要数秒和数百MB内存，一次运行中所有万事如意提取器共用同一个 Reader。
+    加载失败时抛出异常，由调用方记录日志。
+    """
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            # 在函数内部导入easyocr，避免打包时的导入错误
+            import easyocr
+            _reader = easyocr.Reader(OCR_LANGUAGES, gpu=False)  # 不使用GPU
+        return _reader
+
+
+def shutdown():
+    """释放 OCR 模型，在一次提取任务结束时调用"""
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            return
+        _reader = None
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except Exception:
+        pass
+
+
+def pixmap_to_array(pix):
+    """将 PyMuPDF 的 Pixmap 转为 NumPy 数组，不做拷贝
+
+    数组直接引用 pix 的像素缓冲区，使用期间需保持 pix 存活。
+
+    Args:
+        pix: fitz.Pixmap 对象（RGB 或灰度）
+
+    Returns:
+        形状为 (高, 宽) 或 (高, 宽, 通道数) 的 uint8 数组
+    """
+    import numpy as np
+    samples = getattr(pix, 'samples_mv', None) or pix.samples
+    arr = np.frombuffer(samples, dtype=np.uint8)
+    if pix.n == 1:
+        return arr.reshape(pix.height, pix.width)
+    arr = arr.reshape(pix.height, pix.width, pix.n)
+    if pix.alpha:
+        arr = arr[:, :, :pix.n - 1]
+    return arr
+
+
+def readtext_pixmap(pix):
+    """直接识别内存中的页面图像，不经过临时PNG文件
+
+    Args:
+        pix: fitz.Pixmap 对象
+
+    Returns:
+        EasyOCR 的识别结果 [(bbox, text, prob), ...]
+    """
+    reader = get_reader()
+    return reader.readtext(pixmap_to_array(pix))
+
+
+# 文本层有效字符数下限，低于该值视为扫描件，需要OCR
+MIN_TEXT_LAYER_CHARS = 30
+
+
+def text_layer_lines(page, min_chars=MIN_TEXT_LAYER_CHARS):
+    """读取页面自带的文本层
+
+    银行系统直接生成的确认单大多带有文本层，无需OCR。
+
+    Args:
+        page: fitz.Page 对象
+        min_chars: 有效字符数下限
+
+    Returns:
+        文本行列表；没有文本层或文本过少时返回 None
+    """
+    text = page.get_text("text") or ''
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    if sum(len(line.replace(' ', '')) for line in lines) < min_chars:
+        return None
+    return lines
@@ -0,0 +1,235 @@
+import os
+import re
+import json
+import time
+import threading
+from utils import ocr_engine, run_report
+from utils.common import log
+
+# PyMuPDF 在用到的函数中导入：界面启动时会导入本模块（reset_learn_failures），不应加载 PyMuPDF
+
+DEFAULT_TEMPLATE_FILENAME = "ocr_templates.json"
+
+# 各类万事如意单据需要识别的字段（按标签文字定位）
+# 提取器用前几行判断单据类型，判断依据（申购申请单的标题、确认单的业务类型）放在最前面
+TEMPLATE_FIELDS = {
+    'manual_dividend': ['基金代码', '确认金额'],
+    'manual_purchase_apply': ['基金交易申请受理单', '基金代码', '小写'],
+    'manual_purchase_confirm': ['业务类型', '基金代码', '确认金额', '申请金额', '确认份额'],
+    'manual_redemption': ['业务类型', '基金代码', '确认金额', '确认份额'],
+}
+
+# 字段区域：标签左侧留白、向右延伸的宽度和上下留白（均为页面宽/高的比例）
+FIELD_LEFT_PAD = 0.01
+FIELD_RIGHT_EXTEND = 0.45
+FIELD_VERTICAL_PAD = 0.6  # 相对标签高度
+# 识别框右边缘离区域右边界不足该像素数时，取值可能被截断
+FIELD_EDGE_MARGIN_PX = 3
+
+# 字段取值的格式：金额须为完整的千分位和两位小数（份额为两到四位小数），基金代码为6位字母数字；
+# 区域裁掉了取值末尾（如 "1,234,56"、少一位数字）时不符合格式，回退到整页OCR
+_AMOUNT = re.compile(r'(?<![\d,.])(?:\d{1,3}(?:,\d{3})+|\d+)\.\d{2}(?![\d,.])')
+_SHARES = re.compile(r'(?<![\d,.])(?:\d{1,3}(?:,\d{3})+|\d+)\.\d{2,4}(?![\d,.])')
+_CODE = re.compile(r'(?<![A-Za-z0-9])[A-Za-z0-9]{6}(?![A-Za-z0-9])')
+FIELD_FORMATS = {
+    '基金代码': _CODE,
+    '确认金额': _AMOUNT,
+    '申请金额': _AMOUNT,
+    '确认份额': _SHARES,
+    '小写': _AMOUNT,
+}
+
+# 自适应分辨率：让字段区域渲染后的高度接近该像素值
+TARGET_FIELD_HEIGHT_PX = 64
+MIN_ZOOM = 1.5
+MAX_ZOOM = 4.0
+# 学习模板时整页识别的缩放倍数
+LEARN_ZOOM = 3.0
+
+_template_lock = threading.Lock()
+# 本次运行中学习模板失败的 (模板文件, 单据类型)，之后的单据不再整页识别学习，直接由调用方整页OCR
+_learn_failed = set()
+
+
+def template_path_for(json_path):
+    """模板文件与产品代码映射文件放在同一目录"""
+    return os.path.join(os.path.dirname(json_path), DEFAULT_TEMPLATE_FILENAME)
+
+
+def load_templates(template_path):
+    if not os.path.exists(template_path):
+        return {}
+    try:
+        with open(template_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        log(f"OCR模板加载失败: {e}")
+        return {}
+
+
+def reset_learn_failures():
+    """每次运行开始时调用，上次运行学习失败的类型重新尝试学习"""
+    with _template_lock:
+        _learn_failed.clear()
+
+
+def save_template(template_path, doc_type, template):
+    """写入（或覆盖）某一类单据的模板"""
+    with _template_lock:
+        templates = load_templates(template_path)
+        templates[doc_type] = template
+        with open(template_path, 'w', encoding='utf-8') as f:
+            json.dump(templates, f, ensure_ascii=False, indent=2)
+
+
+def learn_template(pdf_path, doc_type, page_num=0):
+    """从一份参考单据学习字段区域
+
+    整页OCR一次，找到每个字段标签的位置，把“标签 + 右侧取值”所在的横条记为字段区域。
+    坐标按页面宽高归一化，不受扫描分辨率影响。
+
+    Returns:
+        模板字典；有字段标签未找到时返回 None
+    """
+    import fitz  # PyMuPDF
+    labels = TEMPLATE_FIELDS[doc_type]
+    doc = fitz.open(pdf_path)
+    try:
+        page = doc.load_page(page_num)
+        page_w, page_h = page.rect.width, page.rect.height
+        pix = page.get_pixmap(matrix=fitz.Matrix(LEARN_ZOOM, LEARN_ZOOM))
+        results = ocr_engine.readtext_pixmap(pix)
+    finally:
+        doc.close()
+
+    fields = {}
+    for label in labels:
+        for bbox, text, prob in results:
+            if label not in text:
+                continue
+            xs = [p[0] / LEARN_ZOOM for p in bbox]
+            ys = [p[1] / LEARN_ZOOM for p in bbox]
+            x0, x1, y0, y1 = min(xs), max(xs), min(ys), max(ys)
+            pad = (y1 - y0) * FIELD_VERTICAL_PAD
+            fields[label] = [
+                max(0.0, x0 / page_w - FIELD_LEFT_PAD),
+                max(0.0, (y0 - pad) / page_h),
+                min(1.0, x1 / page_w + FIELD_RIGHT_EXTEND),
+                min(1.0, (y1 + pad) / page_h),
+            ]
+            break
+    if len(fields) != len(labels):
+        return None
+    return {'page': page_num, 'fields': fields, 'source': os.path.basename(pdf_path)}
+
+
+def _field_zoom(rect):
+    """按字段区域高度选择渲染倍数"""
+    if rect.height <= 0:
+        return MAX_ZOOM
+    return max(MIN_ZOOM, min(MAX_ZOOM, TARGET_FIELD_HEIGHT_PX / rect.height))
+
+
+def ocr_template_fields(page, template):
+    """只渲染并识别模板中的字段区域
+
+    Returns:
+        (lines, clipped)：每个字段一行文本，顺序与模板一致；识别框碰到区域右边界的字段标签
+    """
+    import fitz  # PyMuPDF
+    page_w, page_h = page.rect.width, page.rect.height
+    lines = []
+    clipped = []
+    for label, (x0, y0, x1, y1) in template['fields'].items():
+        rect = fitz.Rect(x0 * page_w, y0 * page_h, x1 * page_w, y1 * page_h)
+        zoom = _field_zoom(rect)
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=rect)
+        results = ocr_engine.readtext_pixmap(pix)
+        # 按从上到下、从左到右拼接区域内的识别结果
+        results = sorted(results, key=lambda r: (r[0][0][1], r[0][0][0]))
+        kept = [(bbox, text) for bbox, text, prob in results if prob > 0.3]
+        if any(max(p[0] for p in bbox) >= pix.width - FIELD_EDGE_MARGIN_PX for bbox, text in kept):
+            clipped.append(label)
+        lines.append(' '.join(text for bbox, text in kept))
+    return lines, clipped
+
+
+def malformed_fields(labels, lines):
+    """取值不符合 FIELD_FORMATS 的字段标签"""
+    malformed = []
+    for label, line in zip(labels, lines):
+        pattern = FIELD_FORMATS.get(label)
+        if pattern is not None and not pattern.search(line.replace(label, '', 1)):
+            malformed.append(label)
+    return malformed
+
+
+def extract_template_text(pdf_path, doc_type, template_path, validate, log_func=print):
+    """按字段模板做区域OCR
+
+    带文本层的PDF交给整页提取流程处理；模板不存在时用当前单据学习一份，
+    学习失败后本次运行的其余单据不再学习。区域识别结果未通过 validate 校验、
+    取值碰到区域边界或格式不符时返回空结果，由调用方回退到整页OCR。
+
+    Args:
+        pdf_path: PDF文件路径
+        doc_type: TEMPLATE_FIELDS 中的单据类型
+        template_path: 模板文件路径
+        validate: 校验函数 validate(text, lines) -> bool
+        log_func: 日志函数
+
+    Returns:
+        (text, lines)；无法使用模板时返回 ("", [])
+    """
+    import fitz  # PyMuPDF
+    try:
+        doc = fitz.open(pdf_path)
+        try:
+            first_page = doc.load_page(0)
+            if ocr_engine.text_layer_lines(first_page) is not None:
+                return "", []
+        finally:
+            doc.close()
+
+        template = load_templates(template_path).get(doc_type)
+        if template is not None and list(template['fields']) != TEMPLATE_FIELDS[doc_type]:
+            # 字段定义改过（如申购申请单增加了标题），旧模板作废，重新学习
+            log_func(f"{doc_type} 的OCR字段模板与当前字段定义不一致，重新学习")
+            template = None
+        if template is None:
+            failure_key = (os.path.abspath(template_path), doc_type)
+            if failure_key in _learn_failed:
+                return "", []
+            log_func(f"未找到 {doc_type} 的OCR字段模板，使用当前单据学习: {pdf_path}")
+            template = learn_template(pdf_path, doc_type)
+            if template is None:
+                with _template_lock:
+                    _learn_failed.add(failure_key)
+                log_func("模板学习失败：参考单据中未找到全部字段标签，本次运行的其余单据直接整页OCR")
+                return "", []
+            save_template(template_path, doc_type, template)
+            log_func(f"OCR字段模板已保存: {template_path}")
+
+        doc = fitz.open(pdf_path)
+        try:
+            if template['page'] >= len(doc):
+                return "", []
+            page_start = time.perf_counter()
+            lines, clipped = ocr_template_fields(doc.load_page(template['page']), template)
+            run_report.add_page(pdf_path, template['page'] + 1, '字段区域', time.perf_counter() - page_start)
+        finally:
+            doc.close()
+        text = '\n'.join(lines)
+        for label, line in zip(template['fields'], lines):
+            log_func(f"字段区域识别 [{label}]: {line}")
+        if not validate(text, lines):
+            log_func("字段区域识别结果不完整，回退到整页OCR")
+            return "", []
+        suspect = clipped + [label for label in malformed_fields(template['fields'], lines) if label not in clipped]
+        if suspect:
+            log_func(f"字段区域取值可能被截断（{'、'.join(suspect)}），回退到整页OCR")
+            return "", []
+        return text, lines
+    except Exception as e:
+        log_func(f"字段区域识别失败，回退到整页OCR: {e}")
+        return "", []
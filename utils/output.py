@@ -0,0 +1,190 @@
+import os
+import threading
+import importlib.util
+
+# ========== 输出 ===============
+# 各提取器的结果表都经 write_table 写出，不再用 pd.ExcelWriter(engine='openpyxl') + to_excel：
+# - Excel 用流式写法逐行写出：装了 xlsxwriter 时用其 constant_memory 模式，否则用 openpyxl 的 write_only 模式，
+#   都不在内存中构建整个工作簿的对象树；
+# - 默认沿用原来的 .xls 文件名（内容为 xlsx），下游按文件名读取的流程不受影响；legacy_names=False 时改用 .xlsx；
+# - 可另写同名的 CSV（UTF-8 带 BOM，Excel 可直接打开）和 Parquet 文件，便于导入数据库；
+# - single_workbook 模式下本次运行的各张表先暂存，结束时由 write_combined 一次写入同一个工作簿；
+#   写出后才做的事（归档、写历史库）经 after_write 登记，汇总工作簿写成功后才执行。
+
+FORMATS = ('xlsx', 'csv', 'parquet')
+COMBINED_BASENAME = "基金单汇总"
+DEFAULT_SHEET_NAME = 'Sheet1'
+MAX_SHEET_NAME = 31  # Excel 工作表名称长度上限
+
+
+class OutputSettings:
+    """输出方式
+
+    Args:
+        formats: 写出的格式，xlsx 之外可加 'csv'、'parquet'
+        single_workbook: 各张表是否合并写入同一个工作簿（每张表一个工作表）
+        legacy_names: 是否保留原来的 .xls 文件名，False 时改为 .xlsx
+    """
+
+    def __init__(self, formats=('xlsx',), single_workbook=False, legacy_names=True):
+        unknown = [f for f in formats if f not in FORMATS]
+        if unknown:
+            raise ValueError(f"未知的输出格式: {', '.join(unknown)}")
+        if 'parquet' in formats and not parquet_available():
+            raise ValueError("写出 Parquet 需要先安装 pyarrow")
+        self.formats = tuple(f for f in FORMATS if f in formats or f == 'xlsx')
+        self.single_workbook = single_workbook
+        self.legacy_names = legacy_names
+
+
+_settings = OutputSettings()
+_pending = {}  # 输出目录 -> [(工作表名, DataFrame)]，single_workbook 模式下等待 write_combined
+_after = {}    # 输出目录 -> [(函数, 参数, 关键字参数)]，汇总工作簿写成功后执行
+_pending_lock = threading.Lock()
+
+
+def configure(formats=('xlsx',), single_workbook=False, legacy_names=True):
+    """设置之后各次运行的输出方式，返回 OutputSettings"""
+    global _settings
+    _settings = OutputSettings(formats, single_workbook, legacy_names)
+    return _settings
+
+
+def parse_formats(value):
+    """解析 "csv,parquet" 形式的附加格式"""
+    formats = [f.strip().lower() for f in (value or '').split(',') if f.strip()]
+    OutputSettings(formats)
+    return formats
+
+
+def parquet_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def xlsx_path(output_file, legacy_names=None):
+    """返回实际写出的 xlsx 路径：保留原文件名，或把 .xls 改为 .xlsx"""
+    legacy_names = _settings.legacy_names if legacy_names is None else legacy_names
+    stem, ext = os.path.splitext(output_file)
+    if legacy_names or ext.lower() == '.xlsx':
+        return output_file
+    return stem + '.xlsx'
+
+
+def _rows(df):
+    """逐行返回单元格值，缺失值为 None（写成空单元格）"""
+    values = df.astype(object).where(df.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        yield [v.item() if hasattr(v, 'item') else v for v in row]
+
+
+def _write_sheets(path, sheets):
+    """流式写出一个或多个工作表 [(工作表名, DataFrame), ...]"""
+    if importlib.util.find_spec('xlsxwriter') is not None:
+        import xlsxwriter
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'nan_inf_to_errors': True})
+        try:
+            for name, df in sheets:
+                ws = workbook.add_worksheet(name)
+                ws.write_row(0, 0, [str(c) for c in df.columns])
+                for i, row in enumerate(_rows(df), start=1):
+                    ws.write_row(i, 0, row)
+        finally:
+            workbook.close()
+        return
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    for name, df in sheets:
+        ws = workbook.create_sheet(name)
+        ws.append([str(c) for c in df.columns])
+        for row in _rows(df):
+            ws.append(row)
+    workbook.save(path)
+
+
+def parquet_frame(df):
+    """object 列里可能混有数字和文本，统一转为文本，避免 pyarrow 推断类型失败"""
+    import pandas as pd
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].map(lambda v: None if pd.isna(v) else str(v))
+    return df
+
+
+def sheet_name_for(output_file):
+    return os.path.splitext(os.path.basename(output_file))[0][:MAX_SHEET_NAME]
+
+
+def write_table(df, output_file, sheet_name=DEFAULT_SHEET_NAME):
+    """写出一张结果表
+
+    Args:
+        df: 结果 DataFrame
+        output_file: 原来的输出文件路径，如 <输出目录>/【境内基金业务】申购申请.xls
+        sheet_name: 单独写出时的工作表名
+
+    Returns:
+        写出的 Excel 路径；single_workbook 模式下为汇总工作簿路径，运行结束时才写出
+    """
+    settings = _settings
+    output_folder = os.path.dirname(output_file)
+    stem = os.path.splitext(output_file)[0]
+    if 'csv' in settings.formats:
+        df.to_csv(stem + '.csv', index=False, encoding='utf-8-sig')
+    if 'parquet' in settings.formats:
+        parquet_frame(df).to_parquet(stem + '.parquet', index=False)
+
+    if settings.single_workbook:
+        with _pending_lock:
+            sheets = _pending.setdefault(output_folder, [])
+            name = sheet_name_for(output_file)
+            sheets[:] = [(n, d) for n, d in sheets if n != name] + [(name, df)]
+        return combined_path(output_folder)
+
+    path = xlsx_path(output_file, settings.legacy_names)
+    _write_sheets(path, [(sheet_name, df)])
+    return path
+
+
+def combined_path(output_folder):
+    return os.path.join(output_folder, COMBINED_BASENAME + '.xlsx')
+
+
+def after_write(output_file, func, *args, **kwargs):
+    """登记输出文件写成功后才做的事
+
+    单独写出时 write_table 已经写完，立即执行；single_workbook 模式下等汇总工作簿写成功后
+    由 write_combined 执行，写入失败时不执行（处理清单保留，重跑时可恢复）。
+
+    Args:
+        output_file: write_table 返回的路径
+        func: 要执行的函数，其余参数原样传给它
+    """
+    if not _settings.single_workbook:
+        return func(*args, **kwargs)
+    with _pending_lock:
+        _after.setdefault(os.path.dirname(output_file), []).append((func, args, kwargs))
+    return None
+
+
+def write_combined():
+    """把 single_workbook 模式下暂存的表写入各输出目录的汇总工作簿，写成功后执行 after_write 登记的事
+
+    Returns:
+        写出的工作簿路径列表
+    """
+    with _pending_lock:
+        pending = dict(_pending)
+        after = dict(_after)
+        _pending.clear()
+        _after.clear()
+    paths = []
+    for output_folder, sheets in pending.items():
+        if not sheets:
+            continue
+        path = combined_path(output_folder)
+        _write_sheets(path, sorted(sheets, key=lambda sheet: sheet[0]))
+        paths.append(path)
+        for func, args, kwargs in after.get(output_folder, ()):
+            func(*args, **kwargs)
+    return paths
@@ -0,0 +1,168 @@
+# ========== PDF文本提取后端 ===============
+# pdfplumber：原有方式，基于 pdfminer 的版面分析，纯 Python，较慢。
+# pymupdf：MuPDF（C 实现）取出字符坐标，再按 pdfplumber extract_text 的规则拼成行，
+#          使各平台基于 lines 的解析规则不用修改。两者结果是否一致可用 tools/compare_pdf_backends.py 核对。
+
+import time
+
+DEFAULT_BACKEND = 'pdfplumber'
+
+# 与 pdfplumber extract_text 的默认容差一致（单位：pt）
+X_TOLERANCE = 3
+Y_TOLERANCE = 3
+
+
+def _pdfplumber_pages(file_path, start, stop, timings):
+    import pdfplumber
+    begin = time.perf_counter()
+    with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
+        opened = time.perf_counter()
+        page_texts = [page.extract_text() or '' for page in pdf.pages[start:stop]]
+    timings['open'] += opened - begin
+    timings['text'] += time.perf_counter() - opened
+    return page_texts, page_count
+
+
+def _pymupdf_pages(file_path, start, stop, timings):
+    import fitz  # PyMuPDF
+    begin = time.perf_counter()
+    with fitz.open(file_path) as doc:
+        page_count = doc.page_count
+        opened = time.perf_counter()
+        stop = page_count if stop is None else min(stop, page_count)
+        page_texts = [_pymupdf_page_text(doc[i]) for i in range(start, stop)]
+    timings['open'] += opened - begin
+    timings['text'] += time.perf_counter() - opened
+    return page_texts, page_count
+
+
+def _font_descent(span):
+    """字体下沿（相对字号，负数）
+
+    pdfminer 对标准14字体使用 AFM 中的 Descent，其余字体使用 FontDescriptor 的 Descent，
+    后者与 MuPDF 从字体读出的 descender 基本一致。
+    """
+    from pdfminer.fontmetrics import FONT_METRICS
+    metrics = FONT_METRICS.get(span['font'])
+    if metrics is not None:
+        return -abs(metrics[0].get('Descent', 0)) / 1000
+    return -abs(span['descender'])
+
+
+# 与 pdfplumber 一致：连字拆成普通字母
+LIGATURES = {'ﬀ': 'ff', 'ﬃ': 'ffi', 'ﬄ': 'ffl', 'ﬁ': 'fi', 'ﬂ': 'fl', 'ﬆ': 'st', 'ﬅ': 'st'}
+
+
+def _pymupdf_page_text(page):
+    import fitz  # PyMuPDF
+    # 不让 MuPDF 按间距自行补空格（断词交给 normalize_chars），也不裁掉页面外的字符（pdfplumber 会保留）
+    flags = fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_INHIBIT_SPACES
+    chars = []
+    for block in page.get_text('rawdict', flags=flags, clip=fitz.INFINITE_RECT())['blocks']:
+        for line in block.get('lines', ()):
+            for span in line['spans']:
+                # 字符顶部按 pdfminer 的方式计算：基线 - 字号 * (1 + 下沿)，换行判断才能与 pdfplumber 一致
+                height = span['size'] * (1 + _font_descent(span))
+                for char in span['chars']:
+                    x0, _, x1, _ = char['bbox']
+                    chars.append((char['origin'][1] - height, x0, x1, char['c']))
+    return normalize_chars(chars)
+
+
+def _cluster_ids(values, tolerance):
+    """与 pdfplumber 的 cluster_list 一致：排序后相邻值相差不超过 tolerance 的归为一组
+
+    Returns:
+        {值: 组号}
+    """
+    ids = {}
+    cluster = -1
+    last = None
+    for value in sorted(set(values)):
+        if last is None or value > last + tolerance:
+            cluster += 1
+        ids[value] = cluster
+        last = value
+    return ids
+
+
+def normalize_chars(chars, x_tolerance=X_TOLERANCE, y_tolerance=Y_TOLERANCE):
+    """按 pdfplumber extract_text 的规则把字符拼成文本
+
+    1. 按字符顶部坐标聚类成行，行内按横坐标排序；
+    2. 遇到空白字符、字符间距大于 x_tolerance 或上下错开超过 y_tolerance 时断词；
+    3. 再按词的顶部坐标聚类，相邻且同组的词用一个空格连接成行，行之间用换行连接。
+
+    Args:
+        chars: [(top, x0, x1, 字符), ...]，按内容流顺序
+
+    Returns:
+        页面文本，行尾不带换行
+    """
+    line_ids = _cluster_ids([char[0] for char in chars], y_tolerance)
+    lines = {}
+    for char in chars:
+        lines.setdefault(line_ids[char[0]], []).append(char)
+
+    words = []  # [(top, text), ...]
+    for line_id in sorted(lines):
+        word = []
+        for char in sorted(lines[line_id], key=lambda ch: ch[1]):
+            top, x0, x1, c = char
+            if c.isspace():
+                if word:
+                    words.append(word)
+                word = []
+                continue
+            if word:
+                prev_top, prev_x0, prev_x1, _ = word[-1]
+                if x0 < prev_x0 or x0 > prev_x1 + x_tolerance or abs(top - prev_top) > y_tolerance:
+                    words.append(word)
+                    word = []
+            word.append(char)
+        if word:
+            words.append(word)
+    words = [(min(char[0] for char in word), ''.join(LIGATURES.get(char[3], char[3]) for char in word)) for word in words]
+
+    word_ids = _cluster_ids([top for top, _ in words], y_tolerance)
+    texts = []
+    last_id = None
+    for top, text in words:
+        if word_ids[top] == last_id:
+            texts[-1] += ' ' + text
+        else:
+            texts.append(text)
+            last_id = word_ids[top]
+    return '\n'.join(texts)
+
+
+BACKENDS = {
+    'pdfplumber': _pdfplumber_pages,
+    'pymupdf': _pymupdf_pages,
+}
+
+
+def extract_pages(file_path, start=0, stop=None, backend=None, timings=None):
+    """提取PDF第 start 页到第 stop 页（不含）的文本
+
+    Args:
+        file_path: PDF文件路径
+        start: 起始页（从0开始）
+        stop: 结束页，None 为到最后一页
+        backend: BACKENDS 中的名称，默认 DEFAULT_BACKEND
+        timings: 传入 {'open': 0.0, 'text': 0.0} 时累加打开文件和提取文本的耗时（秒）
+
+    Returns:
+        (page_texts, page_count): 各页文本（无文本的页为空字符串），以及PDF总页数
+    """
+    if timings is None:
+        timings = {'open': 0.0, 'text': 0.0}
+    return BACKENDS[backend or DEFAULT_BACKEND](file_path, start, stop, timings)
+
+
+def check_backend(backend):
+    """校验后端名称，未知时抛出 ValueError"""
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(f"未知的PDF文本提取方式: {backend}，可选: {', '.join(BACKENDS)}")
+    return backend
@@ -0,0 +1,217 @@
+import os
+import threading
+import contextlib
+import pandas as pd
+from utils.common import log, LOG_DETAIL
+from utils.records import RecordBatch
+
+# 每累计多少条记录落盘一次
+DEFAULT_BATCH_SIZE = 200
+
+# ========== 提取流水线 ===============
+# 遍历目录 -> 读取文本 -> 识别平台并提取 -> 写出。前三个阶段都是生成器，记录边提取边产出，
+# 各提取器的 iter_*_records 即为记录流，界面、命令行或测试脚本都可以直接消费；
+# RecordSink 负责分批写出。
+# 传入处理清单（utils.manifest.FileManifest）时，指纹未变的文件不再读取和解析，
+# 由 RecordSink 直接写出清单中保存的记录。
+
+
+_outcome = threading.local()
+
+
+class ExtractionFailed:
+    """提取器加载映射文件或写出结果失败时的返回值
+
+    与原来的 False 一样为假，界面照常处理；命令行据此把该类型记为失败，而不是 "没有单据"。
+    """
+
+    def __init__(self, reason):
+        self.reason = reason
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return f"ExtractionFailed({self.reason!r})"
+
+
+class TaskOutcome:
+    """命令行执行一个类型期间，收集该线程中 ExtractionStats 记录的失败文件（见 collect_outcome）"""
+
+    def __init__(self):
+        self.failed_files = []
+
+
+@contextlib.contextmanager
+def collect_outcome():
+    """with 块内收集当前线程中处理失败的文件，返回 TaskOutcome"""
+    previous = getattr(_outcome, 'current', None)
+    _outcome.current = TaskOutcome()
+    try:
+        yield _outcome.current
+    finally:
+        _outcome.current = previous
+
+
+class ExtractionStats:
+    """一次提取任务的文件计数
+
+    Args:
+        manifest: 当天的处理清单（FileManifest），为空时每个文件都重新处理
+    """
+
+    def __init__(self, manifest=None):
+        self.total_files = 0
+        self.processed_files = 0
+        self.failed_files = []
+        self.scanned_dirs = 0
+        self.manifest = manifest
+
+    def fail(self, file_path, error, log_text=None):
+        """记录处理失败的文件"""
+        self.failed_files.append(file_path)
+        outcome = getattr(_outcome, 'current', None)
+        if outcome is not None:
+            outcome.failed_files.append(file_path)
+        log(f"处理PDF失败: {file_path}", log_text)
+        log(f"错误信息: {error}", log_text)
+
+    def report(self, log_text=None):
+        """显示最终处理结果"""
+        if self.failed_files:
+            log(f"有 {len(self.failed_files)} 个文件处理失败:", log_text)
+            for failed_file in self.failed_files:
+                log(f"- {failed_file}", log_text)
+        else:
+            log(f"所有 {self.total_files} 个文件都已成功处理", log_text)
+        if self.manifest is not None and self.manifest.unchanged:
+            log(f"其中 {self.manifest.unchanged} 个文件与上次处理时相同，沿用处理清单中的记录", log_text)
+
+
+def iter_documents(documents, root_filter, file_filter, stats, log_text=None, read_text=True, pages=None):
+    """遍历阶段 + 读取阶段
+
+    Args:
+        documents: DocumentScan 对象
+        root_filter: 目录筛选函数 root_filter(root) -> bool
+        file_filter: 文件筛选函数 file_filter(file) -> bool
+        stats: ExtractionStats 对象
+        log_text: 日志文本框对象
+        read_text: 是否读取PDF文本；OCR类提取器自行读取时传 False
+        pages: 只读取前几页，None 为全部页；其余页可再用 documents.read_text 按需读取
+
+    Yields:
+        (file, file_path, text, lines)；read_text 为 False 时 text、lines 为 None
+    """
+    for root, dirs, files in documents.walk():
+        if not root_filter(root):
+            continue
+        stats.scanned_dirs += 1
+        log(f"扫描目录: {root}", log_text, LOG_DETAIL)
+
+        pdf_files = [f for f in files if file_filter(f)]
+        stats.total_files += len(pdf_files)
+        manifest = stats.manifest
+        unchanged = set()
+        if manifest is not None:
+            unchanged = {f for f in pdf_files if manifest.is_current(os.path.join(root, f))}
+        if read_text:
+            # 并行预取本目录下PDF的文本（已在共享扫描中提取过的会直接跳过）
+            documents.prefetch([os.path.join(root, f) for f in pdf_files if f not in unchanged], pages)
+
+        for file in pdf_files:
+            file_path = os.path.join(root, file)
+            if file in unchanged:
+                manifest.replay(file_path)
+                stats.processed_files += 1
+                continue
+            if read_text:
+                try:
+                    text, lines = documents.read_text(file_path, pages)
+                except Exception as e:
+                    stats.fail(file_path, e, log_text)
+                    continue
+            else:
+                text, lines = None, None
+            if manifest is not None:
+                manifest.begin(file_path)
+            failed = len(stats.failed_files)
+            yield file, file_path, text, lines
+            # 提取器处理完该文件、产出的记录都已写出后才会回到这里
+            if manifest is not None:
+                manifest.commit(file_path, failed=len(stats.failed_files) > failed)
+            if read_text:
+                documents.release(file_path)
+
+
+class RecordSink:
+    """写出阶段：按批次做数值转换和账套编号映射
+
+    每满 batch_size 条记录处理一批，close 时合并为结果表交给写出阶段。
+    任务中途失败时，已处理文件的记录保存在处理清单中（见 utils.manifest），重跑时直接沿用，不另写中间结果文件。
+    传入 manifest 时，每条记录同时登记到当前源文件名下，sources 与结果行一一对应记录来源文件。
+    """
+
+    def __init__(self, columns, numeric_cols=(), code_map=None, code_col='账套编号',
+                 batch_size=DEFAULT_BATCH_SIZE, manifest=None, name_col='产品名称'):
+        self.columns = list(columns)
+        self.numeric_cols = list(numeric_cols)
+        self.code_map = code_map
+        self.code_col = code_col
+        self.name_col = name_col
+        self.batch_size = batch_size
+        self.record_count = 0
+        self.sources = []  # 各行的来源文件，未传入 manifest 时为 None
+        self._batch = RecordBatch(self.columns)
+        self._chunks = []
+        self._names = set()  # 出现过的产品名称，供 report_mapping 使用
+        self.manifest = manifest
+        if manifest is not None:
+            manifest.attach(self)
+
+    def write(self, record, source=None):
+        """写入一条记录
+
+        Args:
+            record: 记录字典
+            source: 回放处理清单中的记录时为其来源文件；为空时登记到清单当前处理的文件名下
+        """
+        if source is None and self.manifest is not None:
+            source = self.manifest.add(record)
+        self.sources.append(source)
+        self._batch.append(record)
+        self.record_count += 1
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def consume(self, records):
+        for record in records:
+            self.write(record)
+        return self
+
+    def flush(self):
+        if not len(self._batch):
+            return
+        chunk = self._batch.to_frame(self.numeric_cols, self.code_map, self.name_col, self.code_col)
+        self._batch = RecordBatch(self.columns)
+        if self.name_col in chunk:
+            self._names.update(chunk[self.name_col].dropna())
+        self._chunks.append(chunk)
+
+    def close(self):
+        """处理剩余记录，返回全部结果"""
+        self.flush()
+        if self.manifest is not None:
+            self.manifest.close()
+        chunks, self._chunks = self._chunks, []
+        if not chunks:
+            return RecordBatch(self.columns).to_frame(self.numeric_cols, self.code_map, self.name_col, self.code_col)
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks, ignore_index=True)
+
+    def report_mapping(self, log_text=None):
+        """code_map 为 ProductIndex 时，在日志中列出模糊匹配上的和未映射的产品名称（close 之后调用）"""
+        if not hasattr(self.code_map, 'report'):
+            return None
+        return self.code_map.report(self._names, log_text)
@@ -0,0 +1,235 @@
+import os
+import re
+import json
+import threading
+import unicodedata
+from utils.common import log
+
+# ========== 产品名称索引 ===============
+# 账套编号映射原来是 df['产品名称'].map(product_code_dict) 的精确匹配，
+# 单据上多一个空格、全角字符、换行残留或名称被截断（如 "…集合资产管理计"）就映射不上，只能手工补。
+# 索引按以下顺序查找，找到即止：
+#   1. 原名称精确匹配；
+#   2. 规范化名称匹配：全角转半角、去掉空白和换行；
+#   3. 截断的名称：规范化后是唯一一个产品名称的前缀（至少 MIN_PREFIX_LEN 个字，且不在数字中间截断）；
+#   4. 三字组相似度（Dice）不低于 FUZZY_THRESHOLD，比第二名高出 FUZZY_MARGIN，且名称中的数字（如 18号）和份额类别（如 A类、C）一致。
+# 第 3、4 步的结果和仍未映射的名称（附相似度最高的几个候选）在提取结束时写入日志，便于核对和补充映射文件。
+# 同一映射文件在文件未修改时只建一次索引，各提取器共用；每个名称的查找结果也只算一次。
+
+MIN_PREFIX_LEN = 8
+FUZZY_THRESHOLD = 0.85
+FUZZY_MARGIN = 0.05
+SUGGESTION_COUNT = 3
+SUGGESTION_MIN_SCORE = 0.3
+# 出现在超过这么多产品（至少 COMMON_GRAM_MIN 个）中的三字组（如 "资产管"）不用于挑选候选，只参与计分
+COMMON_GRAM_SHARE = 0.1
+COMMON_GRAM_MIN = 50
+
+MATCH_EXACT = 'exact'
+MATCH_CANONICAL = 'canonical'
+MATCH_PREFIX = 'prefix'
+MATCH_FUZZY = 'fuzzy'
+
+_DIGITS = re.compile(r'\d+')
+# 名称末尾的份额类别，如 "…债券A"、"…债券C类"、"…债券A类份额"（规范化后为小写）
+_SHARE_CLASS = re.compile(r'([a-e])类?(?:份额)?$')
+
+_cache = {}  # 映射文件绝对路径 -> (指纹, ProductIndex)
+_cache_lock = threading.Lock()
+
+
+def canonical_name(name):
+    """规范化产品名称：全角转半角（NFKC），去掉空白和换行，英文转小写"""
+    if not isinstance(name, str):
+        return ''
+    return ''.join(unicodedata.normalize('NFKC', name).split()).lower()
+
+
+def _variant(key):
+    """名称中区分不同产品的部分：数字（期数、编号）和份额类别"""
+    share_class = _SHARE_CLASS.search(key)
+    return _DIGITS.findall(key), share_class.group(1) if share_class else None
+
+
+def _trigrams(key):
+    if len(key) < 3:
+        return {key} if key else set()
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+class ProductIndex:
+    """产品名称 -> 账套编号 的索引
+
+    Args:
+        code_dict: 映射文件内容 {产品名称: 账套编号}
+    """
+
+    def __init__(self, code_dict):
+        self.code_dict = dict(code_dict)
+        self._keys = []       # 规范化名称
+        self._names = []      # 对应的原名称
+        self._codes = []
+        self._by_key = {}     # 规范化名称 -> 序号；规范化后重名且账套编号不同时为 None
+        self._grams = []
+        self._postings = {}   # 三字组 -> [序号, ...]
+        self._resolved = {}   # 查找过的名称 -> (账套编号, 匹配方式, 匹配到的原名称, 相似度) 或 None
+        for name, code in self.code_dict.items():
+            key = canonical_name(name)
+            if not key:
+                continue
+            if key in self._by_key:
+                i = self._by_key[key]
+                if i is not None and self._codes[i] != code:
+                    self._by_key[key] = None
+                continue
+            i = len(self._keys)
+            self._by_key[key] = i
+            self._keys.append(key)
+            self._names.append(name)
+            self._codes.append(code)
+            grams = _trigrams(key)
+            self._grams.append(grams)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(i)
+
+    def __len__(self):
+        return len(self.code_dict)
+
+    def resolve(self, name):
+        """查找一个产品名称
+
+        Returns:
+            (账套编号, 匹配方式, 匹配到的映射文件中的名称, 相似度)；找不到时为 None
+        """
+        if name in self._resolved:
+            return self._resolved[name]
+        result = self._resolve(name)
+        self._resolved[name] = result
+        return result
+
+    def _resolve(self, name):
+        if not isinstance(name, str) or not name:
+            return None
+        if name in self.code_dict:
+            return self.code_dict[name], MATCH_EXACT, name, 1.0
+        key = canonical_name(name)
+        if not key:
+            return None
+        if key in self._by_key:
+            i = self._by_key[key]
+            return None if i is None else (self._codes[i], MATCH_CANONICAL, self._names[i], 1.0)
+
+        if len(key) >= MIN_PREFIX_LEN and not key[-1].isdigit():
+            prefixed = [i for i in self._containing(key) if self._keys[i].startswith(key)]
+            if len(prefixed) == 1:
+                i = prefixed[0]
+                return self._codes[i], MATCH_PREFIX, self._names[i], len(key) / len(self._keys[i])
+
+        ranked = self._rank(key)
+        if not ranked:
+            return None
+        best_score, best = ranked[0]
+        runner_up = ranked[1][0] if len(ranked) > 1 else 0.0
+        if (best_score >= FUZZY_THRESHOLD and best_score - runner_up >= FUZZY_MARGIN
+                and _variant(key) == _variant(self._keys[best])):
+            return self._codes[best], MATCH_FUZZY, self._names[best], best_score
+        return None
+
+    def _containing(self, key):
+        """包含 key 全部三字组的产品序号（以 key 为前缀的名称都在其中）"""
+        postings = sorted((self._postings.get(gram, ()) for gram in _trigrams(key)), key=len)
+        if not postings:
+            return set()
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return candidates
+
+    def _rank(self, key):
+        """按 Dice 相似度从高到低返回 [(相似度, 序号), ...]"""
+        grams = _trigrams(key)
+        common = max(COMMON_GRAM_MIN, int(len(self._keys) * COMMON_GRAM_SHARE))
+        postings = [self._postings.get(gram, ()) for gram in grams]
+        candidates = set()
+        for posting in postings:
+            if len(posting) <= common:
+                candidates.update(posting)
+        if not candidates:
+            # 只有常见三字组，退回到全部有相同三字组的产品
+            candidates = set().union(*postings)
+        ranked = [(2 * len(grams & self._grams[i]) / (len(grams) + len(self._grams[i])), i) for i in candidates]
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        return ranked
+
+    def suggest(self, name, limit=SUGGESTION_COUNT):
+        """相似度最高的几个产品
+
+        Returns:
+            [(映射文件中的名称, 账套编号, 相似度), ...]
+        """
+        ranked = self._rank(canonical_name(name))
+        return [(self._names[i], self._codes[i], score)
+                for score, i in ranked[:limit] if score >= SUGGESTION_MIN_SCORE]
+
+    def map_names(self, names):
+        """把产品名称列映射为账套编号列，找不到的为 NaN
+
+        Args:
+            names: 产品名称 Series
+
+        Returns:
+            与 names 索引相同的 Series
+        """
+        codes = {}
+        for name in names.dropna().unique():
+            result = self.resolve(name)
+            if result is not None:
+                codes[name] = result[0]
+        return names.map(codes)
+
+    def report(self, names, log_text=None):
+        """记录一组名称中模糊匹配上的和仍未映射的名称
+
+        Args:
+            names: 本次提取到的产品名称
+            log_text: 日志文本框对象
+
+        Returns:
+            (模糊匹配数, 未映射数)
+        """
+        matched, unmapped = [], []
+        for name in sorted(set(n for n in names if isinstance(n, str) and n)):
+            result = self.resolve(name)
+            if result is None:
+                unmapped.append(name)
+            elif result[1] in (MATCH_PREFIX, MATCH_FUZZY):
+                matched.append((name, result))
+        for name, (code, how, matched_name, score) in matched:
+            kind = '截断匹配' if how == MATCH_PREFIX else f'相似匹配 {score:.2f}'
+            log(f"产品名称{kind}: {name} -> {matched_name}（{code}）", log_text)
+        for name in unmapped:
+            suggestions = '；'.join(f"{n}（{code}，{score:.2f}）" for n, code, score in self.suggest(name))
+            log(f"产品名称未映射: {name}" + (f"，相近的有: {suggestions}" if suggestions else ''), log_text)
+        return len(matched), len(unmapped)
+
+
+def load(json_path):
+    """读取映射文件并建立索引；同一文件未修改时返回已建好的索引
+
+    Raises:
+        OSError / ValueError: 文件不存在或不是合法的 JSON
+    """
+    path = os.path.abspath(json_path)
+    stat = os.stat(path)
+    fingerprint = (stat.st_size, stat.st_mtime_ns)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        index = ProductIndex(json.load(f))
+    with _cache_lock:
+        _cache[path] = (fingerprint, index)
+    return index
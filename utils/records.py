@@ -0,0 +1,55 @@
+import pandas as pd
+from utils import run_report
+
+
+class RecordBatch:
+    """按列累积提取结果，最后一次性生成 DataFrame
+
+    取代逐条构造单行 DataFrame 再 pd.concat 的写法：数值转换、四舍五入和
+    账套编号映射都在全部记录收集完后统一做一次。
+    """
+
+    def __init__(self, columns):
+        """
+        Args:
+            columns: 输出列顺序（即各提取器的 target_cols）
+        """
+        self.columns = list(columns)
+        self._data = {col: [] for col in self.columns}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, record):
+        """追加一条记录，未给出的列留空
+
+        Args:
+            record: {列名: 值}
+        """
+        for col in self.columns:
+            self._data[col].append(record.get(col, ''))
+        self._size += 1
+
+    def to_frame(self, numeric_cols=(), code_map=None, name_col='产品名称', code_col='账套编号'):
+        """生成最终的 DataFrame
+
+        Args:
+            numeric_cols: 需要转为数值并保留两位小数的列
+            code_map: 产品名称 -> 账套编号 的映射字典，或 utils.product_index.ProductIndex
+            name_col: 产品名称列
+            code_col: 映射结果写入的列
+
+        Returns:
+            列顺序与 columns 一致的 DataFrame
+        """
+        df = pd.DataFrame(self._data, columns=self.columns)
+        for col in numeric_cols:
+            df[col] = pd.to_numeric(df[col], errors='coerce').round(2)
+        if code_map is not None:
+            with run_report.stage('mapping'):
+                if hasattr(code_map, 'map_names'):
+                    df[code_col] = code_map.map_names(df[name_col])
+                else:
+                    df[code_col] = df[name_col].map(code_map)
+        return df
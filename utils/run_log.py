@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+import traceback
+from datetime import datetime
+
+# ========== 运行日志 ===============
+# OCR等过程日志以 JSON Lines 写入 logs/ 下的文件，每次运行一个文件。
+# 调用方只把记录放入队列，由后台线程攒批写盘，不再每条日志打开、关闭一次文件。
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
+KEEP_RUNS = 20                      # 保留最近多少次运行的日志
+MAX_BYTES = 20 * 1024 * 1024        # 单个文件超过该大小后另起一个分卷
+FLUSH_INTERVAL = 1.0                # 后台线程最长间隔多少秒写一次盘
+FLUSH_BATCH = 500                   # 攒够多少条记录立即写盘
+CONSOLE_LEVEL = WARNING             # 该级别及以上同时输出到控制台
+
+_NEW_RUN = object()
+_STOP = object()
+
+
+class RunLogWriter:
+    """后台写日志线程
+
+    文件名为 {prefix}_{启动时间}_{进程号}.jsonl，超过 max_bytes 后依次写入 .2.jsonl、.3.jsonl；
+    开始新的一次运行时只保留最近 keep_runs 次运行的文件。
+    """
+
+    def __init__(self, log_dir=DEFAULT_LOG_DIR, prefix='run', keep_runs=KEEP_RUNS,
+                 max_bytes=MAX_BYTES, flush_interval=FLUSH_INTERVAL):
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.keep_runs = keep_runs
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.path = None
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._file = None
+        self._run_id = None
+        self._part = 1
+        self._bytes = 0
+
+    def put(self, record):
+        """放入一条记录（字典），可在任意线程调用"""
+        self._ensure_thread()
+        self._queue.put(record)
+
+    def new_run(self):
+        """之后的记录写入新的运行文件"""
+        self._ensure_thread()
+        self._queue.put(_NEW_RUN)
+
+    def flush(self, timeout=5.0):
+        """等待队列中已有的记录写盘"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout=5.0)
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='run-log-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        pending = []
+        last_write = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._write(pending)
+                self._close_file()
+                return
+            if item is _NEW_RUN:
+                self._write(pending)
+                pending = []
+                self._close_file()
+                self._run_id = None
+                continue
+            if isinstance(item, threading.Event):
+                self._write(pending)
+                pending = []
+                item.set()
+                continue
+            if item is not None:
+                pending.append(item)
+
+            if pending and (len(pending) >= FLUSH_BATCH or time.monotonic() - last_write >= self.flush_interval):
+                self._write(pending)
+                pending = []
+                last_write = time.monotonic()
+
+    def _write(self, records):
+        if not records:
+            return
+        try:
+            content = ''.join(json.dumps(r, ensure_ascii=False, default=str) + '\n' for r in records)
+            if self._file is None:
+                self._open_file()
+            self._file.write(content)
+            self._file.flush()
+            self._bytes += len(content.encode('utf-8'))
+            if self._bytes >= self.max_bytes:
+                self._close_file()
+                self._part += 1
+        except Exception as e:
+            print(f"写入日志失败: {e}")
+
+    def _open_file(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        if self._run_id is None:
+            self._run_id = f"{self.prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+            self._part = 1
+            self._remove_old_runs()
+        suffix = '.jsonl' if self._part == 1 else f'.{self._part}.jsonl'
+        self.path = os.path.join(self.log_dir, self._run_id + suffix)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._bytes = self._file.tell()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _remove_old_runs(self):
+        """按运行分组，删除最早的运行文件，为本次运行留出一个位置"""
+        runs = {}
+        for name in os.listdir(self.log_dir):
+            if name.startswith(self.prefix + '_') and name.endswith('.jsonl'):
+                runs.setdefault(name.split('.')[0], []).append(name)
+        for run_id in sorted(runs)[:max(0, len(runs) - self.keep_runs + 1)]:
+            for name in runs[run_id]:
+                try:
+                    os.remove(os.path.join(self.log_dir, name))
+                except OSError:
+                    pass
+
+
+class RunLogger:
+    """带来源和上下文字段的日志记录器
+
+    每条记录包含 time、level、source、msg，以及 bind() 绑定的字段（如 file、page）
+    和调用时传入的字段（如 elapsed_ms）。实例可直接当作 log_func(msg) 调用，级别为 INFO。
+    """
+
+    def __init__(self, source, writer, context=None):
+        self.source = source
+        self.writer = writer
+        self.context = context or {}
+
+    def bind(self, **fields):
+        """返回附带额外上下文字段的记录器"""
+        return RunLogger(self.source, self.writer, {**self.context, **fields})
+
+    def log(self, level, msg, **fields):
+        if level < _min_level:
+            return
+        record = {
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'level': LEVEL_NAMES.get(level, str(level)),
+            'source': self.source,
+            'msg': msg,
+        }
+        record.update(self.context)
+        record.update(fields)
+        self.writer.put(record)
+        if level >= CONSOLE_LEVEL:
+            print(f"[{self.source}] {msg}")
+
+    def debug(self, msg, **fields):
+        self.log(DEBUG, msg, **fields)
+
+    def info(self, msg, **fields):
+        self.log(INFO, msg, **fields)
+
+    def warning(self, msg, **fields):
+        self.log(WARNING, msg, **fields)
+
+    def error(self, msg, **fields):
+        self.log(ERROR, msg, **fields)
+
+    def exception(self, msg, **fields):
+        """在 except 块中调用，记录 ERROR 级别并附带异常堆栈"""
+        self.log(ERROR, msg, traceback=traceback.format_exc(), **fields)
+
+    def __call__(self, msg):
+        self.info(msg)
+
+
+_writer = RunLogWriter()
+_min_level = DEBUG
+atexit.register(_writer.close)
+
+
+def get_logger(source, **context):
+    """获取写入当前运行日志的记录器
+
+    Args:
+        source: 日志来源，如 'manual_redemption'
+        context: 附加到每条记录的字段
+
+    Returns:
+        RunLogger 对象
+    """
+    return RunLogger(source, _writer, context)
+
+
+def set_level(level):
+    """设置写入文件的最低级别，默认 DEBUG"""
+    global _min_level
+    _min_level = level
+
+
+def new_run():
+    """开始新的一次运行，之后的日志写入新文件"""
+    _writer.new_run()
+
+
+def flush(timeout=5.0):
+    _writer.flush(timeout)
+
+
+def elapsed_ms(start):
+    """从 time.perf_counter() 的起点到现在的毫秒数"""
+    return round((time.perf_counter() - start) * 1000, 1)
@@ -0,0 +1,331 @@
+import os
+import json
+import html
+import time
+import pstats
+import cProfile
+import threading
+import contextlib
+from datetime import datetime
+
+# ========== 运行报告 ===============
+# 记录一次运行中各阶段的耗时：遍历目录、打开PDF、提取文本、OCR、识别平台、提取字段、映射账套编号、写出Excel。
+# 按单据类型、平台和文件汇总，运行结束后在输出目录写出 JSON 和 HTML 报告，列出最慢的文件和OCR页面。
+# 没有调用 start() 时各处埋点直接返回，不影响原有流程。
+# 深度分析模式用 cProfile 记录调用耗时（主线程和各提取线程分别记录后合并；文本提取进程池中的子进程不在其中）。
+
+STAGES = ('walk', 'open', 'text', 'ocr', 'classify', 'parse', 'mapping', 'write')
+STAGE_NAMES = {
+    'walk': '遍历目录',
+    'open': '打开PDF',
+    'text': '提取文本',
+    'ocr': 'OCR识别',
+    'classify': '识别平台',
+    'parse': '提取字段',
+    'mapping': '映射账套编号',
+    'write': '写出Excel',
+}
+# 按文件记录、与单据类型无关的阶段（同一文件的文本只提取一次，供所有提取器共享）
+FILE_STAGES = ('open', 'text', 'ocr')
+
+DEFAULT_TOP_N = 20
+REPORT_BASENAME = "运行报告"
+
+_active = None
+_local = threading.local()
+
+
+class RunReport:
+    """一次运行的耗时记录，可在多个线程中同时写入
+
+    Args:
+        profile: 是否同时用 cProfile 记录调用耗时
+    """
+
+    def __init__(self, profile=False):
+        self.started = datetime.now()
+        self.profile = profile
+        self._start = time.perf_counter()
+        self._seconds = None
+        self._lock = threading.Lock()
+        self._stages = {}     # (单据类型, 阶段) -> [耗时, 次数]
+        self._files = {}      # 文件路径 -> {'stages': {阶段: 耗时}, 'tasks': {单据类型: {'platform', 阶段: 耗时}}}
+        self._pages = []      # [(文件路径, 页码, 方式, 耗时), ...]
+        self._profiles = []   # cProfile.Profile
+
+    def add(self, stage, seconds, file=None, platform=None, task=None):
+        """记录一段耗时
+
+        Args:
+            stage: STAGES 中的阶段
+            seconds: 耗时（秒）
+            file: 所属文件，为空时只计入阶段合计
+            platform: 识别出的平台，记在文件当前单据类型下
+            task: 单据类型，默认为当前线程正在执行的类型
+        """
+        task = task if task is not None else getattr(_local, 'task', None)
+        with self._lock:
+            total = self._stages.setdefault((task, stage), [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+            if file is None:
+                return
+            entry = self._files.setdefault(file, {'stages': {}, 'tasks': {}})
+            if stage in FILE_STAGES or task is None:
+                entry['stages'][stage] = entry['stages'].get(stage, 0.0) + seconds
+                if task is None:
+                    return
+            task_entry = entry['tasks'].setdefault(task, {'platform': None})
+            if stage not in FILE_STAGES:
+                task_entry[stage] = task_entry.get(stage, 0.0) + seconds
+            if platform is not None:
+                task_entry['platform'] = platform
+
+    def add_page(self, file, page, method, seconds):
+        """记录单页的文本层读取或OCR耗时"""
+        with self._lock:
+            self._pages.append((file, page, method, seconds))
+
+    def profiled(self, func, *args, **kwargs):
+        """调用 func；深度分析模式下用 cProfile 记录（每个线程分别调用）"""
+        if not self.profile:
+            return func(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12 起同一时间只能有一个 cProfile 在工作，其余线程不再单独记录
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with self._lock:
+                self._profiles.append(profiler)
+
+    def finish(self):
+        """结束计时"""
+        if self._seconds is None:
+            self._seconds = time.perf_counter() - self._start
+
+    def summary(self, top_n=DEFAULT_TOP_N):
+        """汇总为可写成 JSON 的字典"""
+        with self._lock:
+            stages = {key: list(value) for key, value in self._stages.items()}
+            files = {path: {'stages': dict(entry['stages']),
+                            'tasks': {task: dict(t) for task, t in entry['tasks'].items()}}
+                     for path, entry in self._files.items()}
+            pages = list(self._pages)
+        seconds = self._seconds if self._seconds is not None else time.perf_counter() - self._start
+
+        # 各阶段合计，以及按单据类型（None 为多个提取器共享的阶段，如遍历目录、预取文本）
+        stage_totals = {}
+        by_task = {}
+        for (task, stage), (stage_seconds, count) in stages.items():
+            total = stage_totals.setdefault(stage, [0.0, 0])
+            total[0] += stage_seconds
+            total[1] += count
+            by_task.setdefault(task or '共享', {})[stage] = round(stage_seconds, 3)
+
+        # 按 (单据类型, 平台) 汇总：文件的文本/OCR耗时计入其识别出的每个平台
+        platforms = {}
+        slowest = []
+        for path, entry in files.items():
+            file_seconds = sum(entry['stages'].values())
+            task_platforms = {}
+            for task, task_entry in entry['tasks'].items():
+                task_seconds = {s: v for s, v in task_entry.items() if s != 'platform'}
+                file_seconds += sum(task_seconds.values())
+                platform = task_entry['platform'] or '未识别'
+                task_platforms[task] = platform
+                group = platforms.setdefault((task, platform), {'files': 0, 'stages': {}})
+                group['files'] += 1
+                for stage, value in list(entry['stages'].items()) + list(task_seconds.items()):
+                    group['stages'][stage] = group['stages'].get(stage, 0.0) + value
+            slowest.append({
+                'file': path,
+                'seconds': round(file_seconds, 3),
+                'platforms': task_platforms,
+                'stages': {stage: round(value, 3) for stage, value in _merge_file_stages(entry).items()},
+            })
+        slowest.sort(key=lambda item: item['seconds'], reverse=True)
+
+        platform_rows = []
+        for (task, platform), group in platforms.items():
+            total = sum(group['stages'].values())
+            platform_rows.append({
+                'type': task,
+                'platform': platform,
+                'files': group['files'],
+                'seconds': round(total, 3),
+                'avg_ms': round(total / group['files'] * 1000, 1) if group['files'] else None,
+                'stages': {stage: round(value, 3) for stage, value in group['stages'].items()},
+            })
+        platform_rows.sort(key=lambda row: row['seconds'], reverse=True)
+
+        pages.sort(key=lambda page: page[3], reverse=True)
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'seconds': round(seconds, 3),
+            'files': len(files),
+            'stages': [
+                {'stage': stage, 'name': STAGE_NAMES.get(stage, stage),
+                 'seconds': round(stage_totals[stage][0], 3), 'count': stage_totals[stage][1]}
+                for stage in _ordered(stage_totals)
+            ],
+            'tasks': by_task,
+            'platforms': platform_rows,
+            'slowest_files': slowest[:top_n],
+            'slowest_pages': [
+                {'file': file, 'page': page, 'method': method, 'seconds': round(page_seconds, 3)}
+                for file, page, method, page_seconds in pages[:top_n]
+            ],
+        }
+
+    def write(self, output_dir, top_n=DEFAULT_TOP_N):
+        """在 output_dir 写出 运行报告.json、运行报告.html，深度分析模式下另写 .prof 和文本摘要
+
+        Returns:
+            {'json': 路径, 'html': 路径, 'profile': 路径或 None}
+        """
+        self.finish()
+        os.makedirs(output_dir, exist_ok=True)
+        summary = self.summary(top_n)
+        paths = {
+            'json': os.path.join(output_dir, REPORT_BASENAME + '.json'),
+            'html': os.path.join(output_dir, REPORT_BASENAME + '.html'),
+            'profile': None,
+        }
+        if self._profiles:
+            paths['profile'] = os.path.join(output_dir, REPORT_BASENAME + '.prof')
+            stats = pstats.Stats(*self._profiles)
+            stats.dump_stats(paths['profile'])
+            # 同时写一份按累计耗时排序的文本摘要，不用额外工具即可查看
+            with open(os.path.join(output_dir, REPORT_BASENAME + '_profile.txt'), 'w', encoding='utf-8') as f:
+                pstats.Stats(paths['profile'], stream=f).sort_stats('cumulative').print_stats(60)
+        summary['profile'] = paths['profile']
+
+        with open(paths['json'], 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        with open(paths['html'], 'w', encoding='utf-8') as f:
+            f.write(render_html(summary))
+        return paths
+
+
+def _merge_file_stages(entry):
+    stages = dict(entry['stages'])
+    for task_entry in entry['tasks'].values():
+        for stage, value in task_entry.items():
+            if stage != 'platform':
+                stages[stage] = stages.get(stage, 0.0) + value
+    return stages
+
+
+def _ordered(stages):
+    return [stage for stage in STAGES if stage in stages] + sorted(s for s in stages if s not in STAGES)
+
+
+def _table(headers, rows):
+    out = ['<table><tr>' + ''.join(f'<th>{html.escape(str(h))}</th>' for h in headers) + '</tr>']
+    for row in rows:
+        out.append('<tr>' + ''.join(f'<td>{html.escape(str(cell))}</td>' for cell in row) + '</tr>')
+    out.append('</table>')
+    return '\n'.join(out)
+
+
+def render_html(summary):
+    """把 summary() 的结果渲染为单个HTML页面"""
+    stage_names = [STAGE_NAMES[stage] for stage in STAGES]
+    sections = [
+        f"<h1>{REPORT_BASENAME}</h1>",
+        f"<p>开始时间 {html.escape(summary['started'])}，总耗时 {summary['seconds']} 秒，共 {summary['files']} 个文件</p>",
+        "<h2>各阶段耗时</h2>",
+        _table(['阶段', '耗时(秒)', '次数'], [(row['name'], row['seconds'], row['count']) for row in summary['stages']]),
+        "<h2>各单据类型</h2>",
+        _table(['单据类型'] + stage_names,
+               [[task] + [stages.get(stage, '') for stage in STAGES] for task, stages in summary['tasks'].items()]),
+        "<h2>各平台</h2>",
+        _table(['单据类型', '平台', '文件数', '耗时(秒)', '平均(毫秒)'] + stage_names,
+               [[row['type'], row['platform'], row['files'], row['seconds'], row['avg_ms']]
+                + [row['stages'].get(stage, '') for stage in STAGES] for row in summary['platforms']]),
+        f"<h2>最慢的 {len(summary['slowest_files'])} 个文件</h2>",
+        _table(['文件', '平台', '耗时(秒)'] + stage_names,
+               [[item['file'], '、'.join(f'{t}/{p}' for t, p in item['platforms'].items()), item['seconds']]
+                + [item['stages'].get(stage, '') for stage in STAGES] for item in summary['slowest_files']]),
+    ]
+    if summary['slowest_pages']:
+        sections += [
+            f"<h2>最慢的 {len(summary['slowest_pages'])} 个页面（OCR）</h2>",
+            _table(['文件', '页码', '方式', '耗时(秒)'],
+                   [(page['file'], page['page'], page['method'], page['seconds']) for page in summary['slowest_pages']]),
+        ]
+    if summary.get('profile'):
+        sections.append(f"<p>cProfile 结果: {html.escape(summary['profile'])}</p>")
+    style = ("body{font-family:'微软雅黑',sans-serif;font-size:13px;margin:20px}"
+             "table{border-collapse:collapse;margin-bottom:16px}"
+             "th,td{border:1px solid #ccc;padding:3px 8px;text-align:left}th{background:#f0f0f0}")
+    return (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{REPORT_BASENAME}</title>"
+            f"<style>{style}</style></head><body>\n" + '\n'.join(sections) + "\n</body></html>\n")
+
+
+def start(profile=False):
+    """开始记录本次运行，返回 RunReport"""
+    global _active
+    _active = RunReport(profile)
+    return _active
+
+
+def finish():
+    """结束记录，返回本次运行的 RunReport（没有开始记录时为 None）"""
+    global _active
+    report, _active = _active, None
+    if report is not None:
+        report.finish()
+    return report
+
+
+@contextlib.contextmanager
+def task(task_type):
+    """在当前线程中标记正在执行的单据类型"""
+    previous = getattr(_local, 'task', None)
+    _local.task = task_type
+    try:
+        yield
+    finally:
+        _local.task = previous
+
+
+@contextlib.contextmanager
+def stage(name, file=None, platform=None):
+    """记录 with 块的耗时；没有开始记录时直接执行"""
+    report = _active
+    if report is None:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        report.add(name, time.perf_counter() - start_time, file, platform)
+
+
+def add(stage_name, seconds, file=None, platform=None):
+    """记录一段已测得的耗时"""
+    report = _active
+    if report is not None:
+        report.add(stage_name, seconds, file, platform)
+
+
+def add_page(file, page, method, seconds):
+    """记录单页的读取耗时"""
+    report = _active
+    if report is not None:
+        report.add_page(file, page, method, seconds)
+
+
+def profiled(func, *args, **kwargs):
+    """调用 func；当前运行开启了深度分析时用 cProfile 记录"""
+    report = _active
+    if report is None:
+        return func(*args, **kwargs)
+    return report.profiled(func, *args, **kwargs)
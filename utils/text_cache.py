@@ -0,0 +1,241 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from utils.common import log
+
+# 缓存默认放在本机用户目录下：SQLite 放在网络共享盘上容易出现锁冲突和损坏
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get('LOCALAPPDATA', os.path.expanduser('~')), 'FundDataETL')
+DEFAULT_CACHE_FILENAME = "pdf_text_cache.sqlite"
+DEFAULT_MAX_AGE_DAYS = 30
+
+# 未计算内容哈希的文件以 "stat:大小:修改时间:路径" 作为缓存键
+STAT_KEY_PREFIX = 'stat:'
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def file_content_hash(file_path):
+    """计算文件内容的 SHA-256"""
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def stat_key(file_path, size, mtime_ns):
+    return f"{STAT_KEY_PREFIX}{size}:{mtime_ns}:{file_path}"
+
+
+class PdfTextCache:
+    """跨运行的PDF文本缓存
+
+    先按 (路径, 大小, 修改时间纳秒) 命中。未命中时，只有缓存中有大小相同的其他文件才计算内容哈希
+    （内容相同的文件大小必然相同），被复制或改名的文件可以复用已提取的文本；
+    其余新文件不读取内容，以 (路径, 大小, 修改时间) 作为键，避免每个新PDF都完整读一遍算 SHA-256。
+    只提取过前几页的文件也会缓存，之后需要更多页时从已缓存的页数继续提取。
+    """
+
+    def __init__(self, db_path, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pdf_text (
+                content_hash TEXT NOT NULL,
+                backend TEXT NOT NULL,
+                text TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                page_ends TEXT,
+                page_count INTEGER,
+                PRIMARY KEY (content_hash, backend)
+            );
+            CREATE TABLE IF NOT EXISTS file_index (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                content_hash TEXT NOT NULL,
+                last_used REAL NOT NULL
+            );
+        """)
+        # 旧版本的缓存没有分页信息，这些条目查询时视为未命中，重新提取后覆盖
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pdf_text)")}
+        for column, column_type in (('page_ends', 'TEXT'), ('page_count', 'INTEGER')):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE pdf_text ADD COLUMN {column} {column_type}")
+        if 'lines' in columns:
+            # 旧版本另存了一份按行拆分的文本，读取时并不使用
+            try:
+                self._conn.execute("ALTER TABLE pdf_text DROP COLUMN lines")
+            except sqlite3.OperationalError:
+                # SQLite 3.35 之前不支持删除列，缓存重建即可
+                self._conn.execute("DROP TABLE pdf_text")
+                self._conn.execute(
+                    "CREATE TABLE pdf_text (content_hash TEXT NOT NULL, backend TEXT NOT NULL, text TEXT NOT NULL, "
+                    "last_used REAL NOT NULL, page_ends TEXT, page_count INTEGER, PRIMARY KEY (content_hash, backend))"
+                )
+        # 旧版本按浮点秒记录修改时间，精度不够区分快速连续的改写，这些条目查询时视为未命中
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(file_index)")}
+        if 'mtime_ns' not in columns:
+            self._conn.execute("ALTER TABLE file_index ADD COLUMN mtime_ns INTEGER")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS file_index_size ON file_index (size)")
+        self._conn.commit()
+
+    def _stat_key(self, file_path, size, mtime_ns):
+        row = self._conn.execute(
+            "SELECT content_hash FROM file_index WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (file_path, size, mtime_ns)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _content_key(self, file_path, size, mtime_ns):
+        """未按路径命中的文件的缓存键
+
+        缓存中有大小相同的其他文件时计算内容哈希，并把那些文件仍以 (路径, 大小, 修改时间) 为键的条目
+        改为内容哈希，之后内容相同的文件可以互相复用；没有时直接用 (路径, 大小, 修改时间) 作为键。
+        """
+        same_size = self._conn.execute(
+            "SELECT path, mtime_ns, content_hash FROM file_index WHERE size = ? AND path != ?",
+            (size, file_path)
+        ).fetchall()
+        if not same_size:
+            return stat_key(file_path, size, mtime_ns)
+        content_hash = file_content_hash(file_path)
+        for other_path, other_mtime_ns, other_key in same_size:
+            if not other_key.startswith(STAT_KEY_PREFIX):
+                continue
+            try:
+                st = os.stat(other_path)
+                if (st.st_size, st.st_mtime_ns) != (size, other_mtime_ns):
+                    continue
+                other_hash = file_content_hash(other_path)
+            except OSError:
+                continue
+            self._conn.execute("UPDATE OR REPLACE pdf_text SET content_hash = ? WHERE content_hash = ?",
+                               (other_hash, other_key))
+            self._conn.execute("UPDATE file_index SET content_hash = ? WHERE content_hash = ?",
+                               (other_hash, other_key))
+        return content_hash
+
+    def lookup(self, file_paths, backend='pdfplumber'):
+        """批量查询缓存
+
+        Args:
+            file_paths: 文件路径列表
+            backend: 文本提取方式
+
+        Returns:
+            (hits, keys): hits 为 {路径: (text, page_ends, page_count)}，
+            page_ends 为已提取各页在 text 中的结束位置，已提取全部页时 len(page_ends) == page_count；
+            keys 为 {路径: (size, mtime_ns, 缓存键)}，供提取后写回缓存使用
+        """
+        hits = {}
+        keys = {}
+        now = time.time()
+        with self._lock:
+            for file_path in file_paths:
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    continue
+                content_hash = self._stat_key(file_path, st.st_size, st.st_mtime_ns)
+                if content_hash is None:
+                    try:
+                        content_hash = self._content_key(file_path, st.st_size, st.st_mtime_ns)
+                    except OSError:
+                        continue
+                keys[file_path] = (st.st_size, st.st_mtime_ns, content_hash)
+                row = self._conn.execute(
+                    "SELECT text, page_ends, page_count FROM pdf_text "
+                    "WHERE content_hash = ? AND backend = ? AND page_ends IS NOT NULL",
+                    (content_hash, backend)
+                ).fetchone()
+                if row is None:
+                    continue
+                hits[file_path] = (row[0], json.loads(row[1]), row[2])
+                self._conn.execute(
+                    "UPDATE pdf_text SET last_used = ? WHERE content_hash = ? AND backend = ?",
+                    (now, content_hash, backend)
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO file_index (path, size, mtime, mtime_ns, content_hash, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (file_path, st.st_size, st.st_mtime, st.st_mtime_ns, content_hash, now)
+                )
+            self._conn.commit()
+        return hits, keys
+
+    def store(self, results, keys, backend='pdfplumber'):
+        """写入新提取的文本
+
+        Args:
+            results: {路径: (text, page_ends, page_count)}
+            keys: lookup 返回的 {路径: (size, mtime_ns, 缓存键)}
+            backend: 文本提取方式
+        """
+        now = time.time()
+        text_rows = []
+        index_rows = []
+        for file_path, (text, page_ends, page_count) in results.items():
+            if file_path not in keys:
+                continue
+            size, mtime_ns, content_hash = keys[file_path]
+            text_rows.append((content_hash, backend, text, now, json.dumps(page_ends), page_count))
+            index_rows.append((file_path, size, mtime_ns / 1e9, mtime_ns, content_hash, now))
+        if not text_rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pdf_text (content_hash, backend, text, last_used, page_ends, page_count) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                text_rows
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO file_index (path, size, mtime, mtime_ns, content_hash, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                index_rows
+            )
+            self._conn.commit()
+
+    def evict(self, max_age_days=None):
+        """删除超过 max_age_days 天未使用的缓存
+
+        Returns:
+            删除的文本条目数
+        """
+        if max_age_days is None:
+            max_age_days = self.max_age_days
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM pdf_text WHERE last_used < ?", (cutoff,)).rowcount
+            self._conn.execute("DELETE FROM file_index WHERE last_used < ?", (cutoff,))
+            self._conn.commit()
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_default_cache():
+    """返回进程内共享的默认缓存，首次调用时打开并清理过期条目
+
+    缓存不可用（例如目录无写权限）时返回 None，提取流程照常进行。
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = PdfTextCache(os.path.join(DEFAULT_CACHE_DIR, DEFAULT_CACHE_FILENAME))
+                _default_cache.evict()
+            except Exception as e:
+                log(f"PDF文本缓存不可用: {e}")
+                _default_cache = False
+        return _default_cache or None
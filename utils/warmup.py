@@ -0,0 +1,40 @@
+import threading
+import importlib
+from utils.common import log
+from utils import ocr_engine
+
+# 界面出现后在后台预先导入的重型依赖
+HEAVY_MODULES = ['numpy', 'pandas', 'openpyxl', 'PIL.Image', 'pdfplumber', 'fitz']
+
+
+def warm_up(preload_ocr=False):
+    """预先导入重型依赖和全部提取器模块
+
+    操作员选择文件夹期间在后台完成，点击提取时不必再等待导入。
+
+    Args:
+        preload_ocr: 是否同时加载 EasyOCR 模型（数百MB内存，仅处理万事如意单据时需要）
+    """
+    from extractors.tasks import TASK_TYPES, load_extract_func
+    for module_name in HEAVY_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            log(f"预加载 {module_name} 失败: {e}")
+    for task_type in TASK_TYPES:
+        try:
+            load_extract_func(task_type)
+        except Exception as e:
+            log(f"预加载提取器 {task_type} 失败: {e}")
+    if preload_ocr:
+        try:
+            ocr_engine.get_reader()
+        except Exception as e:
+            log(f"预加载OCR模型失败: {e}")
+
+
+def start_warmup(preload_ocr=False):
+    """在后台线程中执行 warm_up，返回线程对象"""
+    thread = threading.Thread(target=warm_up, args=(preload_ocr,), name='warmup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,189 @@
+import os
+import threading
+from datetime import datetime
+from utils.common import log
+from utils.document_scan import DocumentScan
+from utils.text_cache import get_default_cache
+
+# ========== 监控模式 ===============
+# 单据随邮件陆续存入 <主目录>/<年>/<日期>/1场外开基/...。监控模式按固定间隔轮询当天目录，
+# 文件大小和修改时间在 settle 秒内不再变化才算写完；有新增、修改或删除的PDF时重新提取。
+# 同一个 DocumentScan 在各轮之间保留，未变化的文件不再读取文本或OCR，只有变化的文件重新提取，
+# 各提取器再用全部已读取的文本重新生成输出文件。也可以在指定时刻（如 09:30）无条件提取一次。
+# 日期变化后自动换到新一天的目录。
+
+DEFAULT_INTERVAL = 10   # 轮询间隔（秒）
+DEFAULT_SETTLE = 5      # 文件多久不变化视为写完（秒）
+
+
+def target_path_for(folder_path, run_date):
+    """返回某天的单据目录 <主目录>/<年>/<日期>/1场外开基"""
+    return os.path.join(folder_path, str(run_date.year), run_date.strftime('%Y%m%d'), "1场外开基")
+
+
+def parse_times(value):
+    """解析 "09:30,14:00" 形式的定时提取时刻
+
+    Returns:
+        按时间排序的 datetime.time 列表
+    """
+    times = []
+    for item in (value or '').split(','):
+        item = item.strip()
+        if item:
+            times.append(datetime.strptime(item, '%H:%M').time())
+    return sorted(set(times))
+
+
+class DirectoryWatcher:
+    """轮询一个目录下的PDF，返回已写完且有变化的文件
+
+    文件的 (大小, 修改时间) 与上一轮相同并保持 settle 秒后才视为写完；
+    首次看到时修改时间已早于 settle 秒的文件（如启动前已存在的）直接视为写完。
+    """
+
+    def __init__(self, target_path, settle=DEFAULT_SETTLE):
+        self.target_path = target_path
+        self.settle = settle
+        self._ready = {}     # 文件路径 -> (大小, 修改时间)，已交给提取器的版本
+        self._pending = {}   # 文件路径 -> ((大小, 修改时间), 首次看到该版本的时间)
+
+    @property
+    def pending(self):
+        """仍在写入中的文件数"""
+        return len(self._pending)
+
+    def poll(self, now=None):
+        """遍历一次目录
+
+        Returns:
+            (walk_entries, changed, removed)
+            walk_entries: 与 os.walk 相同的 [(root, dirs, files), ...]，不含仍在写入的PDF
+            changed: 本轮写完的新增或修改的文件路径
+            removed: 已交给提取器、现在已删除的文件路径
+        """
+        now = now if now is not None else datetime.now().timestamp()
+        walk_entries = []
+        seen = set()
+        changed = []
+        for root, dirs, files in os.walk(self.target_path):
+            kept = []
+            for f in files:
+                if not f.lower().endswith('.pdf'):
+                    kept.append(f)
+                    continue
+                file_path = os.path.join(root, f)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                seen.add(file_path)
+                signature = (stat.st_size, stat.st_mtime)
+                if self._ready.get(file_path) == signature:
+                    kept.append(f)
+                    continue
+                if self._settled(file_path, signature, stat.st_mtime, now):
+                    self._pending.pop(file_path, None)
+                    self._ready[file_path] = signature
+                    changed.append(file_path)
+                    kept.append(f)
+            walk_entries.append((root, dirs, kept))
+
+        removed = [file_path for file_path in self._ready if file_path not in seen]
+        for file_path in removed:
+            del self._ready[file_path]
+        for file_path in [p for p in self._pending if p not in seen]:
+            del self._pending[file_path]
+        return walk_entries, changed, removed
+
+    def _settled(self, file_path, signature, mtime, now):
+        previous = self._pending.get(file_path)
+        if previous is None or previous[0] != signature:
+            if previous is None and now - mtime >= self.settle:
+                return True
+            self._pending[file_path] = (signature, now)
+            return False
+        return now - previous[1] >= self.settle
+
+
+class Schedule:
+    """定时提取：每天每个时刻触发一次"""
+
+    def __init__(self, times=()):
+        self.times = list(times)
+        self._fired = set()  # (日期, 时刻)
+
+    def due(self, now):
+        """now 已到达、且今天还没触发过的时刻是否存在；启动前已过的时刻不补触发"""
+        due = False
+        for at in self.times:
+            key = (now.date(), at)
+            if key in self._fired:
+                continue
+            if now.time() >= at:
+                self._fired.add(key)
+                due = True
+        return due
+
+    def skip_past(self, now):
+        """把今天已经过去的时刻标记为已触发"""
+        for at in self.times:
+            if now.time() >= at:
+                self._fired.add((now.date(), at))
+
+
+def watch(folder_path, run, interval=DEFAULT_INTERVAL, settle=DEFAULT_SETTLE, times=(),
+          stop_event=None, log_text=None, workers=None, backend=None):
+    """监控当天目录，有新单据到达或到达定时时刻时调用 run 提取
+
+    Args:
+        folder_path: 主目录
+        run: 提取函数 run(run_date, documents)，documents 为各轮共用的 DocumentScan
+        interval: 轮询间隔（秒）
+        settle: 文件多久不变化视为写完（秒）
+        times: 每天定时提取的时刻（datetime.time），见 parse_times
+        stop_event: threading.Event，置位后退出
+        log_text: 日志文本框对象
+        workers: 并行提取文本的进程数
+        backend: 默认的PDF文本提取方式
+    """
+    stop_event = stop_event or threading.Event()
+    schedule = Schedule(times)
+    schedule.skip_past(datetime.now())
+    watcher = None
+    documents = None
+    cache = get_default_cache()
+    log(f"开始监控，每 {interval} 秒检查一次新单据", log_text)
+    while not stop_event.is_set():
+        now = datetime.now()
+        target_path = target_path_for(folder_path, now)
+        if watcher is None or watcher.target_path != target_path:
+            # 启动或日期变化：换到当天的目录，之前读取的文本不再需要
+            watcher = DirectoryWatcher(target_path, settle)
+            if documents is not None:
+                documents.close()
+            documents = None
+            log(f"监控目录: {target_path}", log_text)
+
+        if os.path.isdir(target_path):
+            walk_entries, changed, removed = watcher.poll()
+            due = schedule.due(now)
+            if changed or removed or due:
+                if changed or removed:
+                    log(f"发现 {len(changed)} 个新增或修改、{len(removed)} 个删除的文件", log_text)
+                else:
+                    log(f"定时提取 {now.strftime('%H:%M')}", log_text)
+                if documents is None:
+                    documents = DocumentScan(target_path, walk_entries, workers, cache, True, backend)
+                else:
+                    documents.refresh(walk_entries, changed + removed)
+                try:
+                    run(now, documents)
+                except Exception as e:
+                    log(f"提取失败: {e}", log_text)
+        elif schedule.due(now):
+            log(f"定时提取 {now.strftime('%H:%M')}：目标路径不存在 {target_path}", log_text)
+        stop_event.wait(interval)
+    if documents is not None:
+        documents.close()
+    log("已停止监控", log_text)